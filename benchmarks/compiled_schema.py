@@ -0,0 +1,69 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compare the generic `tlv8.decode`/`tlv8.encode` with the functions generated by `tlv8.compile_schema`.
+
+Run with `python -m benchmarks.compiled_schema` from the root of the repository.
+"""
+
+import timeit
+
+import tlv8
+
+SCHEMA = {
+    1: tlv8.DataType.FLOAT,
+    2: {
+        3: tlv8.DataType.STRING,
+        4: tlv8.DataType.UNSIGNED_INTEGER,
+    },
+    5: tlv8.DataType.INTEGER,
+    6: tlv8.DataType.BYTES,
+}
+
+DATA = tlv8.encode([
+    tlv8.Entry(1, 3.141),
+    tlv8.Entry(2, [
+        tlv8.Entry(3, 'hello'),
+        tlv8.Entry(4, 8080, tlv8.DataType.UNSIGNED_INTEGER),
+    ]),
+    tlv8.Entry(5, -42),
+    tlv8.Entry(6, b'\x00' * 64),
+] * 10)
+
+
+def run(name, function, number=2000):
+    duration = min(timeit.repeat(function, number=number, repeat=5)) / number
+    print('{name:40s} {us:10.2f} us/op'.format(name=name, us=duration * 1e6))
+    return duration
+
+
+def main():
+    compiled = tlv8.compile_schema(SCHEMA)
+    decoded = tlv8.decode(DATA, SCHEMA)
+    assert compiled.decode(DATA) == decoded
+    assert compiled.encode(decoded) == tlv8.encode(decoded)
+
+    generic = run('tlv8.decode', lambda: tlv8.decode(DATA, SCHEMA))
+    specialized = run('compile_schema(...).decode', lambda: compiled.decode(DATA))
+    print('{:40s} {:10.2f} x'.format('speedup', generic / specialized))
+    generic = run('tlv8.encode', lambda: tlv8.encode(decoded))
+    specialized = run('compile_schema(...).encode', lambda: compiled.encode(decoded))
+    print('{:40s} {:10.2f} x'.format('speedup', generic / specialized))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compare the size and speed of pickling `tlv8.EntryList` instances in the compact form with the default pickling of
+objects with their `__dict__`.
+
+Run with `python -m benchmarks.pickling` from the root of the repository.
+"""
+
+import copyreg
+import io
+import pickle
+
+import tlv8
+from benchmarks.compiled_schema import run
+
+SCHEMA = {
+    1: tlv8.DataType.STRING,
+    2: {
+        3: tlv8.DataType.BYTES,
+        4: tlv8.DataType.UNSIGNED_INTEGER,
+    },
+    5: tlv8.DataType.FLOAT,
+}
+
+DATA = tlv8.encode([
+    tlv8.Entry(1, 'pairing'),
+    tlv8.Entry(2, [
+        tlv8.Entry(3, b'\x00' * 32),
+        tlv8.Entry(4, 1, tlv8.DataType.UNSIGNED_INTEGER),
+    ]),
+    tlv8.Entry(5, 3.141),
+] * 100)
+
+
+def default_reduce(obj):
+    state = dict(obj.__dict__)
+    if isinstance(obj, tlv8.EntryList):
+        state.update(_segments={}, _segments_separator=None, _raw=None)
+    return copyreg.__newobj__, (obj.__class__,), state
+
+
+def default_dumps(obj):
+    fp = io.BytesIO()
+    pickler = pickle.Pickler(fp, pickle.HIGHEST_PROTOCOL)
+    pickler.dispatch_table = {tlv8.Entry: default_reduce, tlv8.EntryList: default_reduce}
+    pickler.dump(obj)
+    return fp.getvalue()
+
+
+def main():
+    entries = tlv8.decode(DATA, SCHEMA)
+    compact = pickle.dumps(entries, pickle.HIGHEST_PROTOCOL)
+    default = default_dumps(entries)
+    assert pickle.loads(compact) == entries
+    assert pickle.loads(default) == entries
+
+    print('{:40s} {:10d} bytes'.format('default size', len(default)))
+    print('{:40s} {:10d} bytes'.format('compact size', len(compact)))
+    run('default dumps', lambda: default_dumps(entries), 200)
+    run('compact dumps', lambda: pickle.dumps(entries, pickle.HIGHEST_PROTOCOL), 200)
+    run('default loads', lambda: pickle.loads(default), 200)
+    run('compact loads', lambda: pickle.loads(compact), 200)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Compare creating an `tlv8.EntryList` with and without validation (`tlv8.EntryList.from_trusted`).
+
+Run with `python -m benchmarks.trusted` from the root of the repository.
+"""
+
+import tlv8
+from benchmarks.compiled_schema import run
+
+FLAT = [
+    tlv8.Entry(1, b'\x00' * 16),
+    tlv8.Entry(2, 'pairing'),
+    tlv8.Entry(2, 42),
+] * 300
+
+
+def main():
+    checked = run('EntryList(...)', lambda: tlv8.EntryList(FLAT), 2000)
+    trusted = run('EntryList.from_trusted(...)', lambda: tlv8.EntryList.from_trusted(FLAT), 2000)
+    print('{:40s} {:10.2f} x'.format('speedup', checked / trusted))
+
+
+if __name__ == '__main__':
+    main()
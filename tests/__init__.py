@@ -16,7 +16,17 @@
 
 __all__ = [
     'TestTLV8', 'TestTLV8Decode', 'TestTLV8Entry', 'TestTLV8Enum', 'TestTLV8EntryList', 'TestTLV8DeepDecode',
-    'TestTLV8DecodeInteger', 'TestTLV8RealWorld', 'TestTLV8ToJson'
+    'TestTLV8DecodeInteger', 'TestTLV8RealWorld', 'TestTLV8ToJson', 'TestTLV8CompiledSchema',
+    'TestTLV8Record', 'TestTLV8DecodeBulk', 'TestTLV8DecodeColumns',
+    'TestTLV8FormatTo', 'TestTLV8LazyFormat', 'TestTLV8ZeroCopy',
+    'TestTLV8DecodeLimits', 'TestTLV8Template',
+    'TestTLV8IterEncode', 'TestTLV8IncrementalEncode',
+    'TestTLV8KeepRaw', 'TestTLV8Pickle', 'TestTLV8DecodeShared',
+    'TestTLV8Complexity', 'TestTLV8Allocation',
+    'TestTLV8ParseEvents', 'TestTLV8IterTokens',
+    'TestTLV8Trusted', 'TestTLV8EncoderRegistry',
+    'TestTLV8DecoderRegistry', 'TestTLV8Array', 'TestTLV8Hap',
+    'TestTLV8Sequence'
 ]
 
 from tests.tlv8_encode_tests import TestTLV8
@@ -28,3 +38,27 @@ from tests.tlv8_entrylist_tests import TestTLV8EntryList
 from tests.tlv8_decode_integer_tests import TestTLV8DecodeInteger
 from tests.tlv8_real_world_test import TestTLV8RealWorld
 from tests.tlv8_to_json_test import TestTLV8ToJson
+from tests.tlv8_compiled_schema_tests import TestTLV8CompiledSchema
+from tests.tlv8_record_tests import TestTLV8Record
+from tests.tlv8_decode_bulk_tests import TestTLV8DecodeBulk
+from tests.tlv8_decode_columns_tests import TestTLV8DecodeColumns
+from tests.tlv8_format_to_tests import TestTLV8FormatTo
+from tests.tlv8_lazy_format_tests import TestTLV8LazyFormat
+from tests.tlv8_zero_copy_tests import TestTLV8ZeroCopy
+from tests.tlv8_decode_limits_tests import TestTLV8DecodeLimits
+from tests.tlv8_template_tests import TestTLV8Template
+from tests.tlv8_iter_encode_tests import TestTLV8IterEncode
+from tests.tlv8_incremental_encode_tests import TestTLV8IncrementalEncode
+from tests.tlv8_keep_raw_tests import TestTLV8KeepRaw
+from tests.tlv8_pickle_tests import TestTLV8Pickle
+from tests.tlv8_decode_shared_tests import TestTLV8DecodeShared
+from tests.tlv8_complexity_tests import TestTLV8Complexity
+from tests.tlv8_allocation_tests import TestTLV8Allocation
+from tests.tlv8_parse_events_tests import TestTLV8ParseEvents
+from tests.tlv8_iter_tokens_tests import TestTLV8IterTokens
+from tests.tlv8_trusted_tests import TestTLV8Trusted
+from tests.tlv8_encoder_registry_tests import TestTLV8EncoderRegistry
+from tests.tlv8_decoder_registry_tests import TestTLV8DecoderRegistry
+from tests.tlv8_array_tests import TestTLV8Array
+from tests.tlv8_hap_tests import TestTLV8Hap
+from tests.tlv8_sequence_tests import TestTLV8Sequence
@@ -0,0 +1,131 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import enum
+import gc
+import os
+import platform
+import sys
+import tracemalloc
+import unittest
+
+import tlv8
+
+
+class Keys(enum.IntEnum):
+    STATE = 6
+    ERROR = 7
+
+
+class States(enum.IntEnum):
+    M1 = 1
+    M2 = 2
+
+
+# representative payloads as (entries, expected structure)
+PAYLOADS = {
+    'simple': (
+        [tlv8.Entry(1, 42), tlv8.Entry(2, 'hello'), tlv8.Entry(3, b'\x00' * 16), tlv8.Entry(4, 3.5)],
+        {1: tlv8.DataType.INTEGER, 2: tlv8.DataType.STRING, 3: tlv8.DataType.BYTES, 4: tlv8.DataType.FLOAT},
+    ),
+    'nested': (
+        [tlv8.Entry(1, [tlv8.Entry(2, [tlv8.Entry(3, index), tlv8.Entry(4, 'x')]) for index in range(10)])],
+        {1: {2: {3: tlv8.DataType.INTEGER, 4: tlv8.DataType.STRING}}},
+    ),
+    'fragmented': (
+        [tlv8.Entry(1, b'\x01' * 4000), tlv8.Entry(2, b'\x02' * 300)],
+        {1: tlv8.DataType.BYTES, 2: tlv8.DataType.BYTES},
+    ),
+    'enum': (
+        [tlv8.Entry(Keys.STATE, States.M2), tlv8.Entry(Keys.ERROR, 1)],
+        {Keys.STATE: States, Keys.ERROR: tlv8.DataType.INTEGER},
+    ),
+}
+
+# budgets per operation and payload as (peak traced bytes, allocated blocks still in use by the result). They are
+# about 1.5 times the largest values measured with CPython 3.6 to 3.13, older versions need the most memory. Scale them
+# with the environment variable TLV8_ALLOCATION_BUDGET (e.g. 0.75 to tighten them), set TLV8_ALLOCATION_REPORT to print
+# the measured values.
+BUDGETS = {
+    ('encode', 'simple'): (1300, 15),
+    ('encode', 'nested'): (9300, 30),
+    ('encode', 'fragmented'): (20000, 20),
+    ('encode', 'enum'): (1100, 15),
+    ('decode', 'simple'): (4600, 65),
+    ('decode', 'nested'): (30000, 325),
+    ('decode', 'fragmented'): (17000, 50),
+    ('decode', 'enum'): (4200, 50),
+    ('decode_raw', 'simple'): (2800, 45),
+    ('decode_raw', 'nested'): (1800, 30),
+    ('decode_raw', 'fragmented'): (17000, 35),
+    ('decode_raw', 'enum'): (2000, 30),
+    ('deep_decode', 'simple'): (7500, 75),
+    ('deep_decode', 'nested'): (34000, 410),
+    ('deep_decode', 'fragmented'): (400000, 505),
+    ('deep_decode', 'enum'): (4900, 40),
+}
+
+OPERATIONS = {
+    'encode': lambda entries, data, expected: tlv8.encode(entries),
+    'decode': lambda entries, data, expected: tlv8.decode(data, expected),
+    'decode_raw': lambda entries, data, expected: tlv8.decode(data),
+    'deep_decode': lambda entries, data, expected: tlv8.deep_decode(data),
+}
+
+
+def measure(function, *args):
+    """
+    Measure the memory needed for one call of function. The function is called once before to exclude one-time
+    allocations (e.g. of caches).
+
+    :return: a tuple of the peak of traced memory in bytes during the call and the number of allocated memory blocks
+        the result of the call still uses afterwards
+    """
+    function(*args)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        blocks = sys.getallocatedblocks()
+        baseline = tracemalloc.get_traced_memory()[0]
+        result = function(*args)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+        blocks = sys.getallocatedblocks() - blocks
+    finally:
+        tracemalloc.stop()
+    del result
+    return peak, blocks
+
+
+@unittest.skipIf(platform.python_implementation() != 'CPython', 'allocation budgets are measured for CPython')
+class TestTLV8Allocation(unittest.TestCase):
+
+    def test_budgets(self):
+        factor = float(os.environ.get('TLV8_ALLOCATION_BUDGET', '1'))
+        report = 'TLV8_ALLOCATION_REPORT' in os.environ
+        for (operation, payload), (peak_budget, blocks_budget) in sorted(BUDGETS.items()):
+            entries, expected = PAYLOADS[payload]
+            data = tlv8.encode(entries)
+            peak, blocks = measure(OPERATIONS[operation], entries, data, expected)
+            if report:
+                print('{o:12s} {p:12s} peak {pe:8d} bytes, {b:5d} blocks'.format(
+                    o=operation, p=payload, pe=peak, b=blocks))
+            with self.subTest(operation=operation, payload=payload):
+                self.assertLessEqual(peak, peak_budget * factor, 'peak memory in bytes')
+                self.assertLessEqual(blocks, blocks_budget * factor, 'allocated blocks of result')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import array
+import struct
+import unittest
+
+import tlv8
+
+
+class TestTLV8Array(unittest.TestCase):
+    structure = {
+        1: tlv8.DataType.UINT8_ARRAY,
+        2: tlv8.DataType.UINT16_ARRAY,
+        3: tlv8.DataType.UINT32_ARRAY,
+        4: tlv8.DataType.FLOAT_ARRAY,
+    }
+    data = b'\x01\x03\x01\x02\x03' + b'\x02\x04\x01\x00\x00\x01' + b'\x03\x04\xff\xff\xff\xff' + \
+        b'\x04\x08' + struct.pack('<ff', 1.5, -2.0)
+
+    def test_decode(self):
+        result = tlv8.decode(self.data, self.structure)
+        self.assertEqual([1, 2, 3], result[0].data.tolist())
+        self.assertEqual([1, 256], result[1].data.tolist())
+        self.assertEqual([0xffffffff], result[2].data.tolist())
+        self.assertEqual([1.5, -2.0], result[3].data.tolist())
+        for entry in result:
+            self.assertIsInstance(entry.data, array.array)
+
+    def test_decode_zero_copy(self):
+        result = tlv8.decode(self.data, self.structure, zero_copy=True)
+        self.assertEqual([1, 2, 3], result[0].data.tolist())
+        self.assertEqual([1, 256], result[1].data.tolist())
+        self.assertEqual([0xffffffff], result[2].data.tolist())
+        self.assertEqual([1.5, -2.0], result[3].data.tolist())
+
+    def test_decode_fragmented(self):
+        values = list(range(300))
+        data = tlv8.encode([tlv8.Entry(2, struct.pack('<300H', *values))])
+        self.assertEqual(values, tlv8.decode(data, self.structure)[0].data.tolist())
+        self.assertEqual(values, tlv8.decode(data, self.structure, zero_copy=True)[0].data.tolist())
+
+    def test_decode_invalid_length(self):
+        self.assertRaises(ValueError, tlv8.decode, b'\x02\x03\x01\x02\x03', self.structure)
+        self.assertRaises(ValueError, tlv8.decode, b'\x03\x02\x01\x02', self.structure)
+
+    def test_encode(self):
+        entries = [
+            tlv8.Entry(1, [1, 2, 3], tlv8.DataType.UINT8_ARRAY),
+            tlv8.Entry(2, array.array('H', [1, 256]), tlv8.DataType.UINT16_ARRAY),
+            tlv8.Entry(3, (0xffffffff,), tlv8.DataType.UINT32_ARRAY),
+            tlv8.Entry(4, [1.5, -2], tlv8.DataType.FLOAT_ARRAY),
+        ]
+        self.assertEqual(self.data, tlv8.encode(entries))
+
+    def test_encode_fragmented(self):
+        values = list(range(300))
+        entries = [tlv8.Entry(2, values, tlv8.DataType.UINT16_ARRAY)]
+        self.assertEqual(tlv8.encode([tlv8.Entry(2, struct.pack('<300H', *values))]), tlv8.encode(entries))
+        self.assertEqual(tlv8.encode(entries), b''.join(tlv8.iter_encode(entries)))
+
+    def test_encode_decoded(self):
+        self.assertEqual(self.data, tlv8.encode(tlv8.decode(self.data, self.structure)))
+        self.assertEqual(self.data, tlv8.encode(tlv8.decode(self.data, self.structure, zero_copy=True)))
+
+    def test_encode_out_of_range(self):
+        self.assertRaises(ValueError, tlv8.encode, [tlv8.Entry(1, [256], tlv8.DataType.UINT8_ARRAY)])
+        self.assertRaises(ValueError, tlv8.encode, [tlv8.Entry(2, [-1], tlv8.DataType.UINT16_ARRAY)])
+        self.assertRaises(ValueError, tlv8.encode, [tlv8.Entry(4, ['a'], tlv8.DataType.FLOAT_ARRAY)])
+
+    def test_compiled_schema(self):
+        compiled = tlv8.compile_schema(self.structure)
+        self.assertEqual(tlv8.decode(self.data, self.structure), compiled.decode(self.data))
+        self.assertEqual(self.data, compiled.encode(compiled.decode(self.data)))
+
+    def test_format_zero_copy(self):
+        result = tlv8.decode(b'\x02\x04\x01\x00\x00\x01', self.structure, zero_copy=True)
+        self.assertEqual('[\n  <2, [1, 256]>,\n]', tlv8.format_string(result))
@@ -0,0 +1,137 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+import enum
+
+import tlv8
+
+
+class Keys(enum.IntEnum):
+    State = 6
+    Error = 7
+
+
+class States(enum.IntEnum):
+    M1 = 1
+    M2 = 2
+
+
+class TestTLV8CompiledSchema(unittest.TestCase):
+    structure = {
+        1: tlv8.DataType.FLOAT,
+        2: {
+            3: tlv8.DataType.STRING,
+            4: tlv8.DataType.STRING,
+        },
+        3: tlv8.DataType.INTEGER,
+        5: tlv8.DataType.UNSIGNED_INTEGER,
+        8: tlv8.DataType.BYTES,
+    }
+
+    def test_decode_equals_generic_decode(self):
+        data = b'\x01\x04%\x06I@\x02\x0e\x03\x05hello\x04\x05world\x03\x01\x02\x05\x02\xff\xff\x08\x02ab'
+        compiled = tlv8.compile_schema(self.structure)
+        result = compiled.decode(data)
+        self.assertIsInstance(result, tlv8.EntryList)
+        self.assertEqual(tlv8.decode(data, self.structure), result)
+        self.assertEqual(65535, result.first_by_id(5).data)
+        self.assertEqual('world', result.first_by_id(2).data.first_by_id(4).data)
+
+    def test_decode_bytearray(self):
+        compiled = tlv8.compile_schema({2: tlv8.DataType.INTEGER})
+        self.assertEqual(tlv8.EntryList([tlv8.Entry(2, 0x23)]), compiled.decode(bytearray(b'\x02\x01\x23')))
+
+    def test_decode_wrong_input_type(self):
+        compiled = tlv8.compile_schema({2: tlv8.DataType.INTEGER})
+        self.assertRaises(ValueError, compiled.decode, 'foo')
+
+    def test_decode_fragmented(self):
+        value = bytes(range(256)) * 2
+        data = tlv8.encode([tlv8.Entry(8, value), tlv8.Entry(3, 1)])
+        result = tlv8.compile_schema(self.structure).decode(data)
+        self.assertEqual(value, result.first_by_id(8).data)
+        self.assertEqual(1, result.first_by_id(3).data)
+
+    def test_decode_stops_at_unexpected(self):
+        data = b'\x03\x01\x01\x09\x01\x01\x03\x01\x02'
+        self.assertEqual(tlv8.EntryList([tlv8.Entry(3, 1)]), tlv8.compile_schema(self.structure).decode(data))
+
+    def test_decode_strict_mode(self):
+        data = b'\x03\x01\x01\x03\x01\x02'
+        compiled = tlv8.compile_schema(self.structure)
+        self.assertEqual(2, len(compiled.decode(data)))
+        self.assertRaises(ValueError, compiled.decode, data, strict_mode=True)
+
+    def test_decode_enums(self):
+        compiled = tlv8.compile_schema({Keys.State: States, Keys.Error: tlv8.DataType.INTEGER})
+        result = compiled.decode(b'\x06\x01\x02\x07\x01\x01')
+        self.assertIs(result[0].type_id, Keys.State)
+        self.assertIs(result[0].data, States.M2)
+        self.assertIs(result[1].type_id, Keys.Error)
+        self.assertEqual(tlv8.decode(b'\x06\x01\x02\x07\x01\x01', {Keys.State: States, Keys.Error: 3}), result)
+
+    def test_decode_int_and_enum_keys_are_cached_separately(self):
+        int_compiled = tlv8.compile_schema({6: tlv8.DataType.INTEGER})
+        enum_compiled = tlv8.compile_schema({Keys.State: tlv8.DataType.INTEGER})
+        self.assertIsNot(int_compiled, enum_compiled)
+        self.assertNotIsInstance(int_compiled.decode(b'\x06\x01\x02')[0].type_id, Keys)
+        self.assertIsInstance(enum_compiled.decode(b'\x06\x01\x02')[0].type_id, Keys)
+
+    def test_decode_unknown_data_type(self):
+        compiled = tlv8.compile_schema({1: tlv8.DataType.AUTODETECT})
+        self.assertEqual(tlv8.EntryList(), compiled.decode(b''))
+        self.assertRaises(ValueError, compiled.decode, b'\x01\x01\x01')
+
+    def test_empty_schema(self):
+        compiled = tlv8.compile_schema({})
+        self.assertEqual(tlv8.decode(b'\x01\x01\x01\x02\x00'), compiled.decode(b'\x01\x01\x01\x02\x00'))
+
+    def test_cache(self):
+        self.assertIs(tlv8.compile_schema(dict(self.structure)), tlv8.compile_schema(self.structure))
+
+    def test_encode_equals_generic_encode(self):
+        data = tlv8.EntryList([
+            tlv8.Entry(1, 3.141, tlv8.DataType.FLOAT),
+            tlv8.Entry(2, [
+                tlv8.Entry(3, 'hello'),
+                tlv8.Entry(4, 'world'),
+            ], self.structure[2]),
+            tlv8.Entry(3, -2, tlv8.DataType.INTEGER),
+            tlv8.Entry(3, 70000, tlv8.DataType.INTEGER),
+            tlv8.Entry(5, 255, tlv8.DataType.UNSIGNED_INTEGER),
+            tlv8.Entry(8, b'\x00' * 300, tlv8.DataType.BYTES),
+            tlv8.Entry(9, 'not in schema'),
+        ])
+        compiled = tlv8.compile_schema(self.structure)
+        self.assertEqual(tlv8.encode(data), compiled.encode(data))
+        self.assertEqual(tlv8.encode(data, 0xfe), compiled.encode(data, 0xfe))
+
+    def test_encode_decoded(self):
+        data = b'\x06\x01\x02\x07\x01\x01\xff\x00\x07\x01\x02'
+        compiled = tlv8.compile_schema({Keys.State: States, Keys.Error: tlv8.DataType.INTEGER})
+        self.assertEqual(data, compiled.encode(compiled.decode(data)))
+
+    def test_encode_length_overwrite(self):
+        data = [tlv8.Entry(3, 1, tlv8.DataType.INTEGER, length=4)]
+        self.assertEqual(b'\x03\x04\x01\x00\x00\x00', tlv8.compile_schema(self.structure).encode(data))
+
+    def test_encode_errors(self):
+        compiled = tlv8.compile_schema(self.structure)
+        self.assertRaises(ValueError, compiled.encode, 'foo')
+        self.assertRaises(ValueError, compiled.encode, ['foo'])
+        self.assertRaises(ValueError, compiled.encode, [tlv8.Entry(255, b'')])
+        self.assertRaises(ValueError, compiled.encode, [tlv8.Entry(3, 2 ** 64, tlv8.DataType.INTEGER)])
@@ -0,0 +1,143 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import gc
+import os
+import time
+import unittest
+
+import tlv8
+
+# worst case inputs for decoding, each function creates an input whose size is proportional to n
+DECODE_CORPUS = {
+    'zero length entries': lambda n: b'\x01\x00' * n,
+    'alternating zero length entries': lambda n: b'\x01\x00\x02\x00' * (n // 2),
+    'fragment chain': lambda n: b'\x01\xff' + b'\x00' * 255 + (b'\x01\xff' + b'\x01' * 255) * (n // 128),
+    'separator run': lambda n: b'\x01\x01\x00' + b'\xff\x00' * n + b'\x01\x01\x00',
+    'unexpected type': lambda n: b'\x01\x01\x00' * n + b'\x09\x01\x00' + b'\x01\x01\x00' * n,
+    'nested chains': lambda n: tlv8.encode([_nested_chain(20)] * (n // 40)),
+    'values that look nested': lambda n: b'\x01\x06' + b'\x01\x04\x01\x02\x01\x00' * n,
+}
+
+# worst case inputs for encoding and formatting
+ENCODE_CORPUS = {
+    'same type entries': lambda n: [tlv8.Entry(1, b'')] * n,
+    'large value': lambda n: [tlv8.Entry(1, b'\x00' * (n * 64))],
+    'nested chains': lambda n: [_nested_chain(20)] * (n // 20),
+    'wide nested list': lambda n: [tlv8.Entry(1, [tlv8.Entry(2, index) for index in range(n)])],
+}
+
+EXPECTED = {
+    1: tlv8.DataType.BYTES,
+    2: tlv8.DataType.BYTES,
+    0xff: tlv8.DataType.BYTES,
+}
+
+
+def _nested_chain(depth):
+    entry = tlv8.Entry(3, b'\x00')
+    for _ in range(depth):
+        entry = tlv8.Entry(2, [entry])
+    return entry
+
+
+def _wrap(type_id, value):
+    # same as tlv8.Entry(type_id, value).encode() for bytes values
+    chunks = [value[start:start + 255] for start in range(0, len(value), 255)] or [b'']
+    return b''.join(bytes([type_id, len(chunk)]) + chunk for chunk in chunks)
+
+
+# the timing tests take a while and need a machine that is not too busy, so they only run if this is set
+timing_tests = unittest.skipUnless('TLV8_COMPLEXITY_TESTS' in os.environ, 'set TLV8_COMPLEXITY_TESTS to run')
+
+
+def _timing(function, argument):
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        function(argument)
+        return time.perf_counter() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+class TestTLV8Complexity(unittest.TestCase):
+    """
+    Make sure that no input leads to super-linear run time: the run time for an input of 4 times the size must stay
+    well below 16 times (quadratic) the run time of the original input. The inputs are first grown until a single run
+    takes long enough to be measured reliably. Both sizes are timed alternately, so a temporary load of the machine
+    affects both of them.
+
+    Except for test_deep_nesting, these tests only run if the environment variable TLV8_COMPLEXITY_TESTS is set.
+    """
+
+    max_ratio = 8
+    min_duration = 0.05
+
+    def assertLinear(self, name, generate, function, n=1000):
+        while _timing(function, generate(n)) < self.min_duration:
+            n *= 2
+        small_input = generate(n)
+        large_input = generate(4 * n)
+        small = large = float('inf')
+        for _ in range(3):
+            small = min(small, _timing(function, small_input))
+            large = min(large, _timing(function, large_input))
+        self.assertLess(large / small, self.max_ratio,
+                        '{name}: {s:.4f}s for n={n}, {l:.4f}s for n={n4}'.format(
+                            name=name, s=small, l=large, n=n, n4=4 * n))
+
+    @timing_tests
+    def test_decode(self):
+        for name, generate in DECODE_CORPUS.items():
+            self.assertLinear(name, generate, tlv8.decode)
+            self.assertLinear(name, generate, lambda data: tlv8.decode(data, EXPECTED))
+
+    @timing_tests
+    def test_deep_decode(self):
+        for name, generate in DECODE_CORPUS.items():
+            self.assertLinear(name, generate, tlv8.deep_decode)
+
+    @timing_tests
+    def test_encode(self):
+        for name, generate in ENCODE_CORPUS.items():
+            self.assertLinear(name, generate, tlv8.encode)
+
+    @timing_tests
+    def test_format_string(self):
+        for name, generate in ENCODE_CORPUS.items():
+            self.assertLinear(name, generate, tlv8.format_string)
+
+    def test_deep_nesting(self):
+        # nested deeper than the recursion limit, deep_decode leaves the innermost levels undecoded. The size grows
+        # exponentially with the depth because of the fragment headers of each level, so this is about 750kB.
+        data = b''
+        for _ in range(1100):
+            data = _wrap(1, data)
+        start = time.perf_counter()
+        result = tlv8.deep_decode(data)
+        self.assertLess(time.perf_counter() - start, 5)
+        self.assertEqual(1, len(result))
+        result = tlv8.deep_decode(data, limits=tlv8.DecodeLimits(max_depth=10))
+        for _ in range(9):
+            result = result[0].data
+        self.assertIsInstance(result[0].data, bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import array
+import unittest
+
+import tlv8
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class TestTLV8DecodeBulk(unittest.TestCase):
+    structure = {
+        1: tlv8.DataType.FLOAT,
+        2: tlv8.DataType.STRING,
+        3: tlv8.DataType.UNSIGNED_INTEGER,
+        4: tlv8.DataType.INTEGER,
+    }
+
+    def _data(self):
+        return tlv8.encode(
+            [tlv8.Entry(1, i / 2) for i in range(40)] +
+            [tlv8.Entry(2, 'hello')] +
+            [tlv8.Entry(3, i, tlv8.DataType.UNSIGNED_INTEGER, length=2) for i in range(30)] +
+            [tlv8.Entry(4, -5)] +
+            [tlv8.Entry(1, 7.5)]
+        )
+
+    def _check(self, result, array_type):
+        self.assertEqual(5, len(result))
+        self.assertEqual(1, result[0].type_id)
+        self.assertIsInstance(result[0].data, array_type)
+        self.assertEqual([i / 2 for i in range(40)], list(result[0].data))
+        self.assertEqual(tlv8.Entry(2, 'hello'), result[1])
+        self.assertIsInstance(result[2].data, array_type)
+        self.assertEqual(list(range(30)), list(result[2].data))
+        self.assertEqual(tlv8.Entry(4, -5), result[3])
+        self.assertEqual(tlv8.Entry(1, 7.5), result[4])
+
+    def test_array_fallback(self):
+        result = tlv8.decode_bulk(self._data(), self.structure, use_numpy=False)
+        self._check(result, array.array)
+        self.assertEqual('f', result[0].data.typecode)
+        self.assertEqual(2, result[2].data.itemsize)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        result = tlv8.decode_bulk(self._data(), self.structure, use_numpy=True)
+        self._check(result, numpy.ndarray)
+        self.assertEqual(numpy.dtype('<f4'), result[0].data.dtype)
+        self.assertEqual(numpy.dtype('<u2'), result[2].data.dtype)
+
+    @unittest.skipIf(numpy is not None, 'numpy is installed')
+    def test_numpy_required(self):
+        self.assertRaises(ImportError, tlv8.decode_bulk, self._data(), self.structure, use_numpy=True)
+
+    def test_signed_integers_split_by_length(self):
+        data = tlv8.encode([tlv8.Entry(4, v) for v in [1, -2, 3, 1000, -1000]])
+        result = tlv8.decode_bulk(data, self.structure, use_numpy=False)
+        self.assertEqual(2, len(result))
+        self.assertEqual([1, -2, 3], list(result[0].data))
+        self.assertEqual([1000, -1000], list(result[1].data))
+
+    def test_same_as_decode_without_runs(self):
+        data = b'\x01\x04%\x06I@\x02\x05hello\x04\x01\x02\x03\x01\x01'
+        for use_numpy in [False, None]:
+            self.assertEqual(tlv8.decode(data, self.structure),
+                             tlv8.decode_bulk(data, self.structure, use_numpy=use_numpy))
+
+    def test_stops_at_unexpected(self):
+        data = tlv8.encode([tlv8.Entry(1, 1.0), tlv8.Entry(1, 2.0), tlv8.Entry(9, b'x'), tlv8.Entry(2, 'a')])
+        for use_numpy in [False, None]:
+            result = tlv8.decode_bulk(data, self.structure, use_numpy=use_numpy)
+            self.assertEqual(1, len(result))
+            self.assertEqual([1.0, 2.0], list(result[0].data))
+
+    def test_other_separator(self):
+        data = tlv8.encode([tlv8.Entry(1, 1.0), tlv8.Entry(1, 2.0)], separator_type_id=0x10)
+        for use_numpy in [False, None]:
+            result = tlv8.decode_bulk(data, self.structure, separator_type_id=0x10, use_numpy=use_numpy)
+            self.assertEqual([1.0, 2.0], list(result[0].data))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, tlv8.decode_bulk, 'foo', self.structure)
+        data = tlv8.encode([tlv8.Entry(1, 1.0), tlv8.Entry(1, 2.0)])
+        for use_numpy in [False, None]:
+            self.assertRaises(ValueError, tlv8.decode_bulk, data + b'\x02\x05hel', self.structure,
+                              use_numpy=use_numpy)
+            self.assertRaises(ValueError, tlv8.decode_bulk, data + b'\x02', self.structure, use_numpy=use_numpy)
+
+    def test_strict_mode(self):
+        value = tlv8.encode([tlv8.Entry(1, 1.0)])
+        separator = b'\xff\x00'
+        # the missing separator directly after a run
+        data = value + separator + value + value
+        self.assertRaises(ValueError, tlv8.decode, data, self.structure, strict_mode=True)
+        valid = value + separator + value + tlv8.encode([tlv8.Entry(4, 1)]) + value
+        for use_numpy in [False, None]:
+            self.assertRaises(ValueError, tlv8.decode_bulk, data, self.structure, strict_mode=True,
+                              use_numpy=use_numpy)
+            # the run and the entry after it
+            self.assertEqual(2, len(tlv8.decode_bulk(data, self.structure, use_numpy=use_numpy)))
+            self.assertEqual(3, len(tlv8.decode_bulk(valid, self.structure, strict_mode=True, use_numpy=use_numpy)))
+
+    def test_no_expected(self):
+        data = b'\x01\x01\x01'
+        self.assertEqual(tlv8.decode(data), tlv8.decode_bulk(data, None))
@@ -0,0 +1,95 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import array
+import enum
+import unittest
+
+import tlv8
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class Keys(enum.IntEnum):
+    State = 6
+
+
+class States(enum.IntEnum):
+    M1 = 1
+    M2 = 2
+
+
+class TestTLV8DecodeColumns(unittest.TestCase):
+    schema = {
+        1: tlv8.DataType.FLOAT,
+        2: tlv8.DataType.STRING,
+        3: tlv8.DataType.INTEGER,
+        4: tlv8.DataType.UNSIGNED_INTEGER,
+        5: {7: tlv8.DataType.INTEGER},
+        Keys.State: States,
+    }
+
+    buffers = [
+        tlv8.encode([tlv8.Entry(1, 1.5), tlv8.Entry(2, 'a'), tlv8.Entry(3, -1), tlv8.Entry(6, States.M1)]),
+        tlv8.encode([tlv8.Entry(3, 1000), tlv8.Entry(3, 2000), tlv8.Entry(4, 2 ** 63, tlv8.DataType.UNSIGNED_INTEGER)]),
+        bytearray(tlv8.encode([tlv8.Entry(5, [tlv8.Entry(7, 3)]), tlv8.Entry(6, States.M2)])),
+    ]
+
+    def _check(self, result):
+        self.assertEqual(set(self.schema), set(result))
+        self.assertEqual([1.5, 0.0, 0.0], list(result[1].values))
+        self.assertEqual([1, 0, 0], [int(p) for p in result[1].present])
+        self.assertEqual(['a', None, None], result[2].values)
+        self.assertEqual([-1, 1000, 0], list(result[3].values))
+        self.assertEqual([1, 1, 0], [int(p) for p in result[3].present])
+        self.assertEqual([0, 2 ** 63, 0], [int(v) for v in result[4].values])
+        self.assertEqual([None, None, tlv8.EntryList([tlv8.Entry(7, 3)])], result[5].values)
+        self.assertEqual([States.M1, None, States.M2], result[Keys.State].values)
+        self.assertEqual([1, 0, 1], [int(p) for p in result[Keys.State].present])
+
+    def test_array_fallback(self):
+        result = tlv8.decode_columns(self.buffers, self.schema, use_numpy=False)
+        self._check(result)
+        self.assertIsInstance(result[1].values, array.array)
+        self.assertIsInstance(result[1].present, bytearray)
+        self.assertIsInstance(result[2].values, list)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy(self):
+        result = tlv8.decode_columns(iter(self.buffers), self.schema, use_numpy=True)
+        self._check(result)
+        self.assertEqual(numpy.dtype('float64'), result[1].values.dtype)
+        self.assertEqual(numpy.dtype('uint64'), result[4].values.dtype)
+        self.assertEqual(numpy.dtype('bool'), result[1].present.dtype)
+
+    def test_column(self):
+        result = tlv8.decode_columns([b'\x03\x01\x01'], {3: tlv8.DataType.INTEGER}, use_numpy=False)
+        self.assertEqual(tlv8.Column(array.array(result[3].values.typecode, [1]), bytearray([1])), result[3])
+
+    def test_empty(self):
+        result = tlv8.decode_columns([], self.schema, use_numpy=False)
+        self.assertEqual(0, len(result[1].values))
+        self.assertEqual(0, len(result[1].present))
+
+    def test_errors(self):
+        self.assertRaises(ValueError, tlv8.decode_columns, ['foo'], self.schema)
+        self.assertRaises(ValueError, tlv8.decode_columns, [b'\x01'], self.schema)
+        self.assertRaises(ValueError, tlv8.decode_columns, [b'\x03\x01\x01\x03\x01\x02'], self.schema,
+                          strict_mode=True)
+        self.assertRaises(ValueError, tlv8.decode_columns, [], {1: tlv8.DataType.AUTODETECT})
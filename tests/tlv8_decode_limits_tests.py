@@ -0,0 +1,139 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+
+import tlv8
+
+
+class TestTLV8DecodeLimits(unittest.TestCase):
+    structure = {
+        1: tlv8.DataType.INTEGER,
+        2: {
+            3: tlv8.DataType.STRING,
+            4: {
+                5: tlv8.DataType.BYTES,
+            },
+        },
+    }
+    data = tlv8.encode([
+        tlv8.Entry(1, 42),
+        tlv8.Entry(2, [
+            tlv8.Entry(3, 'hello'),
+            tlv8.Entry(4, [
+                tlv8.Entry(5, b'\x01\x02'),
+            ]),
+        ]),
+    ])
+
+    def test_no_limits(self):
+        limits = tlv8.DecodeLimits()
+        self.assertEqual(tlv8.decode(self.data, self.structure), tlv8.decode(self.data, self.structure, limits=limits))
+        self.assertEqual(tlv8.deep_decode(self.data), tlv8.deep_decode(self.data, limits=limits))
+
+    def test_error_is_value_error(self):
+        self.assertTrue(issubclass(tlv8.LimitExceededError, ValueError))
+
+    def test_max_entries(self):
+        # the whole tree contains 5 entries
+        tlv8.decode(self.data, self.structure, limits=tlv8.DecodeLimits(max_entries=5))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode, self.data, self.structure,
+                          limits=tlv8.DecodeLimits(max_entries=4))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.deep_decode, self.data + b'\x06\x00\x07\x00\x06\x00',
+                          limits=tlv8.DecodeLimits(max_entries=4))
+        # deep_decode keeps values as bytes if decoding them as nested lists would exceed the limit
+        result = tlv8.deep_decode(self.data, limits=tlv8.DecodeLimits(max_entries=4))
+        self.assertIsInstance(result[1].data, tlv8.EntryList)
+        self.assertIsInstance(result[1].data[1].data, bytes)
+        result = tlv8.deep_decode(self.data, limits=tlv8.DecodeLimits(max_entries=2))
+        self.assertIsInstance(result[1].data, bytes)
+
+    def test_max_entries_separators(self):
+        data = b'\x01\x01\x01\xff\x00\x01\x01\x02'
+        self.assertEqual(3, len(tlv8.decode(data, limits=tlv8.DecodeLimits(max_entries=3))))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode, data, limits=tlv8.DecodeLimits(max_entries=2))
+
+    def test_max_value_size(self):
+        data = tlv8.encode([tlv8.Entry(1, b'\x00' * 300)])
+        self.assertEqual(300, len(tlv8.decode(data, limits=tlv8.DecodeLimits(max_value_size=300))[0].data))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode, data, limits=tlv8.DecodeLimits(max_value_size=299))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode, data, limits=tlv8.DecodeLimits(max_value_size=10))
+
+    def test_max_fragments(self):
+        data = tlv8.encode([tlv8.Entry(1, b'\x00' * 600)])
+        self.assertEqual(600, len(tlv8.decode(data, limits=tlv8.DecodeLimits(max_fragments=3))[0].data))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode, data, limits=tlv8.DecodeLimits(max_fragments=2))
+
+    def test_max_depth_decode(self):
+        tlv8.decode(self.data, self.structure, limits=tlv8.DecodeLimits(max_depth=3))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode, self.data, self.structure,
+                          limits=tlv8.DecodeLimits(max_depth=2))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode, self.data, self.structure,
+                          limits=tlv8.DecodeLimits(max_depth=1))
+
+    def test_max_depth_deep_decode(self):
+        result = tlv8.deep_decode(self.data, limits=tlv8.DecodeLimits(max_depth=1))
+        self.assertEqual(b'*', result[0].data)
+        self.assertIsInstance(result[1].data, bytes)
+        result = tlv8.deep_decode(self.data, limits=tlv8.DecodeLimits(max_depth=2))
+        self.assertIsInstance(result[1].data, tlv8.EntryList)
+        self.assertIsInstance(result[1].data[1].data, bytes)
+
+    def test_compiled_schema(self):
+        schema = tlv8.compile_schema(self.structure)
+        self.assertEqual(tlv8.decode(self.data, self.structure),
+                         schema.decode(self.data, limits=tlv8.DecodeLimits(max_entries=5, max_depth=3)))
+        self.assertRaises(tlv8.LimitExceededError, schema.decode, self.data, limits=tlv8.DecodeLimits(max_entries=4))
+        self.assertRaises(tlv8.LimitExceededError, schema.decode, self.data, limits=tlv8.DecodeLimits(max_depth=2))
+
+    def test_hostile_input(self):
+        # many tiny entries
+        data = b'\x01\x00\x02\x00' * 100000
+        self.assertRaises(tlv8.LimitExceededError, tlv8.deep_decode, data, limits=tlv8.DecodeLimits(max_entries=1000))
+        # many empty fragments of one value
+        data = b'\x01\x00' * 100000
+        self.assertRaises(tlv8.LimitExceededError, tlv8.deep_decode, data, limits=tlv8.DecodeLimits(max_fragments=16))
+        # a deeply nested structure
+        data = b''
+        for _ in range(50):
+            data = tlv8.encode([tlv8.Entry(1, data + b'\x02\x00')])
+        result = tlv8.deep_decode(data, limits=tlv8.DecodeLimits(max_entries=20))
+        self.assertLessEqual(self._count_entries(result), 20)
+        result = tlv8.deep_decode(data, limits=tlv8.DecodeLimits(max_depth=10))
+        self.assertEqual(1, len(result))
+
+    def test_deep_decode_speculative_entries(self):
+        # the value looks like a list of 21 entries but is no valid TLV8
+        data = tlv8.encode([tlv8.Entry(1, b'\x01\x00\x02\x00' * 10 + b'\x01')])
+        self.assertEqual(tlv8.deep_decode(data), tlv8.deep_decode(data, limits=tlv8.DecodeLimits(max_entries=10)))
+        self.assertIsInstance(tlv8.deep_decode(data, limits=tlv8.DecodeLimits(max_entries=10))[0].data, bytes)
+        # the entries of the resulting lists still count
+        more = b'\x02\x00\x03\x00' * 5
+        self.assertEqual(10, len(tlv8.deep_decode(data + more[:-2], limits=tlv8.DecodeLimits(max_entries=10))))
+        self.assertRaises(tlv8.LimitExceededError, tlv8.deep_decode, data + more,
+                          limits=tlv8.DecodeLimits(max_entries=10))
+
+    def _count_entries(self, entries):
+        return sum(1 + (self._count_entries(entry.data) if isinstance(entry.data, tlv8.EntryList) else 0)
+                   for entry in entries)
+
+    def test_repr(self):
+        self.assertEqual('<DecodeLimits max_entries=1, max_value_size=None, max_depth=None, max_fragments=None>',
+                         repr(tlv8.DecodeLimits(max_entries=1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
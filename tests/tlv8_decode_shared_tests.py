@@ -0,0 +1,112 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import multiprocessing
+import multiprocessing.pool
+import unittest
+
+import tlv8
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
+
+
+def first_value(entries):
+    return entries[0].data
+
+
+@unittest.skipIf(shared_memory is None, 'multiprocessing.shared_memory is not available')
+class TestTLV8DecodeShared(unittest.TestCase):
+    structure = {
+        1: tlv8.DataType.INTEGER,
+        2: {
+            3: tlv8.DataType.STRING,
+            4: tlv8.DataType.BYTES,
+        },
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        records = [
+            tlv8.encode([
+                tlv8.Entry(1, index),
+                tlv8.Entry(2, [tlv8.Entry(3, 'record {}'.format(index)), tlv8.Entry(4, b'\x00' * (index % 300))]),
+            ])
+            for index in range(100)
+        ]
+        cls.data = b''.join(records)
+        cls.offsets = []
+        position = 0
+        for record in records:
+            cls.offsets.append((position, position + len(record)))
+            position += len(record)
+        cls.expected = [tlv8.decode(record, cls.structure) for record in records]
+        cls.pool = multiprocessing.Pool(2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.close()
+        cls.pool.join()
+
+    def test_shared_memory(self):
+        block = shared_memory.SharedMemory(create=True, size=len(self.data))
+        try:
+            block.buf[:len(self.data)] = self.data
+            result = tlv8.decode_shared(block, self.offsets, self.structure, pool=self.pool, chunk_size=7)
+            self.assertEqual(self.expected, result)
+            # the block is still usable after decoding
+            self.assertEqual(self.data[:10], bytes(block.buf[:10]))
+        finally:
+            block.close()
+            block.unlink()
+
+    def test_thread_pool(self):
+        # the tasks attach to the block within this process
+        pool = multiprocessing.pool.ThreadPool(2)
+        try:
+            self.assertEqual(self.expected, tlv8.decode_shared(self.data, self.offsets, self.structure, pool=pool))
+        finally:
+            pool.close()
+            pool.join()
+
+    def test_bytes(self):
+        self.assertEqual(self.expected, tlv8.decode_shared(self.data, self.offsets, self.structure, pool=self.pool))
+        self.assertEqual([tlv8.decode(self.data[:3])],
+                         tlv8.decode_shared(bytearray(self.data), [(0, 3)], pool=self.pool))
+
+    def test_own_pool(self):
+        self.assertEqual(self.expected[:10],
+                         tlv8.decode_shared(self.data, self.offsets[:10], self.structure, processes=2))
+
+    def test_function(self):
+        result = tlv8.decode_shared(self.data, self.offsets, self.structure, pool=self.pool, function=first_value)
+        self.assertEqual(list(range(100)), result)
+
+    def test_empty(self):
+        self.assertEqual([], tlv8.decode_shared(self.data, [], pool=self.pool))
+        self.assertEqual([tlv8.EntryList()], tlv8.decode_shared(b'', [(0, 0)], pool=self.pool))
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, tlv8.decode_shared, self.data, [(0, len(self.data) + 1)], pool=self.pool)
+        self.assertRaises(ValueError, tlv8.decode_shared, self.data, [(5, 4)], pool=self.pool)
+        # decoding errors of the workers are raised
+        self.assertRaises(ValueError, tlv8.decode_shared, self.data, [(0, 4)], self.structure, pool=self.pool)
+
+
+if __name__ == '__main__':
+    unittest.main()
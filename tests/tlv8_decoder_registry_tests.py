@@ -0,0 +1,107 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import enum
+import ipaddress
+import unittest
+import uuid
+
+import tlv8
+
+
+class Keys(enum.IntEnum):
+    ID = 1
+    ADDRESS = 2
+    FLAG = 3
+    COUNTER = 4
+    NESTED = 5
+
+
+tlv8.register_decoder('uint32_be', lambda value: int.from_bytes(value, 'big'), lambda value: value.to_bytes(4, 'big'))
+
+
+class TestTLV8DecoderRegistry(unittest.TestCase):
+    accessory_id = uuid.UUID('00000001-0000-1000-8000-0026bb765291')
+    structure = {
+        Keys.ID: uuid.UUID,
+        Keys.ADDRESS: ipaddress.IPv4Address,
+        Keys.FLAG: bool,
+        Keys.COUNTER: 'uint32_be',
+        Keys.NESTED: {
+            Keys.ADDRESS: ipaddress.IPv6Address,
+        },
+    }
+    data = b'\x01\x10' + accessory_id.bytes + b'\x02\x04\xc0\xa8\x00\x01\x03\x01\x01\x04\x04\x00\x00\x01\x00' + \
+        b'\x05\x12\x02\x10' + bytes(15) + b'\x01'
+
+    def test_decode(self):
+        result = tlv8.decode(self.data, self.structure)
+        self.assertEqual(self.accessory_id, result.first_by_id(Keys.ID).data)
+        self.assertEqual(ipaddress.ip_address('192.168.0.1'), result.first_by_id(Keys.ADDRESS).data)
+        self.assertIs(True, result.first_by_id(Keys.FLAG).data)
+        self.assertEqual(256, result.first_by_id(Keys.COUNTER).data)
+        self.assertEqual(ipaddress.ip_address('::1'), result.first_by_id(Keys.NESTED).data.first_by_id(2).data)
+        self.assertIs(uuid.UUID, result.first_by_id(Keys.ID).data_type)
+        self.assertEqual('uint32_be', result.first_by_id(Keys.COUNTER).data_type)
+        self.assertIs(Keys.COUNTER, result.first_by_id(Keys.COUNTER).type_id)
+
+    def test_decode_encode(self):
+        self.assertEqual(self.data, tlv8.encode(tlv8.decode(self.data, self.structure)))
+
+    def test_encode_data_type(self):
+        self.assertEqual(b'\x01\x04\x00\x00\x00\x02', tlv8.encode([tlv8.Entry(1, 2, 'uint32_be')]))
+        self.assertEqual(b'\x01\x01\x00', tlv8.encode([tlv8.Entry(1, False, bool)]))
+
+    def test_zero_copy(self):
+        result = tlv8.decode(self.data, self.structure, zero_copy=True)
+        self.assertEqual(self.accessory_id, result.first_by_id(Keys.ID).data)
+
+    def test_invalid_value(self):
+        self.assertRaises(ValueError, tlv8.decode, b'\x01\x03abc', {1: uuid.UUID})
+        self.assertRaises(ValueError, tlv8.decode, b'\x01\x03abc', {1: ipaddress.IPv4Address})
+
+    def test_compiled_schema(self):
+        compiled = tlv8.compile_schema(self.structure)
+        self.assertEqual(tlv8.decode(self.data, self.structure), compiled.decode(self.data))
+        self.assertEqual(self.data, compiled.encode(compiled.decode(self.data)))
+
+    def test_parse_events(self):
+        values = []
+
+        class Handler(tlv8.EventHandler):
+            def value(self, type_id, value):
+                values.append(value)
+
+        tlv8.parse_events(self.data, Handler(), self.structure)
+        self.assertEqual([self.accessory_id, ipaddress.ip_address('192.168.0.1'), True, 256,
+                          ipaddress.ip_address('::1')], values)
+
+    def test_register_replaces_compiled(self):
+        tlv8.register_decoder('test_replace', lambda value: 1)
+        self.assertEqual(1, tlv8.compile_schema({1: 'test_replace'}).decode(b'\x01\x00')[0].data)
+        tlv8.register_decoder('test_replace', lambda value: 2)
+        self.assertEqual(2, tlv8.compile_schema({1: 'test_replace'}).decode(b'\x01\x00')[0].data)
+
+    def test_unknown_data_type(self):
+        self.assertRaises(ValueError, tlv8.decode, b'\x01\x01\x01', {1: 'unknown'})
+        self.assertEqual(1, len(tlv8.decode(b'\x02\x01\x01', {1: 'unknown', 2: tlv8.DataType.INTEGER})))
+
+    def test_register_invalid(self):
+        self.assertRaises(ValueError, tlv8.register_decoder, 1, lambda value: value)
+        self.assertRaises(ValueError, tlv8.register_decoder, tlv8.DataType.BYTES, lambda value: value)
+        self.assertRaises(ValueError, tlv8.register_decoder, {}, lambda value: value)
+        self.assertRaises(ValueError, tlv8.register_decoder, 'test_invalid', b'')
+        self.assertRaises(ValueError, tlv8.register_decoder, 'test_invalid', lambda value: value, b'')
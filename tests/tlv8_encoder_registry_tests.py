@@ -0,0 +1,128 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import enum
+import ipaddress
+import unittest
+import uuid
+
+import tlv8
+
+
+class Color(object):
+    def __init__(self, red, green, blue):
+        self.red = red
+        self.green = green
+        self.blue = blue
+
+
+class NamedColor(Color):
+    pass
+
+
+class Keys(enum.IntEnum):
+    A = 1
+
+
+tlv8.register_encoder(Color, lambda color: bytes([color.red, color.green, color.blue]))
+
+
+class TestTLV8EncoderRegistry(unittest.TestCase):
+
+    def test_bool(self):
+        self.assertEqual(b'\x01\x01\x01\x02\x01\x00', tlv8.encode([tlv8.Entry(1, True), tlv8.Entry(2, False)]))
+
+    def test_bool_as_integer(self):
+        self.assertEqual(b'\x01\x01\x01', tlv8.encode([tlv8.Entry(1, True, tlv8.DataType.INTEGER)]))
+
+    def test_bool_length(self):
+        # bools are integers, so the length applies as before the encoder registry
+        self.assertEqual(b'\x01\x04\x01\x00\x00\x00', tlv8.Entry(1, True, length=4).encode())
+        self.assertEqual(b'\x01\x02\x00\x00', tlv8.encode([tlv8.Entry(1, False, length=2)]))
+
+    def test_uuid(self):
+        value = uuid.UUID('00000001-0000-1000-8000-0026bb765291')
+        self.assertEqual(b'\x01\x10' + value.bytes, tlv8.encode([tlv8.Entry(1, value)]))
+
+    def test_ip_addresses(self):
+        data = [
+            tlv8.Entry(1, ipaddress.ip_address('192.168.0.1')),
+            tlv8.Entry(2, ipaddress.ip_address('::1')),
+        ]
+        self.assertEqual(b'\x01\x04\xc0\xa8\x00\x01\x02\x10' + bytes(15) + b'\x01', tlv8.encode(data))
+
+    def test_custom_type(self):
+        self.assertEqual(b'\x01\x03\x01\x02\x03', tlv8.encode([tlv8.Entry(1, Color(1, 2, 3))]))
+
+    def test_custom_subclass(self):
+        self.assertEqual(b'\x01\x03\x01\x02\x03', tlv8.encode([tlv8.Entry(1, NamedColor(1, 2, 3))]))
+
+    def test_custom_nested(self):
+        data = tlv8.EntryList([tlv8.Entry(1, [tlv8.Entry(2, Color(1, 2, 3))])])
+        self.assertEqual(b'\x01\x05\x02\x03\x01\x02\x03', data.encode())
+        self.assertEqual(data.encode(), b''.join(tlv8.iter_encode(data)))
+
+    def test_builtin_subclasses(self):
+        class Name(str):
+            pass
+
+        data = [
+            tlv8.Entry(1, Keys.A),
+            tlv8.Entry(2, Name('a')),
+        ]
+        self.assertEqual(b'\x01\x01\x01\x02\x01a', tlv8.encode(data))
+
+    def test_register_data_type(self):
+        class Port(int):
+            pass
+
+        tlv8.register_encoder(Port, tlv8.DataType.UNSIGNED_INTEGER)
+        self.assertEqual(b'\x01\x01\xff', tlv8.encode([tlv8.Entry(1, Port(255))]))
+
+    def test_register_replaces(self):
+        class Value(object):
+            pass
+
+        tlv8.register_encoder(Value, lambda value: b'\x01')
+        tlv8.encode([tlv8.Entry(1, Value())])
+        tlv8.register_encoder(Value, lambda value: b'\x02')
+        self.assertEqual(b'\x01\x01\x02', tlv8.encode([tlv8.Entry(1, Value())]))
+
+    def test_register_subclass_later(self):
+        class Value(object):
+            pass
+
+        class SubValue(Value):
+            pass
+
+        tlv8.register_encoder(Value, lambda value: b'\x01')
+        self.assertEqual(b'\x01\x01\x01', tlv8.encode([tlv8.Entry(1, SubValue())]))
+        tlv8.register_encoder(SubValue, lambda value: b'\x02')
+        self.assertEqual(b'\x01\x01\x02', tlv8.encode([tlv8.Entry(1, SubValue())]))
+
+    def test_unknown_type(self):
+        self.assertRaises(ValueError, tlv8.encode, [tlv8.Entry(1, object())])
+
+    def test_callable_data_type(self):
+        # only registered encoders are called, classes and other functions are no data types
+        for data_type in (str, int, dict, bytes, lambda value: b'x'):
+            self.assertRaises(ValueError, tlv8.Entry(1, 'x', data_type=data_type).encode)
+        self.assertRaises(ValueError, tlv8.Entry(1, Color(1, 2, 3), data_type=tlv8.Entry).encode)
+
+    def test_register_invalid(self):
+        self.assertRaises(ValueError, tlv8.register_encoder, Color(1, 2, 3), lambda value: b'')
+        self.assertRaises(ValueError, tlv8.register_encoder, Color, b'')
+        self.assertRaises(ValueError, tlv8.register_encoder, Color, Keys)
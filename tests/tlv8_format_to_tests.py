@@ -0,0 +1,119 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import io
+import unittest
+
+import tlv8
+
+
+class TestTLV8FormatTo(unittest.TestCase):
+    data = tlv8.EntryList([
+        tlv8.Entry(1, b'\x00\x01\x02\x03\x04\x05'),
+        tlv8.Entry(2, [
+            tlv8.Entry(3, tlv8.EntryList([
+                tlv8.Entry(4, 1),
+            ])),
+            tlv8.Entry(5, 2),
+            tlv8.Entry(6, 3),
+        ]),
+        tlv8.Entry(7, 'x'),
+    ])
+
+    def test_same_as_format_string(self):
+        fp = io.StringIO()
+        tlv8.format_to(self.data, fp, 2)
+        self.assertEqual(tlv8.format_string(self.data, 2), fp.getvalue())
+        self.assertEqual("""[
+  <1, b'\\x00\\x01\\x02\\x03\\x04\\x05'>,
+  <2, [
+    <3, [
+      <4, 1>,
+    ]>,
+    <5, 2>,
+    <6, 3>,
+  ]>,
+  <7, x>,
+]""", tlv8.format_string(self.data))
+
+    def test_empty(self):
+        fp = io.StringIO()
+        tlv8.format_to([], fp)
+        self.assertEqual('[\n]', fp.getvalue())
+
+    def test_max_depth(self):
+        self.assertEqual("""[
+  <1, b'\\x00\\x01\\x02\\x03\\x04\\x05'>,
+  <2, [...]>,
+  <7, x>,
+]""", tlv8.format_string(self.data, max_depth=0))
+        self.assertEqual("""[
+  <1, b'\\x00\\x01\\x02\\x03\\x04\\x05'>,
+  <2, [
+    <3, [...]>,
+    <5, 2>,
+    <6, 3>,
+  ]>,
+  <7, x>,
+]""", tlv8.format_string(self.data, max_depth=1))
+
+    def test_max_entries(self):
+        self.assertEqual("""[
+  <1, b'\\x00\\x01\\x02\\x03\\x04\\x05'>,
+  ... (2 more entries)
+]""", tlv8.format_string(self.data, max_entries=1))
+        self.assertEqual("""[
+  <1, b'\\x00\\x01\\x02\\x03\\x04\\x05'>,
+  <2, [
+    <3, [
+      <4, 1>,
+    ]>,
+    <5, 2>,
+    ... (1 more entries)
+  ]>,
+  ... (1 more entries)
+]""", tlv8.format_string(self.data, max_entries=2))
+
+    def test_max_bytes(self):
+        self.assertEqual("<1, b'\\x00\\x01\\x02'... (6 bytes)>,",
+                         tlv8.format_string(self.data, max_bytes=3).split('\n')[1].strip())
+        self.assertEqual("<1, b'\\x00\\x01\\x02\\x03\\x04\\x05'>,",
+                         tlv8.format_string(self.data, max_bytes=6).split('\n')[1].strip())
+
+    def test_hex_bytes(self):
+        self.assertEqual('<1, 000102030405>,', tlv8.format_string(self.data, hex_bytes=True).split('\n')[1].strip())
+        self.assertEqual('<1, 0001... (6 bytes)>,',
+                         tlv8.format_string(self.data, max_bytes=2, hex_bytes=True).split('\n')[1].strip())
+        self.assertEqual('<1, 0001... (6 bytes)>,',
+                         tlv8.format_string([tlv8.Entry(1, bytearray(range(6)))], max_bytes=2,
+                                            hex_bytes=True).split('\n')[1].strip())
+
+    def test_errors(self):
+        fp = io.StringIO()
+        self.assertRaises(ValueError, tlv8.format_to, 'foo', fp)
+        self.assertRaises(ValueError, tlv8.format_to, ['foo'], fp)
+        self.assertRaises(ValueError, tlv8.format_to, [tlv8.Entry(1, [tlv8.Entry(2, 1), 'foo'])], fp)
+        self.assertRaises(ValueError, tlv8.format_to, [tlv8.Entry(1, b'foo', tlv8.DataType.TLV8)], fp)
+
+    def test_deep_nesting(self):
+        data = tlv8.Entry(1, 1)
+        for _ in range(2000):
+            data = tlv8.Entry(1, [data])
+        result = tlv8.format_string([data], max_depth=3)
+        self.assertEqual(9, len(result.split('\n')))
+        result = tlv8.format_string([data])
+        self.assertTrue('\n' + ' ' * 4002 + '<1, 1>,\n' in result)
+        self.assertTrue(result.endswith('  ]>,\n]'))
@@ -0,0 +1,122 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+
+import tlv8
+from tlv8 import hap
+
+
+class TestTLV8Hap(unittest.TestCase):
+
+    def test_pair_setup_m1(self):
+        data = b'\x06\x01\x01\x00\x01\x00'
+        result = hap.PAIR_SETUP_M1.decode(data)
+        self.assertEqual(hap.State.M1, result.first_by_id(hap.TlvType.STATE).data)
+        self.assertIsInstance(result.first_by_id(hap.TlvType.STATE).data, hap.State)
+        self.assertIs(hap.Method.PAIR_SETUP, result.first_by_id(hap.TlvType.METHOD).data)
+        self.assertIs(hap.TlvType.METHOD, result[1].type_id)
+        self.assertEqual(data, hap.PAIR_SETUP_M1.encode(result))
+        # the method numbering of release R2
+        result = hap.PAIR_SETUP_M1.decode(b'\x06\x01\x01\x00\x01\x01')
+        self.assertIs(hap.Method.PAIR_SETUP_WITH_AUTH, result.first_by_id(hap.TlvType.METHOD).data)
+
+    def test_pair_setup_m2(self):
+        entries = [
+            tlv8.Entry(hap.TlvType.STATE, hap.State.M2),
+            tlv8.Entry(hap.TlvType.SALT, b'\x01' * 16),
+            tlv8.Entry(hap.TlvType.PUBLIC_KEY, b'\x02' * 384),
+        ]
+        data = tlv8.encode(entries)
+        result = hap.PAIR_SETUP_M2.decode(data)
+        self.assertEqual(b'\x02' * 384, result.first_by_id(hap.TlvType.PUBLIC_KEY).data)
+        self.assertEqual(tlv8.decode(data, hap.PAIR_SETUP_M2.expected), result)
+        self.assertEqual(data, hap.PAIR_SETUP_M2.encode(result))
+
+    def test_backoff(self):
+        # the accessory answers M1 (or M3) with the number of seconds to wait before the next attempt
+        for message, state in ((hap.PAIR_SETUP_M2, hap.State.M2), (hap.PAIR_SETUP_M4, hap.State.M4)):
+            data = b'\x06\x01' + bytes([state]) + b'\x07\x01\x03\x08\x02\x2c\x01'
+            result = message.decode(data)
+            self.assertIs(hap.Error.BACKOFF, result.first_by_id(hap.TlvType.ERROR).data)
+            self.assertEqual(300, result.first_by_id(hap.TlvType.RETRY_DELAY).data)
+            self.assertEqual(tlv8.DataType.UNSIGNED_INTEGER, result.first_by_id(hap.TlvType.RETRY_DELAY).data_type)
+            self.assertEqual(data, message.encode(result))
+
+    def test_error(self):
+        result = hap.PAIR_VERIFY_M4.decode(b'\x06\x01\x04\x07\x01\x02')
+        self.assertIs(hap.Error.AUTHENTICATION, result.first_by_id(hap.TlvType.ERROR).data)
+
+    def test_sub_tlv(self):
+        data = tlv8.encode([
+            tlv8.Entry(hap.TlvType.IDENTIFIER, 'controller'),
+            tlv8.Entry(hap.TlvType.PUBLIC_KEY, b'\x01' * 32),
+            tlv8.Entry(hap.TlvType.SIGNATURE, b'\x02' * 64),
+        ])
+        result = hap.PAIR_SETUP_SUB_TLV.decode(data)
+        self.assertEqual('controller', result.first_by_id(hap.TlvType.IDENTIFIER).data)
+
+    def test_list_pairings(self):
+        data = tlv8.encode([
+            tlv8.Entry(hap.TlvType.STATE, hap.State.M2),
+            tlv8.Entry(hap.TlvType.IDENTIFIER, 'a'),
+            tlv8.Entry(hap.TlvType.PUBLIC_KEY, b'\x01' * 32),
+            tlv8.Entry(hap.TlvType.PERMISSIONS, hap.Permissions.ADMIN),
+            tlv8.Entry(hap.TlvType.SEPARATOR, b''),
+            tlv8.Entry(hap.TlvType.IDENTIFIER, 'b'),
+            tlv8.Entry(hap.TlvType.PUBLIC_KEY, b'\x02' * 32),
+            tlv8.Entry(hap.TlvType.PERMISSIONS, hap.Permissions.USER),
+        ], separator_type_id=0xfe)
+        result = hap.LIST_PAIRINGS_M2.decode(data)
+        self.assertEqual(['a', 'b'], [entry.data for entry in result.by_id(hap.TlvType.IDENTIFIER)])
+        self.assertEqual([hap.Permissions.ADMIN, hap.Permissions.USER],
+                         [entry.data for entry in result.by_id(hap.TlvType.PERMISSIONS)])
+
+    def test_decode_pairings(self):
+        data = tlv8.encode_sequence([
+            [
+                tlv8.Entry(hap.TlvType.STATE, hap.State.M2),
+                tlv8.Entry(hap.TlvType.IDENTIFIER, 'a'),
+                tlv8.Entry(hap.TlvType.PUBLIC_KEY, b'\x01' * 32),
+                tlv8.Entry(hap.TlvType.PERMISSIONS, hap.Permissions.ADMIN),
+            ],
+            [
+                tlv8.Entry(hap.TlvType.IDENTIFIER, 'b'),
+                tlv8.Entry(hap.TlvType.PUBLIC_KEY, b'\x02' * 32),
+                tlv8.Entry(hap.TlvType.PERMISSIONS, hap.Permissions.USER),
+            ],
+        ])
+        result = hap.decode_pairings(data)
+        self.assertEqual(2, len(result))
+        self.assertEqual(['a', 'b'], [pairing.first_by_id(hap.TlvType.IDENTIFIER).data for pairing in result])
+        self.assertIs(hap.Permissions.USER, result[1].first_by_id(hap.TlvType.PERMISSIONS).data)
+
+    def test_decode_pairings_error(self):
+        self.assertEqual([], hap.decode_pairings(b'\x06\x01\x02\x07\x01\x01'))
+
+    def test_compiled_once(self):
+        message = hap.Message('TEST', {hap.TlvType.STATE: hap.State})
+        self.assertIsNone(message._compiled)
+        message.decode(b'\x06\x01\x01')
+        compiled = message.compiled
+        message.encode([tlv8.Entry(hap.TlvType.STATE, hap.State.M1)])
+        self.assertIs(compiled, message.compiled)
+
+    def test_messages(self):
+        self.assertIs(hap.LIST_PAIRINGS_M2, hap.MESSAGES['LIST_PAIRINGS_M2'])
+        for name, message in hap.MESSAGES.items():
+            self.assertEqual(name, message.name)
+            self.assertIsInstance(message.compiled, tlv8.CompiledSchema)
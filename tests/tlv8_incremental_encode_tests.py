@@ -0,0 +1,139 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import enum
+import pickle
+import unittest
+
+import tlv8
+
+
+class CountingEntry(tlv8.Entry):
+    encoded = 0
+
+    def encode(self, separator_type_id=0xff):
+        CountingEntry.encoded += 1
+        return tlv8.Entry.encode(self, separator_type_id)
+
+
+class Color(enum.IntEnum):
+    RED = 1
+    GREEN = 2
+
+
+class TestTLV8IncrementalEncode(unittest.TestCase):
+
+    def setUp(self):
+        CountingEntry.encoded = 0
+        self.entries = tlv8.EntryList([
+            CountingEntry(1, 'hello'),
+            CountingEntry(2, b'\x01\x02'),
+            CountingEntry(2, 42),
+            CountingEntry(3, Color.RED),
+            CountingEntry(4, 3.141),
+        ], cache_segments=True)
+
+    def assertEncodes(self, encoded_entries):
+        CountingEntry.encoded = 0
+        self.assertEqual(tlv8.encode(list(self.entries)), self.entries.encode())
+        # tlv8.encode on a plain list encodes every entry
+        self.assertEqual(len(self.entries) + encoded_entries, CountingEntry.encoded)
+
+    def test_unchanged(self):
+        self.entries.encode()
+        self.assertEncodes(0)
+        self.assertEqual(self.entries.encode(), tlv8.encode(self.entries))
+
+    def test_modify_entry(self):
+        self.entries.encode()
+        self.entries[2].data = 43
+        self.assertEncodes(1)
+        self.entries[0].type_id = 2
+        self.assertEncodes(1)
+        self.entries[3].data_type = tlv8.DataType.UNSIGNED_INTEGER
+        self.assertEncodes(1)
+        self.entries[3].length = 4
+        self.assertEncodes(1)
+
+    def test_modify_list(self):
+        self.entries.encode()
+        self.entries.append(CountingEntry(4, 'world'))
+        self.assertEncodes(1)
+        self.entries.insert(1, CountingEntry(1, 'separator needed'))
+        self.assertEncodes(1)
+        del self.entries[1]
+        self.assertEncodes(0)
+        self.entries[1] = CountingEntry(5, b'\xff')
+        self.assertEncodes(1)
+        self.entries[0:2] = [CountingEntry(2, 1)]
+        self.assertEncodes(1)
+        self.assertRaises(ValueError, self.entries.__setitem__, 0, 'foo')
+        self.assertRaises(ValueError, self.entries.__setitem__, slice(0, 1), ['foo'])
+        self.assertRaises(ValueError, self.entries.insert, 0, 'foo')
+
+    def test_assign_slice_iterator(self):
+        self.entries.encode()
+        self.entries[0:1] = (entry for entry in [CountingEntry(6, b'c')])
+        self.assertEqual([6, 2, 2, 3, 4], [entry.type_id for entry in self.entries])
+        self.assertEncodes(1)
+
+    def test_mutable_data(self):
+        data = bytearray(b'\x01')
+        self.entries.append(CountingEntry(6, data))
+        self.entries.encode()
+        data[0] = 0x02
+        self.assertEncodes(1)
+
+    def test_nested(self):
+        inner = tlv8.EntryList([CountingEntry(1, 1), CountingEntry(2, b'\x00' * 300)], cache_segments=True)
+        self.entries.append(CountingEntry(6, inner))
+        self.entries.encode()
+        inner[0].data = 2
+        # the outer entry and the changed inner entry
+        CountingEntry.encoded = 0
+        result = self.entries.encode()
+        self.assertEqual(2, CountingEntry.encoded)
+        self.assertEqual(tlv8.encode([tlv8.Entry(e.type_id, e.data) for e in self.entries]), result)
+
+    def test_not_cached_by_default(self):
+        entries = tlv8.EntryList(list(self.entries))
+        self.assertFalse(entries.cache_segments)
+        entries.encode()
+        CountingEntry.encoded = 0
+        self.assertEqual(tlv8.encode(list(self.entries)), entries.encode())
+        self.assertEqual(2 * len(entries), CountingEntry.encoded)
+        self.assertEqual({}, entries._segments)
+
+    def test_pickle(self):
+        for cache_segments in (False, True):
+            entries = tlv8.EntryList([tlv8.Entry(1, 1)], cache_segments=cache_segments)
+            entries.encode()
+            restored = pickle.loads(pickle.dumps(entries))
+            self.assertEqual(cache_segments, restored.cache_segments)
+            self.assertEqual({}, restored._segments)
+            self.assertEqual(entries, restored)
+
+    def test_separator(self):
+        self.entries.encode()
+        CountingEntry.encoded = 0
+        self.assertEqual(tlv8.encode(list(self.entries), separator_type_id=0), self.entries.encode(0))
+        # a different separator invalidates all segments
+        self.assertEqual(2 * len(self.entries), CountingEntry.encoded)
+        self.assertRaises(ValueError, self.entries.encode, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
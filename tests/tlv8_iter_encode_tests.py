@@ -0,0 +1,77 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import io
+import unittest
+
+import tlv8
+
+
+class TestTLV8IterEncode(unittest.TestCase):
+    entries = [
+        tlv8.Entry(1, 3.141),
+        tlv8.Entry(2, [
+            tlv8.Entry(3, 'hello'),
+            tlv8.Entry(4, b'\xaa' * 600),
+            tlv8.Entry(4, bytearray(b'\xbb' * 255)),
+            tlv8.Entry(5, [
+                tlv8.Entry(6, b'\xcc' * 510),
+                tlv8.Entry(7, 42, tlv8.DataType.UNSIGNED_INTEGER, length=4),
+            ]),
+        ]),
+        tlv8.Entry(2, b''),
+        tlv8.Entry(8, memoryview(b'\xdd' * 256)),
+        tlv8.Entry(9, []),
+    ]
+
+    def test_iter_encode(self):
+        expected = tlv8.encode(self.entries)
+        self.assertEqual(expected, b''.join(tlv8.iter_encode(self.entries)))
+        for chunk_size in [1, 7, 255, 256, 1000]:
+            chunks = list(tlv8.iter_encode(self.entries, chunk_size=chunk_size))
+            self.assertEqual(expected, b''.join(chunks))
+            for chunk in chunks[:-1]:
+                self.assertEqual(chunk_size, len(chunk))
+
+    def test_iter_encode_separator(self):
+        entries = tlv8.EntryList([tlv8.Entry(1, 1), tlv8.Entry(1, [tlv8.Entry(2, 1), tlv8.Entry(2, 2)])])
+        self.assertEqual(tlv8.encode(entries, separator_type_id=0),
+                         b''.join(tlv8.iter_encode(entries, separator_type_id=0, chunk_size=3)))
+
+    def test_iter_encode_empty(self):
+        self.assertEqual([], list(tlv8.iter_encode([])))
+
+    def test_iter_encode_large(self):
+        # nested values of many fragments with fragment borders not aligned to the nested borders
+        entries = [tlv8.Entry(1, [tlv8.Entry(2, b'\x01' * 1000), tlv8.Entry(3, [tlv8.Entry(4, b'\x02' * 70000)])])]
+        self.assertEqual(tlv8.encode(entries), b''.join(tlv8.iter_encode(entries, chunk_size=4096)))
+
+    def test_errors_before_first_chunk(self):
+        entries = [tlv8.Entry(1, b'\x00' * 1000), tlv8.Entry(2, [tlv8.Entry(3, 2 ** 70)])]
+        self.assertRaises(ValueError, tlv8.iter_encode, entries)
+        self.assertRaises(ValueError, tlv8.iter_encode, 'foo')
+        self.assertRaises(ValueError, tlv8.iter_encode, ['foo'])
+        self.assertRaises(ValueError, tlv8.iter_encode, [tlv8.Entry(255, 1)])
+        self.assertRaises(ValueError, tlv8.iter_encode, [tlv8.Entry(1, 1)], chunk_size=0)
+
+    def test_encode_to(self):
+        fp = io.BytesIO()
+        self.assertEqual(len(tlv8.encode(self.entries)), tlv8.encode_to(self.entries, fp, chunk_size=100))
+        self.assertEqual(tlv8.encode(self.entries), fp.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
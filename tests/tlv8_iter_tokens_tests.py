@@ -0,0 +1,98 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import enum
+import unittest
+
+import tlv8
+
+
+class Keys(enum.IntEnum):
+    STATE = 6
+    LIST = 7
+
+
+class TestTLV8IterTokens(unittest.TestCase):
+    structure = {
+        Keys.STATE: tlv8.DataType.INTEGER,
+        Keys.LIST: {
+            2: tlv8.DataType.INTEGER,
+            3: {
+                4: tlv8.DataType.BYTES,
+            },
+        },
+        5: tlv8.DataType.FLOAT,
+    }
+    nested = tlv8.encode([
+        tlv8.Entry(2, 1),
+        tlv8.Entry(2, 2),
+        tlv8.Entry(3, [tlv8.Entry(4, b'\x00' * 300)]),
+    ])
+    data = tlv8.encode([
+        tlv8.Entry(Keys.STATE, 2),
+        tlv8.Entry(Keys.LIST, [
+            tlv8.Entry(2, 1),
+            tlv8.Entry(2, 2),
+            tlv8.Entry(3, [tlv8.Entry(4, b'\x00' * 300)]),
+        ]),
+        tlv8.Entry(8, b''),
+        tlv8.Entry(5, 0.5),
+    ])
+
+    def test_tokens(self):
+        tokens = [
+            (depth, type_id, bytes(value)) for depth, type_id, value in tlv8.iter_tokens(self.data, self.structure)
+        ]
+        self.assertEqual([
+            (0, Keys.STATE, b'\x02'),
+            (0, Keys.LIST, self.nested),
+            (1, 2, b'\x01'),
+            (1, 2, b'\x02'),
+            (1, 3, tlv8.encode([tlv8.Entry(4, b'\x00' * 300)])),
+            (2, 4, b'\x00' * 300),
+            (0, 5, tlv8.encode([tlv8.Entry(5, 0.5)])[2:]),
+        ], tokens)
+        self.assertIsInstance(tokens[0][1], Keys)
+
+    def test_spans(self):
+        data = bytearray(self.data)
+        tokens = list(tlv8.iter_tokens(data, self.structure))
+        self.assertIsInstance(tokens[0][2], memoryview)
+        # fragmented values are reassembled
+        self.assertIsInstance(tokens[1][2], bytes)
+        data[2] = 3
+        self.assertEqual(b'\x03', tokens[0][2])
+
+    def test_without_expected(self):
+        tokens = list(tlv8.iter_tokens(b'\x01\x01\x02\xff\x00\x01\x00\x02\x00'))
+        self.assertEqual([(0, 1, b'\x02'), (0, 1, b''), (0, 2, b'')], tokens)
+        tokens = list(tlv8.iter_tokens(b'\x01\x01\x02\x00\x00\x01\x00', separator_type_id=0))
+        self.assertEqual([(0, 1, b'\x02'), (0, 1, b'')], tokens)
+
+    def test_lazy(self):
+        # the error at the end is not reached when stopping early (the scanner looks one entry ahead for fragments)
+        data = tlv8.encode([tlv8.Entry(Keys.STATE, 2), tlv8.Entry(5, 0.5)]) + b'\x05\x10'
+        tokens = tlv8.iter_tokens(data, self.structure)
+        self.assertEqual((0, Keys.STATE, b'\x02'), next(tokens))
+        self.assertRaises(ValueError, list, tokens)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, tlv8.iter_tokens, 'foo')
+        self.assertRaises(ValueError, list, tlv8.iter_tokens(b'\x06\x01a\x06\x01b', self.structure, strict_mode=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+
+import tlv8
+
+
+class TestTLV8KeepRaw(unittest.TestCase):
+    structure = {
+        1: tlv8.DataType.INTEGER,
+        2: {
+            3: tlv8.DataType.STRING,
+            4: tlv8.DataType.BYTES,
+        },
+        5: tlv8.DataType.FLOAT,
+    }
+    # integer 1 encoded with 2 bytes is not what tlv8.encode would create
+    data = b'\x01\x02\x01\x00' + tlv8.encode([
+        tlv8.Entry(2, [
+            tlv8.Entry(3, 'hello'),
+            tlv8.Entry(4, b'\xaa' * 300),
+        ]),
+        tlv8.Entry(5, 3.141),
+    ])
+
+    def test_encode_unmodified(self):
+        result = tlv8.decode(self.data, self.structure, keep_raw=True)
+        self.assertEqual(self.data, result.encode())
+        self.assertEqual(self.data, tlv8.encode(result))
+        self.assertEqual(self.data[4:-6], result[1].encode())
+        # without keep_raw, the integer is encoded with 1 byte
+        self.assertEqual(self.data[:1] + b'\x01\x01' + self.data[4:], tlv8.decode(self.data, self.structure).encode())
+
+    def test_encode_modified(self):
+        result = tlv8.decode(self.data, self.structure, keep_raw=True)
+        result[1].data[0].data = 'world'
+        self.assertEqual(self.data.replace(b'hello', b'world'), result.encode())
+        result.append(tlv8.Entry(6, b''))
+        self.assertEqual(self.data.replace(b'hello', b'world') + b'\x06\x00', result.encode())
+        del result[2]
+        self.assertEqual(self.data.replace(b'hello', b'world')[:-6] + b'\x06\x00', result.encode())
+
+    def test_encode_modified_reuses_segments(self):
+        result = tlv8.decode(self.data, self.structure, keep_raw=True)
+        # the first entry keeps its original encoding although the list changed
+        result[2].data = 2.5
+        self.assertEqual(self.data[:-6] + tlv8.encode([tlv8.Entry(5, 2.5)]), result.encode())
+
+    def test_encode_modified_after_encode(self):
+        result = tlv8.decode(self.data, self.structure, keep_raw=True)
+        self.assertEqual(self.data, result.encode())
+        result[1].data[1].data = b'\xbb'
+        # the unchanged integer keeps its original encoding
+        expected = self.data[:4] + tlv8.encode([
+            tlv8.Entry(2, [tlv8.Entry(3, 'hello'), tlv8.Entry(4, b'\xbb')]),
+            tlv8.Entry(5, 3.141),
+        ])
+        self.assertEqual(expected, result.encode())
+        self.assertIsNone(result._raw)
+
+    def test_mutators_drop_raw(self):
+        result = tlv8.decode(self.data, self.structure, keep_raw=True)
+        result.insert(0, tlv8.Entry(6, b''))
+        self.assertIsNone(result._raw)
+        # the unchanged entries are still cut from the original bytes
+        self.assertEqual(b'\x06\x00' + self.data, result.encode())
+        result = tlv8.decode(self.data, self.structure, keep_raw=True)
+        result[1].data[0] = tlv8.Entry(3, 'world')
+        self.assertIsNone(result[1].data._raw)
+        self.assertEqual(self.data.replace(b'hello', b'world'), result.encode())
+
+    def test_replaced_nested_list(self):
+        result = tlv8.decode(self.data, self.structure, keep_raw=True)
+        # an equal list that was not decoded from the original bytes
+        result[1].data = tlv8.EntryList([tlv8.Entry(3, 'hello'), tlv8.Entry(4, b'\xaa' * 300)])
+        self.assertFalse(result._unmodified())
+        self.assertEqual(self.data, result.encode())
+        self.assertIsNone(result._raw)
+
+    def test_encode_other_separator(self):
+        data = b'\x01\x01\x01\xff\x00\x01\x01\x02'
+        result = tlv8.decode(data, {1: tlv8.DataType.INTEGER}, keep_raw=True)
+        self.assertEqual(2, len(result))
+        self.assertEqual(data, result.encode())
+        self.assertEqual(b'\x01\x01\x01\x00\x00\x01\x01\x02', result.encode(0))
+
+    def test_encode_dropped_entries(self):
+        expected = {1: tlv8.DataType.BYTES, 3: tlv8.DataType.BYTES}
+        # an empty entry with a type id that is not expected is dropped, so it is not encoded either
+        result = tlv8.decode(b'\x01\x01a\x02\x00\x03\x01c', expected, keep_raw=True)
+        self.assertEqual(2, len(result))
+        self.assertIsNone(result._raw)
+        self.assertEqual(b'\x01\x01a\x03\x01c', result.encode())
+        self.assertEqual(tlv8.encode(list(result)), result.encode())
+        # dropped separators are kept
+        data = b'\x01\x01a\xff\x00\x01\x01c'
+        result = tlv8.decode(data, expected, keep_raw=True)
+        self.assertEqual(2, len(result))
+        self.assertEqual(data, result.encode())
+
+    def test_deep_decode(self):
+        result = tlv8.deep_decode(self.data, keep_raw=True)
+        self.assertEqual(self.data, result.encode())
+        result[1].data[0].data = b'world'
+        self.assertEqual(self.data.replace(b'hello', b'world'), result.encode())
+
+    def test_zero_copy(self):
+        result = tlv8.decode(bytearray(self.data), self.structure, zero_copy=True, keep_raw=True)
+        self.assertEqual(self.data, result.encode())
+        self.assertIsInstance(result.encode(), bytes)
+
+    def test_equality(self):
+        first = tlv8.decode(self.data, self.structure, keep_raw=True)
+        second = tlv8.decode(self.data, self.structure, keep_raw=True)
+        self.assertEqual(first, second)
+        self.assertEqual(first, tlv8.decode(self.data, self.structure))
+        second[1].data[1].data = b'\xbb'
+        self.assertNotEqual(first, second)
+        second[1].data[1].data = b'\xaa' * 300
+        self.assertEqual(first, second)
+
+    def test_equality_different_kind(self):
+        # the same bytes decoded differently
+        self.assertNotEqual(tlv8.decode(self.data, keep_raw=True), tlv8.deep_decode(self.data, keep_raw=True))
+        self.assertNotEqual(tlv8.decode(self.data, self.structure, keep_raw=True),
+                            tlv8.decode(self.data, keep_raw=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
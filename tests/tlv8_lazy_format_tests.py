@@ -0,0 +1,64 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import logging
+import unittest
+from unittest import mock
+
+import tlv8
+
+
+class TestTLV8LazyFormat(unittest.TestCase):
+    data = [
+        tlv8.Entry(1, 1),
+        tlv8.Entry(2, [
+            tlv8.Entry(3, b'\x00\x01\x02'),
+        ]),
+    ]
+
+    def test_str(self):
+        self.assertEqual(tlv8.format_string(self.data), str(tlv8.LazyFormat(self.data)))
+        self.assertEqual(tlv8.format_string(self.data), repr(tlv8.LazyFormat(self.data)))
+
+    def test_bytes(self):
+        encoded = tlv8.encode(self.data)
+        expected = tlv8.format_string(tlv8.deep_decode(encoded))
+        self.assertEqual(expected, str(tlv8.LazyFormat(encoded)))
+        self.assertEqual(expected, str(tlv8.LazyFormat(bytearray(encoded))))
+
+    def test_options(self):
+        expected = tlv8.format_string(self.data, 2, max_depth=0, max_entries=1, max_bytes=1, hex_bytes=True)
+        self.assertEqual(expected, str(tlv8.LazyFormat(self.data, 2, max_depth=0, max_entries=1, max_bytes=1,
+                                                       hex_bytes=True)))
+
+    def test_invalid(self):
+        self.assertEqual("b'\\x01' (not formattable: Bytes with length 1 is not a valid TLV8.)",
+                         str(tlv8.LazyFormat(b'\x01')))
+        self.assertIn('not formattable', str(tlv8.LazyFormat('foo')))
+
+    def test_not_formatted_if_not_logged(self):
+        logger = logging.getLogger('tlv8.tests.lazy')
+        logger.setLevel(logging.INFO)
+        with mock.patch('tlv8.format_string') as format_string:
+            logger.debug('data: %s', tlv8.LazyFormat(self.data))
+            format_string.assert_not_called()
+
+    def test_formatted_once(self):
+        lazy = tlv8.LazyFormat(self.data)
+        with mock.patch('tlv8.format_string', return_value='formatted') as format_string:
+            self.assertEqual('formatted', str(lazy))
+            self.assertEqual('formatted', str(lazy))
+            format_string.assert_called_once()
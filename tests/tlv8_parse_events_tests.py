@@ -0,0 +1,138 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import enum
+import unittest
+
+import tlv8
+
+
+class Keys(enum.IntEnum):
+    STATE = 6
+    LIST = 7
+
+
+class States(enum.IntEnum):
+    M1 = 1
+    M2 = 2
+
+
+class Recorder(tlv8.EventHandler):
+    def __init__(self):
+        self.events = []
+
+    def start_list(self, type_id):
+        self.events.append(('start', type_id))
+
+    def value(self, type_id, value):
+        self.events.append(('value', type_id, value))
+
+    def end_list(self, type_id):
+        self.events.append(('end', type_id))
+
+
+class TestTLV8ParseEvents(unittest.TestCase):
+    structure = {
+        Keys.STATE: States,
+        1: tlv8.DataType.STRING,
+        Keys.LIST: {
+            2: tlv8.DataType.INTEGER,
+            3: {
+                4: tlv8.DataType.BYTES,
+            },
+        },
+        5: tlv8.DataType.FLOAT,
+    }
+    data = tlv8.encode([
+        tlv8.Entry(Keys.STATE, States.M2),
+        tlv8.Entry(1, 'hello'),
+        tlv8.Entry(Keys.LIST, [
+            tlv8.Entry(2, 1),
+            tlv8.Entry(2, 2),
+            tlv8.Entry(3, [tlv8.Entry(4, b'\x00' * 300)]),
+        ]),
+        tlv8.Entry(8, b''),
+        tlv8.Entry(5, 0.5),
+    ])
+
+    def test_events(self):
+        handler = Recorder()
+        tlv8.parse_events(self.data, handler, self.structure)
+        self.assertEqual([
+            ('value', Keys.STATE, States.M2),
+            ('value', 1, 'hello'),
+            ('start', Keys.LIST),
+            ('value', 2, 1),
+            ('value', 2, 2),
+            ('start', 3),
+            ('value', 4, b'\x00' * 300),
+            ('end', 3),
+            ('end', Keys.LIST),
+            ('value', 5, 0.5),
+        ], handler.events)
+        self.assertIsInstance(handler.events[0][1], Keys)
+        self.assertIsInstance(handler.events[0][2], States)
+
+    def test_events_without_expected(self):
+        handler = Recorder()
+        tlv8.parse_events(b'\x01\x01\x02\xff\x00\x01\x00', handler)
+        self.assertEqual([('value', 1, b'\x02'), ('value', 255, b''), ('value', 1, b'')], handler.events)
+
+    def test_same_as_decode(self):
+        # rebuild the tree from the events
+        class Builder(tlv8.EventHandler):
+            def __init__(self):
+                self.stack = [tlv8.EntryList()]
+
+            def start_list(self, type_id):
+                self.stack.append(tlv8.EntryList())
+
+            def value(self, type_id, value):
+                self.stack[-1].append(tlv8.Entry(type_id, value))
+
+            def end_list(self, type_id):
+                entries = self.stack.pop()
+                self.stack[-1].append(tlv8.Entry(type_id, entries))
+
+        builder = Builder()
+        tlv8.parse_events(self.data, builder, self.structure)
+        self.assertEqual(tlv8.decode(self.data, self.structure), builder.stack[0])
+
+    def test_partial_handler(self):
+        class Counter(tlv8.EventHandler):
+            count = 0
+
+            def value(self, type_id, value):
+                self.count += 1
+
+        handler = Counter()
+        tlv8.parse_events(self.data, handler, self.structure)
+        self.assertEqual(6, handler.count)
+
+    def test_zero_copy(self):
+        handler = Recorder()
+        tlv8.parse_events(bytearray(b'\x01\x02ab'), handler, {1: tlv8.DataType.BYTES}, zero_copy=True)
+        self.assertIsInstance(handler.events[0][2], memoryview)
+
+    def test_errors(self):
+        self.assertRaises(ValueError, tlv8.parse_events, b'\x01\x05ab', Recorder(), self.structure)
+        self.assertRaises(ValueError, tlv8.parse_events, b'\x01\x01a\x01\x01b', Recorder(), self.structure,
+                          strict_mode=True)
+        self.assertRaises(ValueError, tlv8.parse_events, 'foo', Recorder())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import copy
+import enum
+import pickle
+import unittest
+
+import tlv8
+
+
+class Keys(enum.IntEnum):
+    STATE = 6
+    ERROR = 7
+
+
+class States(enum.IntEnum):
+    M1 = 1
+    M2 = 2
+
+
+class SubEntry(tlv8.Entry):
+    pass
+
+
+class TestTLV8Pickle(unittest.TestCase):
+    structure = {
+        Keys.STATE: States,
+        1: tlv8.DataType.STRING,
+        2: {
+            3: tlv8.DataType.BYTES,
+            4: tlv8.DataType.UNSIGNED_INTEGER,
+        },
+        5: tlv8.DataType.FLOAT,
+    }
+
+    def setUp(self):
+        self.entries = tlv8.decode(tlv8.encode([
+            tlv8.Entry(Keys.STATE, States.M2),
+            tlv8.Entry(1, 'hello'),
+            tlv8.Entry(2, [
+                tlv8.Entry(3, b'\x00' * 600),
+                tlv8.Entry(4, 2 ** 40, tlv8.DataType.UNSIGNED_INTEGER),
+            ]),
+            tlv8.Entry(2, []),
+            tlv8.Entry(5, 3.141),
+        ]), self.structure)
+
+    def assertRestored(self, expected, restored):
+        self.assertEqual(len(expected), len(restored))
+        for e, r in zip(expected, restored):
+            self.assertEqual(type(e.type_id), type(r.type_id))
+            self.assertEqual(e.type_id, r.type_id)
+            self.assertEqual(e.data_type, r.data_type)
+            self.assertEqual(e.length, r.length)
+            self.assertEqual(type(e.data), type(r.data))
+            if isinstance(e.data, (list, tlv8.EntryList)):
+                self.assertRestored(e.data, r.data)
+            else:
+                self.assertEqual(e.data, r.data)
+
+    def test_entry_list(self):
+        for protocol in range(2, pickle.HIGHEST_PROTOCOL + 1):
+            data = pickle.dumps(self.entries, protocol)
+            self.assertRestored(self.entries, pickle.loads(data))
+
+    def test_compact(self):
+        data = pickle.dumps(self.entries, pickle.HIGHEST_PROTOCOL)
+        self.assertNotIn(b'type_id', data)
+        self.assertLess(len(data), 1000)
+
+    def test_exact_values(self):
+        entries = tlv8.EntryList([
+            tlv8.Entry(1, 0.1),
+            tlv8.Entry(1, float('inf')),
+            tlv8.Entry(2, True),
+            tlv8.Entry(3, bytearray(b'\x01')),
+            tlv8.Entry(4, -2 ** 63),
+            tlv8.Entry(5, b''),
+            tlv8.Entry(5, b''),
+            tlv8.Entry(6, [tlv8.Entry(7, [tlv8.Entry(8, 'deep', length=3)])]),
+            tlv8.Entry(9, 1, tlv8.DataType.INTEGER, length=4),
+        ])
+        self.assertRestored(entries, pickle.loads(pickle.dumps(entries)))
+
+    def test_fallback(self):
+        # values that cannot be encoded exactly are pickled as they are
+        entries = tlv8.EntryList([
+            tlv8.Entry(1, 2 ** 64),
+            tlv8.Entry(2, '\udcff'),
+            tlv8.Entry(255, b''),
+            tlv8.Entry(3, (1, 2)),
+        ])
+        self.assertRestored(entries, pickle.loads(pickle.dumps(entries)))
+        self.assertRestored(tlv8.EntryList(), pickle.loads(pickle.dumps(tlv8.EntryList())))
+
+    def test_entry(self):
+        for entry in [self.entries[0], self.entries[2], tlv8.Entry(1, [tlv8.Entry(2, 2 ** 64)])]:
+            self.assertRestored([entry], [pickle.loads(pickle.dumps(entry))])
+
+    def test_subclasses(self):
+        entry = SubEntry(1, b'\x01')
+        entry.extra = 42
+        restored = pickle.loads(pickle.dumps(tlv8.EntryList([entry])))
+        self.assertIsInstance(restored[0], SubEntry)
+        self.assertEqual(42, restored[0].extra)
+
+    def test_keep_raw(self):
+        entries = tlv8.decode(self.entries.encode(), self.structure, keep_raw=True)
+        restored = pickle.loads(pickle.dumps(entries))
+        self.assertRestored(entries, restored)
+        self.assertEqual(entries.encode(), restored.encode())
+
+    def test_copy(self):
+        shallow = copy.copy(self.entries)
+        self.assertIs(self.entries[0], shallow[0])
+        deep = copy.deepcopy(self.entries)
+        self.assertIsNot(self.entries[0], deep[0])
+        self.assertRestored(self.entries, deep)
+        self.assertIs(self.entries[2].data, copy.copy(self.entries[2]).data)
+
+
+if __name__ == '__main__':
+    unittest.main()
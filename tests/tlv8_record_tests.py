@@ -0,0 +1,132 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+import enum
+
+import tlv8
+
+
+class States(enum.IntEnum):
+    M1 = 1
+    M2 = 2
+
+
+Point = tlv8.record_class('Point', [
+    (3, 'x', tlv8.DataType.INTEGER),
+    (4, 'y', tlv8.DataType.INTEGER),
+])
+
+Line = tlv8.record_class('Line', [
+    (1, 'start', Point),
+    (2, 'end', Point),
+    (5, 'name', tlv8.DataType.STRING),
+])
+
+Message = tlv8.record_class('Message', [
+    (6, 'state', States),
+    (2, 'salt', tlv8.DataType.BYTES),
+    (7, 'delay', tlv8.DataType.UNSIGNED_INTEGER),
+    (8, 'value', tlv8.DataType.FLOAT),
+])
+
+
+class TestTLV8Record(unittest.TestCase):
+    def test_slots(self):
+        point = Point(x=1, y=2)
+        self.assertEqual(('x', 'y'), Point.__slots__)
+        self.assertFalse(hasattr(point, '__dict__'))
+        self.assertIsInstance(point, tlv8.Record)
+
+    def test_init(self):
+        point = Point(x=1)
+        self.assertEqual(1, point.x)
+        self.assertIsNone(point.y)
+        self.assertRaises(TypeError, Point, z=1)
+
+    def test_decode_nested(self):
+        data = b'\x01\x06\x03\x01\n\x04\x01\n\x02\x06\x03\x01\x1e\x04\x01('
+        line = Line.decode(data)
+        self.assertEqual(Line(start=Point(x=10, y=10), end=Point(x=30, y=40)), line)
+        self.assertIsNone(line.name)
+
+    def test_decode_bytearray(self):
+        self.assertEqual(Point(x=1, y=2), Point.decode(bytearray(b'\x03\x01\x01\x04\x01\x02')))
+
+    def test_decode_wrong_input_type(self):
+        self.assertRaises(ValueError, Point.decode, 'foo')
+
+    def test_decode_types(self):
+        data = tlv8.encode([
+            tlv8.Entry(6, States.M2),
+            tlv8.Entry(2, b'\x00' * 300),
+            tlv8.Entry(7, 65535, tlv8.DataType.UNSIGNED_INTEGER),
+            tlv8.Entry(8, 1.5),
+        ])
+        message = Message.decode(data)
+        self.assertIs(States.M2, message.state)
+        self.assertEqual(b'\x00' * 300, message.salt)
+        self.assertEqual(65535, message.delay)
+        self.assertEqual(1.5, message.value)
+
+    def test_decode_stops_at_unexpected(self):
+        self.assertEqual(Point(x=1), Point.decode(b'\x03\x01\x01\x09\x01\x01\x04\x01\x02'))
+
+    def test_decode_last_value_wins(self):
+        self.assertEqual(Point(x=2), Point.decode(b'\x03\x01\x01\xff\x00\x03\x01\x02'))
+
+    def test_decode_strict_mode(self):
+        self.assertRaises(ValueError, Point.decode, b'\x03\x01\x01\x03\x01\x02', strict_mode=True)
+
+    def test_encode(self):
+        line = Line(start=Point(x=10, y=10), end=Point(x=30, y=40))
+        self.assertEqual(b'\x01\x06\x03\x01\n\x04\x01\n\x02\x06\x03\x01\x1e\x04\x01(', line.encode())
+
+    def test_encode_skips_none(self):
+        self.assertEqual(b'\x04\x01\x02', Point(y=2).encode())
+
+    def test_encode_fragmented(self):
+        message = Message(state=States.M1, salt=b'\x01' * 256)
+        self.assertEqual(message, Message.decode(message.encode()))
+        self.assertEqual(tlv8.encode([tlv8.Entry(6, States.M1), tlv8.Entry(2, b'\x01' * 256)]), message.encode())
+
+    def test_in_expected_structure(self):
+        data = b'\x01\x03\x03\x01\x05\x02\x01\x07'
+        expected = {1: Point, 2: tlv8.DataType.INTEGER}
+        result = tlv8.decode(data, expected)
+        self.assertEqual(Point(x=5), result.first_by_id(1).data)
+        self.assertEqual(data, result.encode())
+        self.assertEqual(data, tlv8.encode([tlv8.Entry(1, Point(x=5), Point), tlv8.Entry(2, 7)]))
+        schema = tlv8.compile_schema(expected)
+        self.assertEqual(data, schema.encode(schema.decode(data)))
+        self.assertEqual(data, b''.join(tlv8.iter_encode(result)))
+
+    def test_repr(self):
+        self.assertEqual('<Point x=1, y=None>', repr(Point(x=1)))
+
+    def test_equality(self):
+        self.assertEqual(Point(x=1, y=2), Point(x=1, y=2))
+        self.assertNotEqual(Point(x=1, y=2), Point(x=1, y=3))
+        self.assertNotEqual(Point(x=1, y=2), (1, 2))
+
+    def test_duplicate_fields(self):
+        self.assertRaises(ValueError, tlv8.record_class, 'Broken', [(1, 'a', tlv8.DataType.BYTES),
+                                                                    (1, 'b', tlv8.DataType.BYTES)])
+        self.assertRaises(ValueError, tlv8.record_class, 'Broken', [(1, 'a', tlv8.DataType.BYTES),
+                                                                    (2, 'a', tlv8.DataType.BYTES)])
+
+    def test_unsupported_data_type(self):
+        self.assertRaises(ValueError, tlv8.record_class, 'Broken', [(1, 'a', tlv8.DataType.AUTODETECT)])
@@ -0,0 +1,97 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import enum
+import unittest
+
+import tlv8
+
+
+class Keys(enum.IntEnum):
+    NAME = 1
+    KEY = 3
+    LEVEL = 11
+
+
+class TestTLV8Sequence(unittest.TestCase):
+    schema = {
+        Keys.NAME: tlv8.DataType.STRING,
+        Keys.KEY: tlv8.DataType.BYTES,
+        Keys.LEVEL: tlv8.DataType.UNSIGNED_INTEGER,
+    }
+    records = [
+        tlv8.EntryList([
+            tlv8.Entry(Keys.NAME, 'a', tlv8.DataType.STRING),
+            tlv8.Entry(Keys.KEY, b'\x01' * 300, tlv8.DataType.BYTES),
+            tlv8.Entry(Keys.LEVEL, 1, tlv8.DataType.UNSIGNED_INTEGER),
+        ]),
+        tlv8.EntryList([
+            tlv8.Entry(Keys.NAME, 'b', tlv8.DataType.STRING),
+            tlv8.Entry(Keys.KEY, b'\x02', tlv8.DataType.BYTES),
+            tlv8.Entry(Keys.LEVEL, 0, tlv8.DataType.UNSIGNED_INTEGER),
+        ]),
+    ]
+
+    def test_encode(self):
+        expected = tlv8.encode(self.records[0]) + b'\xff\x00' + tlv8.encode(self.records[1])
+        self.assertEqual(expected, tlv8.encode_sequence(self.records))
+
+    def test_encode_separator(self):
+        expected = tlv8.encode(self.records[0]) + b'\xfe\x00' + tlv8.encode(self.records[1])
+        self.assertEqual(expected, tlv8.encode_sequence(self.records, 0xfe))
+
+    def test_encode_empty(self):
+        self.assertEqual(b'', tlv8.encode_sequence([]))
+
+    def test_encode_invalid(self):
+        self.assertRaises(ValueError, tlv8.encode_sequence, [[1]])
+
+    def test_decode(self):
+        result = tlv8.decode_sequence(tlv8.encode_sequence(self.records), self.schema)
+        self.assertEqual(self.records, result)
+        self.assertIs(Keys.NAME, result[1][0].type_id)
+        self.assertEqual(tlv8.DataType.UNSIGNED_INTEGER, result[1][2].data_type)
+
+    def test_decode_separator(self):
+        result = tlv8.decode_sequence(tlv8.encode_sequence(self.records, 0xfe), self.schema, 0xfe)
+        self.assertEqual(self.records, result)
+
+    def test_decode_skips_other_entries(self):
+        data = b'\x06\x01\x02' + tlv8.encode_sequence(self.records)
+        self.assertEqual(self.records, tlv8.decode_sequence(data, self.schema))
+
+    def test_decode_drops_empty_records(self):
+        data = b'\xff\x00\x01\x01a\xff\x00\xff\x00\x06\x01\x02\xff\x00'
+        self.assertEqual([tlv8.EntryList([tlv8.Entry(1, 'a')])], tlv8.decode_sequence(data, self.schema))
+        self.assertEqual([], tlv8.decode_sequence(b'', self.schema))
+
+    def test_decode_nested(self):
+        schema = {1: {2: tlv8.DataType.INTEGER}}
+        data = b'\x01\x03\x02\x01\x05\xff\x00\x01\x03\x02\x01\x06'
+        result = tlv8.decode_sequence(data, schema)
+        self.assertEqual([5, 6], [record[0].data[0].data for record in result])
+
+    def test_decode_zero_copy(self):
+        result = tlv8.decode_sequence(tlv8.encode_sequence(self.records), self.schema, zero_copy=True)
+        self.assertIsInstance(result[1][1].data, memoryview)
+        self.assertEqual(self.records, result)
+
+    def test_decode_limits(self):
+        self.assertRaises(tlv8.LimitExceededError, tlv8.decode_sequence, tlv8.encode_sequence(self.records),
+                          self.schema, limits=tlv8.DecodeLimits(max_entries=3))
+
+    def test_decode_invalid(self):
+        self.assertRaises(ValueError, tlv8.decode_sequence, b'\x01\x05a', self.schema)
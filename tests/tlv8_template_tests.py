@@ -0,0 +1,132 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+
+import tlv8
+
+
+def _fill(entries, values):
+    result = []
+    for entry in entries:
+        data = entry.data
+        if isinstance(data, tlv8.Slot):
+            data = values[data.name]
+        elif isinstance(data, list):
+            data = _fill(data, values)
+        result.append(tlv8.Entry(entry.type_id, data, entry.data_type, entry.length))
+    return result
+
+
+class TestTLV8Template(unittest.TestCase):
+    entries = [
+        tlv8.Entry(6, 2),
+        tlv8.Entry(3, tlv8.Slot('public_key')),
+        tlv8.Entry(5, [
+            tlv8.Entry(1, 'static'),
+            tlv8.Entry(10, tlv8.Slot('signature')),
+            tlv8.Entry(10, tlv8.Slot('signature')),
+        ]),
+        tlv8.Entry(7, tlv8.Slot('error'), tlv8.DataType.UNSIGNED_INTEGER, length=2),
+        tlv8.Entry(7, b'\x01'),
+    ]
+
+    def assertRenders(self, template, entries, **values):
+        self.assertEqual(tlv8.encode(_fill(entries, values)), template.render(**values))
+
+    def test_slots(self):
+        template = tlv8.Template(self.entries)
+        self.assertEqual(('public_key', 'signature', 'error'), template.slots)
+        self.assertEqual('<Template slots=public_key, signature, error>', repr(template))
+        self.assertEqual(tlv8.Slot('a'), tlv8.Slot('a'))
+        self.assertEqual("Slot('a')", repr(tlv8.Slot('a')))
+
+    def test_render(self):
+        template = tlv8.Template(self.entries)
+        self.assertRenders(template, self.entries, public_key=b'\x01\x02', signature='sig', error=1)
+        self.assertRenders(template, self.entries, public_key=b'', signature=42, error=0)
+
+    def test_render_fragmented(self):
+        template = tlv8.Template(self.entries)
+        # the fragmentation of the slot value and the nested list change
+        self.assertRenders(template, self.entries, public_key=b'\xaa' * 384, signature=b'\xbb' * 200, error=7)
+        self.assertRenders(template, self.entries, public_key=b'\xaa' * 255, signature=b'\xbb' * 1000, error=7)
+        data = template.render(public_key=b'\xaa' * 384, signature=b'\xbb' * 200, error=7)
+        structure = {
+            6: tlv8.DataType.INTEGER,
+            3: tlv8.DataType.BYTES,
+            5: {1: tlv8.DataType.STRING, 10: tlv8.DataType.BYTES},
+        }
+        result = tlv8.decode(data, structure)
+        self.assertEqual(b'\xaa' * 384, result.first_by_id(3).data)
+        self.assertEqual(b'\xbb' * 200, result.first_by_id(5).data.first_by_id(10).data)
+
+    def test_render_nested_value(self):
+        entries = [tlv8.Entry(1, tlv8.Slot('inner'))]
+        template = tlv8.Template(entries)
+        inner = [tlv8.Entry(2, 1), tlv8.Entry(2, 2)]
+        self.assertEqual(tlv8.encode([tlv8.Entry(1, inner)]), template.render(inner=inner))
+
+    def test_static_template(self):
+        entries = [tlv8.Entry(1, 1), tlv8.Entry(1, [tlv8.Entry(2, b'\x00' * 300)])]
+        template = tlv8.Template(tlv8.EntryList(entries))
+        self.assertEqual((), template.slots)
+        self.assertEqual(tlv8.encode(entries), template.render())
+        self.assertEqual(b'', tlv8.Template([]).render())
+
+    def test_separator(self):
+        entries = [tlv8.Entry(1, tlv8.Slot('a')), tlv8.Entry(1, tlv8.Slot('b'))]
+        template = tlv8.Template(entries, separator_type_id=0)
+        self.assertEqual(b'\x01\x01\x01\x00\x00\x01\x01\x02', template.render(a=1, b=2))
+
+    def test_separator_nested(self):
+        # the separator only applies to the top level, nested lists use 0xff like tlv8.encode
+        template = tlv8.Template([
+            tlv8.Entry(1, [tlv8.Entry(2, b'a'), tlv8.Entry(2, b'b')]),
+            tlv8.Entry(3, tlv8.Slot('x')),
+        ], 0xfe)
+        expected = tlv8.encode([
+            tlv8.Entry(1, [tlv8.Entry(2, b'a'), tlv8.Entry(2, b'b')]),
+            tlv8.Entry(3, b'z'),
+        ], 0xfe)
+        self.assertEqual(expected, template.render(x=b'z'))
+        template = tlv8.Template([
+            tlv8.Entry(1, [tlv8.Entry(2, tlv8.Slot('x')), tlv8.Entry(2, b'b')]),
+            tlv8.Entry(3, tlv8.Slot('y')),
+            tlv8.Entry(3, b'c'),
+        ], 0xfe)
+        inner = [tlv8.Entry(4, 1), tlv8.Entry(4, 2)]
+        expected = tlv8.encode([
+            tlv8.Entry(1, [tlv8.Entry(2, b'a'), tlv8.Entry(2, b'b')]),
+            tlv8.Entry(3, inner),
+            tlv8.Entry(3, b'c'),
+        ], 0xfe)
+        self.assertEqual(expected, template.render(x=b'a', y=inner))
+
+    def test_wrong_values(self):
+        template = tlv8.Template(self.entries)
+        self.assertRaises(ValueError, template.render, public_key=b'', signature=b'')
+        self.assertRaises(ValueError, template.render, public_key=b'', signature=b'', error=1, foo=2)
+        self.assertRaises(ValueError, template.render, public_key=b'', signature=b'', error=1.5)
+
+    def test_invalid_entries(self):
+        self.assertRaises(ValueError, tlv8.Template, 'foo')
+        self.assertRaises(ValueError, tlv8.Template, ['foo'])
+        self.assertRaises(ValueError, tlv8.Template, [tlv8.Entry(255, tlv8.Slot('a'))])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,13 +14,34 @@
 # limitations under the License.
 #
 
+import enum
+import io
 import unittest
 import json
 
 import tlv8
 
 
+class Keys(enum.IntEnum):
+    Key = 1
+
+
+class Values(enum.IntEnum):
+    Value = 2
+
+
 class TestTLV8ToJson(unittest.TestCase):
+    nested = tlv8.EntryList([
+        tlv8.Entry(Keys.Key, Values.Value),
+        tlv8.Entry(2, tlv8.EntryList([
+            tlv8.Entry(3, 'hello'),
+            tlv8.Entry(4, [
+                tlv8.Entry(5, 1.5),
+            ]),
+        ])),
+        tlv8.Entry(6, 42),
+    ])
+
     def test_entry_to_json(self):
         e = tlv8.Entry(1, 'hello')
         j = json.dumps(e, cls=tlv8.JsonEncoder)
@@ -36,3 +57,34 @@ class TestTLV8ToJson(unittest.TestCase):
     def test_string_to_json(self):
         j = json.dumps(True, cls=tlv8.JsonEncoder)
         self.assertEqual('true', j)
+
+    def test_entry_list_to_python(self):
+        self.assertEqual([
+            {str(Keys.Key): str(Values.Value)},
+            {2: [{3: 'hello'}, {4: [{5: 1.5}]}]},
+            {6: 42}
+        ], self.nested.to_python())
+
+    def test_to_json_same_as_json_encoder(self):
+        self.assertEqual(json.dumps(self.nested, cls=tlv8.JsonEncoder), tlv8.to_json(self.nested))
+        self.assertEqual(json.dumps(self.nested.data, cls=tlv8.JsonEncoder), tlv8.to_json(self.nested.data))
+        self.assertEqual('[]', tlv8.to_json([]))
+
+    def test_to_json_file(self):
+        entries = tlv8.EntryList([tlv8.Entry(i % 256, [tlv8.Entry(1, i)]) for i in range(25)])
+        for chunk_size in [1, 7, 25, 100]:
+            fp = io.StringIO()
+            self.assertIsNone(tlv8.to_json(entries, fp, chunk_size=chunk_size))
+            self.assertEqual(tlv8.to_json(entries), fp.getvalue())
+        fp = io.StringIO()
+        tlv8.to_json([], fp)
+        self.assertEqual('[]', fp.getvalue())
+
+    def test_list_of_values_to_json(self):
+        entries = tlv8.EntryList([tlv8.Entry(1, [1, 2]), tlv8.Entry(2, [])])
+        self.assertEqual('[{"1": [1, 2]}, {"2": []}]', json.dumps(entries, cls=tlv8.JsonEncoder))
+        self.assertEqual('[{"1": [1, 2]}, {"2": []}]', tlv8.to_json(entries))
+        self.assertEqual([{1: [1, 2]}, {2: []}], entries.to_python())
+
+    def test_to_json_wrong_input(self):
+        self.assertRaises(ValueError, tlv8.to_json, 'foo')
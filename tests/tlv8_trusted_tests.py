@@ -0,0 +1,66 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import unittest
+
+import tlv8
+
+
+class SubEntry(tlv8.Entry):
+    def encode(self, separator_type_id=0xff):
+        return b'\x09\x00'
+
+
+class TestTLV8Trusted(unittest.TestCase):
+    entries = [
+        tlv8.Entry(1, 3.141),
+        tlv8.Entry(2, [
+            tlv8.Entry(3, 'hello'),
+            tlv8.Entry(3, b'world'),
+            tlv8.Entry(4, tlv8.EntryList([tlv8.Entry(5, 7, tlv8.DataType.UNSIGNED_INTEGER)])),
+        ]),
+        tlv8.Entry(2, -1),
+        tlv8.Entry(6, b'\x00' * 300),
+        tlv8.Entry(7, True),
+    ]
+
+    def test_from_trusted_entry_subclass(self):
+        entry_list = tlv8.EntryList.from_trusted([tlv8.Entry(1, 1), SubEntry(2, 2)])
+        self.assertEqual(b'\x01\x01\x01\x09\x00', entry_list.encode())
+
+    def test_from_trusted(self):
+        data = list(self.entries)
+        entry_list = tlv8.EntryList.from_trusted(data)
+        self.assertIs(data, entry_list.data)
+        self.assertEqual(tlv8.EntryList(self.entries), entry_list)
+        self.assertEqual(tlv8.encode(self.entries), entry_list.encode())
+
+    def test_from_trusted_empty(self):
+        entry_list = tlv8.EntryList.from_trusted([])
+        entry_list.append(tlv8.Entry(1, 1))
+        self.assertEqual(b'\x01\x01\x01', entry_list.encode())
+
+    def test_from_trusted_skips_checks(self):
+        entry_list = tlv8.EntryList.from_trusted([1])
+        self.assertEqual([1], entry_list.data)
+        with self.assertRaises(ValueError):
+            tlv8.EntryList([1])
+
+    def test_from_trusted_subclass(self):
+        class SubList(tlv8.EntryList):
+            pass
+
+        self.assertIsInstance(SubList.from_trusted([]), SubList)
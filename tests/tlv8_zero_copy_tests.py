@@ -0,0 +1,106 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import array
+import mmap
+import unittest
+
+import tlv8
+
+
+class TestTLV8ZeroCopy(unittest.TestCase):
+    structure = {
+        1: tlv8.DataType.BYTES,
+        2: {
+            3: tlv8.DataType.STRING,
+            4: tlv8.DataType.BYTES,
+        },
+        5: tlv8.DataType.INTEGER,
+    }
+    data = tlv8.encode([
+        tlv8.Entry(1, b'\x01\x02\x03'),
+        tlv8.Entry(2, [
+            tlv8.Entry(3, 'hello'),
+            tlv8.Entry(4, b'world'),
+        ]),
+        tlv8.Entry(5, 1000),
+        tlv8.Entry(1, b'\xaa' * 300),
+    ])
+
+    def test_decode_memoryview(self):
+        result = tlv8.decode(memoryview(self.data), self.structure)
+        self.assertEqual(tlv8.decode(self.data, self.structure), result)
+        self.assertIsInstance(result[0].data, bytes)
+
+    def test_decode_mmap(self):
+        buffer = mmap.mmap(-1, len(self.data))
+        buffer.write(self.data)
+        self.assertEqual(tlv8.decode(self.data, self.structure), tlv8.decode(buffer, self.structure))
+        self.assertEqual(tlv8.deep_decode(self.data), tlv8.deep_decode(buffer))
+        buffer.close()
+
+    def test_decode_other_formats(self):
+        words = array.array('H', [0x0201, 0x0003])
+        self.assertEqual(tlv8.decode(words.tobytes()), tlv8.decode(words))
+        self.assertEqual(tlv8.decode(words.tobytes()), tlv8.decode(memoryview(words)))
+
+    def test_decode_invalid_input(self):
+        self.assertRaises(ValueError, tlv8.decode, 'foo')
+        self.assertRaises(ValueError, tlv8.decode, 42)
+        self.assertRaises(ValueError, tlv8.decode, None, zero_copy=True)
+
+    def test_zero_copy(self):
+        source = bytearray(self.data)
+        result = tlv8.decode(source, self.structure, zero_copy=True)
+        self.assertEqual(tlv8.decode(self.data, self.structure), result)
+        self.assertIsInstance(result[0].data, memoryview)
+        self.assertIsInstance(result[1].data[0].data, str)
+        self.assertIsInstance(result[1].data[1].data, memoryview)
+        self.assertIsInstance(result[2].data, int)
+        # fragmented values need to be reassembled
+        self.assertIsInstance(result[3].data, bytes)
+        # the values reference the source
+        source[2] = 0x42
+        self.assertEqual(b'\x42\x02\x03', result[0].data)
+
+    def test_zero_copy_without_expected(self):
+        result = tlv8.decode(self.data, zero_copy=True)
+        self.assertEqual(tlv8.decode(self.data), result)
+        self.assertIsInstance(result[0].data, memoryview)
+
+    def test_zero_copy_deep_decode(self):
+        result = tlv8.deep_decode(self.data, zero_copy=True)
+        self.assertEqual(tlv8.deep_decode(self.data), result)
+        self.assertIsInstance(result[1].data, tlv8.EntryList)
+        self.assertIsInstance(result[1].data[1].data, memoryview)
+
+    def test_zero_copy_compiled_schema(self):
+        compiled = tlv8.compile_schema(self.structure)
+        result = compiled.decode(memoryview(self.data), zero_copy=True)
+        self.assertEqual(tlv8.decode(self.data, self.structure), result)
+        self.assertIsInstance(result[0].data, memoryview)
+        self.assertIsInstance(result[1].data[1].data, memoryview)
+
+    def test_encode_zero_copy_values(self):
+        result = tlv8.decode(self.data, self.structure, zero_copy=True)
+        self.assertEqual(self.data, tlv8.encode(result))
+        self.assertEqual(b'\x01\x02ab', tlv8.Entry(1, memoryview(b'ab')).encode())
+        self.assertEqual(tlv8.Entry(1, b'\x00' * 256).encode(), tlv8.Entry(1, memoryview(b'\x00' * 256)).encode())
+
+    def test_format_zero_copy_values(self):
+        result = tlv8.decode(self.data, self.structure, zero_copy=True)
+        self.assertEqual(tlv8.format_string(tlv8.decode(self.data, self.structure)), tlv8.format_string(result))
+        self.assertEqual("<1, b'\\x01\\x02\\x03'>,", result[0].format_string())
@@ -15,11 +15,27 @@
 #
 
 __all__ = [
-    'encode', 'format_string', 'decode', 'DataType', 'Entry', 'JsonEncoder'
+    'encode', 'format_string', 'decode', 'DataType', 'Entry', 'JsonEncoder', 'compile_schema', 'CompiledSchema',
+    'Record', 'record_class', 'decode_bulk', 'decode_columns', 'Column', 'to_json', 'format_to',
+    'LazyFormat', 'DecodeLimits', 'LimitExceededError', 'Template', 'Slot',
+    'iter_encode', 'encode_to', 'decode_shared',
+    'parse_events', 'EventHandler', 'iter_tokens', 'register_encoder',
+    'register_decoder', 'decode_sequence', 'encode_sequence'
 ]
 
+import array
+import binascii
+import collections
+import copyreg
 import enum
-from struct import pack, unpack, error
+import io
+import ipaddress
+import itertools
+import os
+import operator
+import sys
+import uuid
+from struct import pack, error, Struct
 import json
 
 try:
@@ -28,13 +44,39 @@ except ImportError:
     def isclose(a, b, rel_tol=1e-09, abs_tol=0.0):
         return abs(a - b) <= max(rel_tol * max(abs(a), abs(b)), abs_tol)
 
+_numpy_module = None
+# whether attaching to shared memory started a resource tracker of this process, see _attach_shared_memory
+_own_resource_tracker = None
+
+
+def _numpy():
+    """
+    Import numpy on first use. numpy is an optional dependency, so this returns None if it is not installed.
+
+    :return: the numpy module or None
+    """
+    global _numpy_module
+    if _numpy_module is None:
+        try:
+            import numpy
+            _numpy_module = numpy
+        except ImportError:
+            _numpy_module = False
+    return _numpy_module or None
+
+
+# types of entry data that cannot change without replacing the data object, see EntryList.encode
+_IMMUTABLE_TYPES = frozenset([bytes, str, int, float, bool])
+
 
 class EntryList(object):
-    def __init__(self, data=None):
+    def __init__(self, data=None, cache_segments=False):
         """
         Create a new EntryList instance. It is initialized with the given data
 
         :param data: this must be a list of Entry instances
+        :param cache_segments: if set to True, the encoded segment of each entry is kept to speed up encoding the list
+            again after modifications, see encode
         :raises: ValueError is risen if either data is not a list or not all list entries are Entry instances
         """
         if data:
@@ -47,6 +89,26 @@ class EntryList(object):
                 raise ValueError('No valid list: {e}'.format(e=data))
         else:
             self.data = []
+        self.cache_segments = cache_segments
+        # encoded segments of the entries by id of the entry, see encode
+        self._segments = {}
+        self._segments_separator = None
+        # the original bytes if decoded with keep_raw, see _retain_raw
+        self._raw = None
+
+    @classmethod
+    def from_trusted(cls, data):
+        """
+        Create a new EntryList instance from a list of Entry instances without checking the list. This is meant for
+        lists produced by code that only creates Entry instances anyway, e.g. the decoder of this module. The list is
+        used as is and not copied.
+
+        :param data: a list of Entry instances
+        :return: the EntryList instance
+        """
+        result = cls()
+        result.data = data
+        return result
 
     def append(self, entry):
         """
@@ -57,14 +119,48 @@ class EntryList(object):
         """
         if not isinstance(entry, Entry):
             raise ValueError('Not an tlv8.Entry: {e}'.format(e=entry))
+        if self._raw is not None:
+            self._release_raw()
         self.data.append(entry)
 
+    def insert(self, index, entry):
+        """
+        Inserts an tlv8.Entry into this tlv8.EntryList before index. This works like list.insert().
+
+        :param index: the index to insert the entry before
+        :param entry: the entry to insert
+        :raises: ValueError if the entry to add is no tlv8.Entry
+        """
+        if not isinstance(entry, Entry):
+            raise ValueError('Not an tlv8.Entry: {e}'.format(e=entry))
+        if self._raw is not None:
+            self._release_raw()
+        self.data.insert(index, entry)
+
     def __iter__(self):
         return self.data.__iter__()
 
     def __getitem__(self, item):
         return self.data[item]
 
+    def __setitem__(self, item, value):
+        if isinstance(item, slice):
+            # the entries are checked before the assignment, so an iterator must not be consumed twice
+            value = entries = list(value)
+        else:
+            entries = [value]
+        for entry in entries:
+            if not isinstance(entry, Entry):
+                raise ValueError('Not an tlv8.Entry: {e}'.format(e=entry))
+        if self._raw is not None:
+            self._release_raw()
+        self.data[item] = value
+
+    def __delitem__(self, item):
+        if self._raw is not None:
+            self._release_raw()
+        del self.data[item]
+
     def __len__(self):
         return self.data.__len__()
 
@@ -83,10 +179,50 @@ class EntryList(object):
 
     def __eq__(self, other):
         if isinstance(other, self.__class__):
+            # lists decoded from the same bytes in the same way are equal as long as nobody modified them
+            if self._raw is not None and other._raw is not None and self._raw.kind is other._raw.kind and \
+                    self._raw.data == other._raw.data and self._unmodified() and other._unmodified():
+                return True
             return self.data == other.data
         else:
             return False
 
+    def _unmodified(self) -> bool:
+        """
+        Check if this list (and all nested lists) is still in the state it was decoded in with keep_raw. The mutators
+        of EntryList drop the original bytes, so only the entries themselves need to be checked here.
+
+        :return: True if the raw bytes still represent this list
+        """
+        raw = self._raw
+        if raw is None:
+            return False
+        entries = self.data
+        if list(map(_entry_attributes, entries)) != raw.attributes:
+            return False
+        if raw.nested is None:
+            raw.nested = [(index, attributes[3]) for index, attributes in enumerate(raw.attributes)
+                          if attributes[3].__class__ is EntryList]
+        # an equal but replaced nested list was not decoded from the raw bytes
+        return all(entries[index].data is nested and nested._unmodified() for index, nested in raw.nested)
+
+    def _release_raw(self):
+        """
+        Drop the original bytes of a list decoded with keep_raw, because it is modified. The segments of the unchanged
+        entries with immutable data are kept as views of these bytes, so they are not encoded again, see encode.
+        """
+        raw = self._raw
+        self._raw = None
+        view = raw.data if isinstance(raw.data, memoryview) else memoryview(raw.data)
+        segments = {}
+        for entry, attributes, (start, end) in zip(self.data, raw.attributes, raw.spans):
+            value = attributes[3]
+            if entry.data is value and _entry_attributes(entry) == attributes and \
+                    (value.__class__ in _IMMUTABLE_TYPES or isinstance(value, enum.Enum)):
+                segments[id(entry)] = (entry,) + attributes + (view[start:end],)
+        self._segments = segments
+        self._segments_separator = 0xff
+
     def __repr__(self):
         return '<EntryList ' + self.data.__repr__() + '>'
 
@@ -97,10 +233,90 @@ class EntryList(object):
         :param separator_type_id: the 8-bit id of the separator to be used in two fields of the same type id are
             directly after one another in the list. The default is (as defined in table 5-6, page 51 of HomeKit
             Accessory Protocol Specification Non-Commercial Version Release R2) 0xff.
+
+        If `cache_segments` is set, the encoded segment of each entry is kept, so encoding again after changing some
+        entries only encodes the changed entries. A segment is reused if the entry still has the same type id, data
+        type, length and the very same data object and that data object is immutable (bytes, str, int, float or enum
+        member). Data that is an EntryList itself is encoded incrementally if it caches segments as well. The cache
+        holds a copy of the encoded bytes of the entries and references to the entries for as long as the list
+        exists, roughly doubling the memory used by the list.
+
+        If this list was decoded with `keep_raw=True` and is unmodified, the original bytes are returned when encoding
+        with the default separator.
+
         :return: an instance of bytes. if nothing was encoded, it returns an empty instance
         :raises ValueError: if the input parameter is not conform to a list of tlv8.Entry objects
         """
-        return encode(self.data, separator_type_id)
+        if self._raw is not None and separator_type_id == 0xff:
+            if self._unmodified():
+                return bytes(self._raw.data)
+            self._release_raw()
+        cache_segments = self.cache_segments
+        segments = self._segments if cache_segments and self._segments_separator == separator_type_id else {}
+        cache = {}
+        result = []
+        separator = None
+        last_type_id = None
+        for entry in self.data:
+            if not isinstance(entry, Entry):
+                raise ValueError('The parameter entries must only contain elements of type tlv8.Entry')
+            type_id = entry.type_id
+            if type_id == separator_type_id:
+                raise ValueError('Separator type id {st} occurs with list of entries!'.format(st=separator_type_id))
+            if last_type_id == type_id:
+                # must insert separator of two entries of the same type succeed one an other
+                if separator is None:
+                    separator = pack('<B', separator_type_id) + b'\x00'
+                result.append(separator)
+            last_type_id = type_id
+
+            data = entry.data
+            segment = segments.get(id(entry))
+            if segment is None or segment[0] is not entry or segment[1] != type_id or \
+                    segment[2] is not entry.data_type or segment[3] != entry.length or segment[4] is not data:
+                encoded = entry.encode()
+                if not cache_segments:
+                    result.append(encoded)
+                    continue
+                segment = (entry, type_id, entry.data_type, entry.length, data, encoded)
+            if data.__class__ in _IMMUTABLE_TYPES or isinstance(data, enum.Enum):
+                cache[id(entry)] = segment
+            result.append(segment[5])
+        if cache_segments:
+            self._segments = cache
+            self._segments_separator = separator_type_id
+        return b''.join(result)
+
+    def to_python(self) -> list:
+        """
+        Convert this EntryList into plain python objects of the same shape as `tlv8.JsonEncoder` creates: a list with
+        one single-item dict `{type_id: data}` per entry. Nested lists of entries become nested lists, IntEnum type ids
+        and values are converted to str. The conversion is done in one iterative pass over the whole tree.
+
+        :return: a list of dicts
+        """
+        return _to_python(self)
+
+    def __reduce__(self):
+        """
+        Pickle this EntryList in a compact form: the entries encoded as TLV8 plus a table of the type information
+        needed to restore them (see _compact_state). Lists with data that cannot be encoded exactly are pickled as list
+        of entries.
+        """
+        if self.__class__ is EntryList:
+            # the caches are not pickled, only the setting
+            settings = {'cache_segments': True} if self.cache_segments else None
+            state = _compact_state(self.data)
+            if state is not None:
+                return _restore_entry_list, state, settings
+            return EntryList, (self.data,), settings
+        return copyreg.__newobj__, (self.__class__,), _pickle_dict(self)
+
+    def __copy__(self):
+        # keep the shallow copy of the default protocol, __reduce__ would create a deep copy
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        return result
 
     def by_id(self, type_id):
         """
@@ -109,7 +325,7 @@ class EntryList(object):
         :param type_id: the type id to look for
         :return: a EntryList instance containing all found entries, the list may be empty.
         """
-        return EntryList([entry for entry in self.data if entry.type_id == type_id])
+        return EntryList.from_trusted([entry for entry in self.data if entry.type_id == type_id])
 
     def first_by_id(self, type_id):
         """
@@ -124,7 +340,7 @@ class EntryList(object):
         return None
 
 
-def format_string(entries: list, indent=0) -> str:
+def format_string(entries: list, indent=0, max_depth=None, max_entries=None, max_bytes=None, hex_bytes=False) -> str:
     """
     Format a list of TLV8 Entry objects or a EntryList as str instance. The hierarchy of the entries will be
     represented by increasing the indentation of the output.
@@ -155,18 +371,155 @@ def format_string(entries: list, indent=0) -> str:
 
     :param entries: a list of tlv8.Entries objects
     :param indent: the level of indentation to be used
+    :param max_depth: see `tlv8.format_to`
+    :param max_entries: see `tlv8.format_to`
+    :param max_bytes: see `tlv8.format_to`
+    :param hex_bytes: see `tlv8.format_to`
     :return: a str instance with the formatted representation of the input
     :raises ValueError: if the input parameter is not conform to a list of tlv8.Entry objects
     """
+    result = io.StringIO()
+    format_to(entries, result, indent, max_depth, max_entries, max_bytes, hex_bytes)
+    return result.getvalue()
+
+
+class LazyFormat(object):
+    """
+    Wrapper that defers `tlv8.format_string` until the wrapper is converted to str. This is meant for logging, where
+    the conversion only happens if the log record is actually emitted:
+    ```
+        logger.debug('received: %s', tlv8.LazyFormat(data))
+    ```
+    Raw bytes are decoded with `tlv8.deep_decode` before formatting. The result is cached, so it is created at most
+    once even if the record is emitted by multiple handlers.
+    """
+    __slots__ = ('entries', 'indent', 'max_depth', 'max_entries', 'max_bytes', 'hex_bytes', '_result')
+
+    def __init__(self, entries, indent=0, max_depth=None, max_entries=None, max_bytes=None, hex_bytes=False):
+        """
+        Create a new LazyFormat instance. Nothing is formatted or decoded here.
+
+        :param entries: a list of tlv8.Entry objects, an EntryList or bytes-like data to be decoded by deep_decode
+        :param indent: see `tlv8.format_string`
+        :param max_depth: see `tlv8.format_to`
+        :param max_entries: see `tlv8.format_to`
+        :param max_bytes: see `tlv8.format_to`
+        :param hex_bytes: see `tlv8.format_to`
+        """
+        self.entries = entries
+        self.indent = indent
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hex_bytes = hex_bytes
+        self._result = None
+
+    def __str__(self):
+        if self._result is None:
+            entries = self.entries
+            try:
+                if isinstance(entries, (bytes, bytearray, memoryview)):
+                    entries = deep_decode(entries)
+                self._result = format_string(entries, self.indent, self.max_depth, self.max_entries,
+                                             self.max_bytes, self.hex_bytes)
+            except ValueError as e:
+                # logging must not fail because of the data to be logged
+                self._result = '{d!r} (not formattable: {e})'.format(d=self.entries, e=e)
+        return self._result
+
+    def __repr__(self):
+        return self.__str__()
+
+
+def _format_value(value, max_bytes=None, hex_bytes=False) -> str:
+    """
+    Format a single (non-list) value of an entry.
+
+    :param value: the value
+    :param max_bytes: if set, bytes-like values are truncated after this number of bytes
+    :param hex_bytes: if True, bytes-like values are shown as hex string
+    :return: the str representation of the value
+    """
+    if not isinstance(value, (bytes, bytearray, memoryview)):
+        return str(value)
+    if isinstance(value, memoryview) and value.format != 'B':
+        # a zero copy array, see DataType.UINT16_ARRAY
+        return str(value.tolist())
+    if max_bytes is None and not hex_bytes:
+        return str(bytes(value) if isinstance(value, memoryview) else value)
+    length = len(value)
+    if max_bytes is not None and length > max_bytes:
+        value = value[:max_bytes]
+    else:
+        max_bytes = None
+    if hex_bytes:
+        result = binascii.hexlify(value).decode()
+    else:
+        result = str(bytes(value))
+    if max_bytes is not None:
+        result += '... ({len} bytes)'.format(len=length)
+    return result
+
+
+def _format_frame(entries, indent, depth, max_entries):
+    if max_entries is None:
+        return iter(entries), indent, depth, 0
+    return itertools.islice(entries, max_entries), indent, depth, max(len(entries) - max_entries, 0)
+
+
+def format_to(entries: list, fp, indent=0, max_depth=None, max_entries=None, max_bytes=None, hex_bytes=False):
+    """
+    Write the formatted representation of a list of TLV8 Entry objects or a EntryList to a text file object. Without
+    any of the limiting options, the output is the same as the result of `tlv8.format_string`. The output is written
+    piece by piece while walking the entries, so the effort is linear in the size of the output.
+
+    :param entries: a list of tlv8.Entries objects
+    :param fp: the text file object to write to (e.g. sys.stdout or an io.StringIO)
+    :param indent: the level of indentation to be used
+    :param max_depth: if set, nested lists deeper than this level are shown as `[...]`. 0 means that only the entries
+        of the given list are shown.
+    :param max_entries: if set, only this number of entries is shown per list, followed by a line telling the
+        number of omitted entries
+    :param max_bytes: if set, bytes values are truncated after this number of bytes, followed by the full length
+    :param hex_bytes: if True, bytes values are shown as hex string instead of the python representation
+    :raises ValueError: if the input parameter is not conform to a list of tlv8.Entry objects
+    """
     if not (isinstance(entries, list) or isinstance(entries, EntryList)):
         raise ValueError('The parameter entries must be of type list or EntryList')
-    result = '[\n'
-    for entry in entries:
-        if not isinstance(entry, Entry):
-            raise ValueError('The parameter entries must only contain elements of type tlv8.Entry')
-        result += ' ' * (indent + 2) + entry.format_string(indent + 2) + '\n'
-    result += ' ' * indent + ']'
-    return result
+    write = fp.write
+    write('[\n')
+    # each stack element holds the iterator over a list, its indentation, depth and the number of omitted entries
+    stack = [_format_frame(entries, indent, 0, max_entries)]
+    while stack:
+        iterator, level_indent, depth, omitted = stack[-1]
+        nested = False
+        for entry in iterator:
+            if not isinstance(entry, Entry):
+                raise ValueError('The parameter entries must only contain elements of type tlv8.Entry')
+            write(' ' * (level_indent + 2))
+            write('<{i!s}, '.format(i=entry.type_id))
+            data = entry.data
+            if entry.data_type == DataType.TLV8 or isinstance(data, list) or isinstance(data, EntryList):
+                if not (isinstance(data, list) or isinstance(data, EntryList)):
+                    raise ValueError('The parameter entries must be of type list or EntryList')
+                if max_depth is not None and depth >= max_depth:
+                    write('[...]>,\n')
+                    continue
+                write('[\n')
+                stack.append(_format_frame(data, level_indent + 2, depth + 1, max_entries))
+                nested = True
+                break
+            write(_format_value(data, max_bytes, hex_bytes))
+            write('>,\n')
+        if nested:
+            continue
+        if omitted > 0:
+            write(' ' * (level_indent + 2))
+            write('... ({n} more entries)\n'.format(n=omitted))
+        write(' ' * level_indent + ']')
+        stack.pop()
+        if stack:
+            write('>,\n')
 
 
 def encode(entries: list, separator_type_id=0xff) -> bytes:
@@ -180,9 +533,12 @@ def encode(entries: list, separator_type_id=0xff) -> bytes:
     :return: an instance of bytes. if nothing was encoded, it returns an empty instance
     :raises ValueError: if the input parameter is not conform to a list of tlv8.Entry objects
     """
-    if not isinstance(entries, list) and not isinstance(entries, EntryList):
+    if isinstance(entries, EntryList):
+        return entries.encode(separator_type_id)
+    if not isinstance(entries, list):
         raise ValueError('The parameter entries must be of type list')
-    result = b''
+    result = []
+    separator = None
     last_type_id = None
     for entry in entries:
         if not isinstance(entry, Entry):
@@ -191,192 +547,1014 @@ def encode(entries: list, separator_type_id=0xff) -> bytes:
             raise ValueError('Separator type id {st} occurs with list of entries!'.format(st=separator_type_id))
         if last_type_id == entry.type_id:
             # must insert separator of two entries of the same type succeed one an other
-            result += pack('<B', separator_type_id) + b'\x00'
-        result += entry.encode()
+            if separator is None:
+                separator = pack('<B', separator_type_id) + b'\x00'
+            result.append(separator)
+        result.append(entry.encode())
         last_type_id = entry.type_id
-    return result
+    return b''.join(result)
 
 
-def _internal_decode(data, expected=None, strict_mode=False) -> EntryList:
-    if isinstance(data, bytearray):
-        data = bytes(data)
-    if not isinstance(data, bytes):
-        raise ValueError('data parameter must be bytes or bytearray not {}'.format(type(data)))
-    if len(data) == 0:
-        # no data, nothing to do
-        return EntryList()
-    tmp = EntryList()
-    remaining_data = data
-    while len(remaining_data) > 0:
-        if len(remaining_data) < 2:
-            # the shortest encoded TLV8 is 3 bytes, we got less, so raise an error
-            raise ValueError('Bytes with length {len} is not a valid TLV8.'.format(len=len(data)))
+def iter_encode(entries: list, separator_type_id=0xff, chunk_size=65536):
+    """
+    Encode a list of TLV Entry objects like `tlv8.encode` but return the result as an iterator of chunks. The encoded
+    size of each nested list is computed beforehand, so the whole message never needs to be held in memory. Invalid
+    entries are detected by this pre-pass, so ValueError is raised before any chunk is produced.
+
+    :param entries: a list of tlv8.Entries objects
+    :param separator_type_id: the 8-bit id of the separator, see tlv8.encode
+    :param chunk_size: the size of the chunks in bytes. Only the last chunk may be smaller.
+    :return: an iterator of bytes instances that joined are equal to the result of tlv8.encode
+    :raises ValueError: if the input parameter is not conform to a list of tlv8.Entry objects or not encodable
+    """
+    if chunk_size < 1:
+        raise ValueError('The parameter chunk_size must be positive but is {val}'.format(val=chunk_size))
+    sizes = {}
+    _measure(entries, separator_type_id, sizes)
+    return _iter_chunks(_iter_pieces(entries, separator_type_id, sizes), chunk_size)
+
+
+def encode_to(entries: list, fp, separator_type_id=0xff, chunk_size=65536) -> int:
+    """
+    Encode a list of TLV Entry objects like `tlv8.encode` and write the result to a binary file object in chunks.
+
+    :param entries: a list of tlv8.Entries objects
+    :param fp: the file object (or any other object with a `write` method accepting bytes)
+    :param separator_type_id: the 8-bit id of the separator, see tlv8.encode
+    :param chunk_size: the size of the chunks written to fp
+    :return: the number of bytes written
+    :raises ValueError: if the input parameter is not conform to a list of tlv8.Entry objects or not encodable
+    """
+    written = 0
+    for chunk in iter_encode(entries, separator_type_id, chunk_size):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def _measure(entries, separator_type_id, sizes) -> int:
+    """
+    Validate a list of entries and compute its encoded length. The data type and the length of the value of each
+    entry are stored in sizes by the id of the entry.
+
+    :return: the length of the encoded list in bytes
+    """
+    if not isinstance(entries, list) and not isinstance(entries, EntryList):
+        raise ValueError('The parameter entries must be of type list')
+    total = 0
+    last_type_id = None
+    for entry in entries:
+        if not isinstance(entry, Entry):
+            raise ValueError('The parameter entries must only contain elements of type tlv8.Entry')
+        if entry.type_id == separator_type_id:
+            raise ValueError('Separator type id {st} occurs with list of entries!'.format(st=separator_type_id))
+        if last_type_id == entry.type_id:
+            total += 2
+        last_type_id = entry.type_id
+        data_type = entry.data_type
+        if data_type == DataType.AUTODETECT:
+            data_type = _detect_data_type(entry.data)
+        # like tlv8.encode, nested lists use the default separator
+        if data_type == DataType.TLV8 or isinstance(data_type, dict):
+            length = _measure(entry.data, 0xff, sizes)
+        else:
+            length = len(_encode_value(entry.data, data_type, entry.length))
+        sizes[id(entry)] = (data_type, length)
+        total += length + 2 * max(1, (length + 254) // 255)
+    return total
+
+
+def _iter_pieces(entries, separator_type_id, sizes):
+    """
+    Generate the encoded representation of a list of entries measured by _measure as pieces of at most 255 bytes.
+    """
+    separator = pack('<B', separator_type_id) + b'\x00'
+    last_type_id = None
+    for entry in entries:
+        if last_type_id == entry.type_id:
+            yield separator
+        last_type_id = entry.type_id
+        data_type, length = sizes[id(entry)]
+        if data_type == DataType.TLV8 or isinstance(data_type, dict):
+            pieces = _iter_pieces(entry.data, 0xff, sizes)
+        else:
+            pieces = (_encode_value(entry.data, data_type, entry.length),)
+        yield from _iter_fragments(entry.type_id, length, pieces)
+
+
+def _iter_fragments(type_id, length, pieces):
+    """
+    Generate the fragments of a value with the given total length from its pieces. Each fragment gets its own type and
+    length header, see _fragment.
+    """
+    type_byte = pack('<B', type_id)
+    if length < 256:
+        yield type_byte + pack('<B', length)
+        yield from pieces
+        return
+    remaining = length
+    room = 0
+    for piece in pieces:
+        view = memoryview(piece).cast('B')
+        position = 0
+        size = len(view)
+        while position < size:
+            if room == 0:
+                room = min(255, remaining)
+                remaining -= room
+                yield type_byte + pack('<B', room)
+            end = min(size, position + room)
+            yield view[position:end]
+            room -= end - position
+            position = end
+
+
+def _iter_chunks(pieces, chunk_size):
+    buffer = bytearray()
+    for piece in pieces:
+        buffer += piece
+        while len(buffer) >= chunk_size:
+            yield bytes(buffer[:chunk_size])
+            del buffer[:chunk_size]
+    if buffer:
+        yield bytes(buffer)
+
+
+def _fragment(type_id, value) -> bytes:
+    """
+    Create the bytes representation of a single TLV8 entry from its type id and its already encoded value. Values
+    longer than 255 bytes are split up into fragments of 255 bytes, each with its own type and length header.
+
+    :param type_id: the 8-bit type id of the entry
+    :param value: the encoded value as bytes-like object
+    :return: a bytes instance
+    """
+    type_byte = pack('<B', type_id)
+    length = len(value)
+    if length < 256:
+        return type_byte + pack('<B', length) + value
+    result = []
+    for start in range(0, length, 255):
+        chunk = value[start:start + 255]
+        result.append(type_byte + pack('<B', len(chunk)))
+        result.append(chunk)
+    return b''.join(result)
+
+
+_SIGNED_INT_PACKERS = [Struct(int_format).pack for int_format in ['<b', '<h', '<i', '<q']]
+_UNSIGNED_INT_PACKERS = [Struct(int_format).pack for int_format in ['<B', '<H', '<I', '<Q']]
+_SIGNED_INT_UNPACKERS = {Struct(int_format).size: Struct(int_format).unpack for int_format in ['<b', '<h', '<i', '<q']}
+_UNSIGNED_INT_UNPACKERS = {
+    Struct(int_format).size: Struct(int_format).unpack for int_format in ['<B', '<H', '<I', '<Q']
+}
+_pack_float = Struct('<f').pack
+_unpack_float = Struct('<f').unpack
+
+
+def _pack_integer(value, packers) -> bytes:
+    """
+    Encode an integer with the minimal number of bytes (1, 2, 4 or 8) using the first fitting packer.
+
+    :param value: the integer to encode
+    :param packers: either _SIGNED_INT_PACKERS or _UNSIGNED_INT_PACKERS
+    :return: the little-endian encoded integer
+    :raises ValueError: if the integer does not fit into 64 bit
+    """
+    for packer in packers:
+        try:
+            return packer(value)
+        except error:
+            pass
+    raise ValueError('Integer {val} was to big for encoding'.format(val=value))
+
+
+def _unpack_signed(value) -> int:
+    """
+    Decode a signed little-endian integer of 1, 2, 4 or 8 bytes.
+
+    :param value: the bytes to decode
+    :return: the decoded int
+    :raises ValueError: if the length of the value is not 1, 2, 4 or 8
+    """
+    unpacker = _SIGNED_INT_UNPACKERS.get(len(value))
+    if unpacker is None:
+        raise ValueError('Signed integer of unknown length: {len}'.format(len=len(value)))
+    return unpacker(value)[0]
+
+
+def _unpack_unsigned(value) -> int:
+    """
+    Decode an unsigned little-endian integer of 1, 2, 4 or 8 bytes.
+
+    :param value: the bytes to decode
+    :return: the decoded int
+    :raises ValueError: if the length of the value is not 1, 2, 4 or 8
+    """
+    unpacker = _UNSIGNED_INT_UNPACKERS.get(len(value))
+    if unpacker is None:
+        raise ValueError('Unsigned integer of unknown length: {len}'.format(len=len(value)))
+    return unpacker(value)[0]
+
+
+def _decode_float(value) -> float:
+    return _unpack_float(value)[0]
+
+
+def _decode_string(value) -> str:
+    return str(value, 'utf-8')
+
+
+def _decode_bytes(value):
+    return value
+
+
+def _value_decoder(data_type):
+    """
+    Return a function that converts an already reassembled value into the python representation of the given data
+    type. This is used wherever values are decoded without creating tlv8.Entry objects.
+
+    :param data_type: a DataType, an IntEnum class, a dict describing a nested structure, a tlv8.Record subclass or a
+        key registered with register_decoder
+    :return: a function taking the value as bytes-like object
+    :raises ValueError: if the data type is not supported
+    """
+    if isinstance(data_type, dict):
+        return lambda value: decode(value, data_type)
+    if isinstance(data_type, type) and issubclass(data_type, Record):
+        return data_type.decode
+    if isinstance(data_type, enum.EnumMeta):
+        return lambda value: data_type(_unpack_signed(value))
+    try:
+        return _decoders[data_type]
+    except (KeyError, TypeError):
+        raise ValueError('Decoding failed, unknown data type: {dt}'.format(dt=data_type))
+
+
+def _unsupported_decoder(data_type):
+    """
+    Return a function that raises the ValueError of _value_decoder for an unsupported data type once it is called.
+    """
+    def decoder(value):
+        raise ValueError('Decoding failed, unknown data type: {dt}'.format(dt=data_type))
+    return decoder
+
+
+class LimitExceededError(ValueError):
+    """
+    Raised by the decoding functions if one of the limits given by a tlv8.DecodeLimits instance is exceeded.
+    """
+    pass
+
+
+class DecodeLimits(object):
+    """
+    Limits for decoding untrusted data. The limits are checked while walking over the data, so decoding is aborted
+    with a tlv8.LimitExceededError as soon as a limit is exceeded. Each limit defaults to None which means unlimited.
+    """
+
+    def __init__(self, max_entries=None, max_value_size=None, max_depth=None, max_fragments=None):
+        """
+        Create a new DecodeLimits instance.
+
+        :param max_entries: the maximum number of entries (including separators and entries of nested levels) that
+            may be read during one decoding call
+        :param max_value_size: the maximum size in bytes of a single value after reassembling its fragments
+        :param max_depth: the maximum number of levels, 1 means no nested entries. `decode` raises an error if the
+            expected structure leads to deeper levels, `deep_decode` does not try to decode values on the deepest
+            level any further.
+        :param max_fragments: the maximum number of fragments a single value may consist of
+        """
+        self.max_entries = max_entries
+        self.max_value_size = max_value_size
+        self.max_depth = max_depth
+        self.max_fragments = max_fragments
 
-        tlv_id = unpack('<B', remaining_data[0:1])[0]
-        tlv_len = unpack('<B', remaining_data[1:2])[0]
+    def __repr__(self):
+        return '<DecodeLimits max_entries={e}, max_value_size={v}, max_depth={d}, max_fragments={f}>'.format(
+            e=self.max_entries, v=self.max_value_size, d=self.max_depth, f=self.max_fragments)
+
+
+class _DecodeBudget(object):
+    """
+    The state of checking DecodeLimits during one decoding call. The entry counter is shared with the budgets of the
+    nested levels.
+    """
+    __slots__ = ('limits', 'counter', 'depth')
+
+    def __init__(self, limits, counter=None, depth=1):
+        self.limits = limits
+        self.counter = [0] if counter is None else counter
+        self.depth = depth
+
+    def add_entry(self, length):
+        self.counter[0] += 1
+        max_entries = self.limits.max_entries
+        if max_entries is not None and self.counter[0] > max_entries:
+            raise LimitExceededError('More than {n} entries'.format(n=max_entries))
+        self.check_value(1, length)
+
+    def check_value(self, fragments, length):
+        limits = self.limits
+        if limits.max_fragments is not None and fragments > limits.max_fragments:
+            raise LimitExceededError('Value with more than {n} fragments'.format(n=limits.max_fragments))
+        if limits.max_value_size is not None and length > limits.max_value_size:
+            raise LimitExceededError('Value longer than {n} bytes'.format(n=limits.max_value_size))
+
+    def may_nest(self):
+        return self.limits.max_depth is None or self.depth < self.limits.max_depth
+
+    def nested(self):
+        if not self.may_nest():
+            raise LimitExceededError('Entries nested deeper than {n} levels'.format(n=self.limits.max_depth))
+        return _DecodeBudget(self.limits, self.counter, self.depth + 1)
+
+
+def _budget(limits):
+    """
+    Turn the limits parameter of a decoding function into a _DecodeBudget. Nested calls pass their budget on.
+
+    :param limits: None, a DecodeLimits or a _DecodeBudget instance
+    :return: None or a _DecodeBudget instance
+    """
+    if limits is None or isinstance(limits, _DecodeBudget):
+        return limits
+    return _DecodeBudget(limits)
+
+
+def _scan(data, expected=None, strict_mode=False, budget=None, spans=None):
+    """
+    Walk over the TLV8 entries of the first level of data and yield them as tuples of type id and value. Fragments
+    are reassembled, so each yielded value is a complete value. This is the common base of all decoding functions.
+
+    :param data: a bytes instance
+    :param expected: if set, the scan stops at the first entry with a type id not in expected and a length > 0
+    :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param budget: if set, the _DecodeBudget to check the entries against
+    :param spans: if set, a list to append a tuple of start and end position in data for each yielded entry to
+    :return: a generator of (type_id, value) tuples
+    :raises: ValueError on failures during decoding
+    """
+    length = len(data)
+    position = 0
+    current_id = None
+    entry_start = 0
+    fragments = None
+    fragments_length = 0
+    while position < length:
+        if length - position < 2:
+            # the shortest encoded TLV8 is 3 bytes, we got less, so raise an error
+            raise ValueError('Bytes with length {len} is not a valid TLV8.'.format(len=length))
+        tlv_id = data[position]
+        tlv_len = data[position + 1]
         if expected and tlv_id not in expected and tlv_len > 0:
             break
-        if len(remaining_data[2:]) < tlv_len:
+        start = position + 2
+        position = start + tlv_len
+        if position > length:
             # the remaining data is less than the encoded length
-            raise ValueError('Not enough data left. {} vs {}'.format(len(remaining_data[2:]), tlv_len))
-        tlv_data = remaining_data[2:2 + tlv_len]
-        if len(tmp) > 0 and tmp[-1].type_id == tlv_id:
+            raise ValueError('Not enough data left. {} vs {}'.format(length - start, tlv_len))
+        if fragments is not None and current_id == tlv_id:
             # we have the same type id so we expect the size of the data so far to be 0 mod 255
-            if len(tmp[-1].data) % 255 != 0:
-                # it there was no max size fragment before, this is either
-                if strict_mode:
-                    # an error in strict mode
-                    raise ValueError('Missing separator detected.')
-                else:
-                    # or we let it pass as a second instance of the type id. both could be wrong
-                    tmp.append(Entry(tlv_id, tlv_data))
-            else:
+            if fragments_length % 255 == 0:
                 # max size fragments are added the new data
-                tmp[-1].data += tlv_data
-        else:
-            tmp.append(Entry(tlv_id, tlv_data))
-        remaining_data = remaining_data[2 + tlv_len:]
-    return tmp
+                fragments.append(data[start:position])
+                fragments_length += tlv_len
+                if budget is not None:
+                    budget.check_value(len(fragments), fragments_length)
+                continue
+            # it there was no max size fragment before, this is either
+            if strict_mode:
+                # an error in strict mode
+                raise ValueError('Missing separator detected.')
+            # or we let it pass as a second instance of the type id. both could be wrong
+        if fragments is not None:
+            if spans is not None:
+                spans.append((entry_start, start - 2))
+            yield current_id, fragments[0] if len(fragments) == 1 else b''.join(fragments)
+        if budget is not None:
+            budget.add_entry(tlv_len)
+        current_id = tlv_id
+        entry_start = start - 2
+        fragments = [data[start:position]]
+        fragments_length = tlv_len
+    if fragments is not None:
+        if spans is not None:
+            # after a break, position is the start of the unexpected entry
+            spans.append((entry_start, position))
+        yield current_id, fragments[0] if len(fragments) == 1 else b''.join(fragments)
+
+
+def _as_buffer(data, zero_copy=False):
+    """
+    Prepare the input of the decoding functions. Any object supporting the buffer protocol (bytes, bytearray,
+    memoryview, mmap, ...) is accepted.
+
+    :param data: the input data
+    :param zero_copy: if True, a flat memoryview of unsigned bytes onto data is returned, otherwise a bytes instance
+    :return: bytes or memoryview
+    :raises ValueError: if data does not support the buffer protocol
+    """
+    if isinstance(data, bytes) and not zero_copy:
+        return data
+    try:
+        view = memoryview(data)
+    except TypeError:
+        raise ValueError('data parameter must be a bytes-like object not {}'.format(type(data)))
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    if zero_copy:
+        return view
+    return view.tobytes()
+
 
+def _internal_decode(data, expected=None, strict_mode=False, zero_copy=False, budget=None, spans=None) -> EntryList:
+    data = _as_buffer(data, zero_copy)
+    return EntryList.from_trusted(
+        [Entry(tlv_id, value) for tlv_id, value in _scan(data, expected, strict_mode, budget, spans)])
 
-def deep_decode(data, strict_mode=False) -> EntryList:
+
+# the kind of decoding for raw bytes kept by deep_decode, see _retain_raw
+_DEEP_DECODED = object()
+
+_entry_attributes = operator.attrgetter('type_id', 'data_type', 'length', 'data')
+
+
+class _RawSpan(object):
+    """
+    The original bytes of a decoded EntryList, the positions of its entries within these bytes and the attributes the
+    entries were decoded with.
+    """
+    __slots__ = ('data', 'kind', 'spans', 'attributes', 'nested')
+
+    def __init__(self, data, kind, spans, entries):
+        self.data = data
+        self.kind = kind
+        self.spans = spans
+        self.attributes = list(map(_entry_attributes, entries))
+        # the nested lists, they were decoded with keep_raw as well. This is only collected on the first check.
+        self.nested = None
+
+
+def _retain_raw(entries, data, spans, kind):
+    """
+    Remember the original bytes of decoded entries, so encoding them unmodified can reuse the bytes (see
+    EntryList.encode). Nothing is done per entry here, the segments of the entries are only cut from the bytes once
+    the list is modified (see EntryList._release_raw).
+
+    :param entries: the decoded EntryList
+    :param data: the decoded bytes or memoryview
+    :param spans: the start and end positions of each entry in data
+    :param kind: the expected structure or _DEEP_DECODED to distinguish lists decoded from the same bytes
+    """
+    end = spans[-1][1] if spans else 0
+    entries._raw = _RawSpan(data if end == len(data) else data[:end], kind, spans, entries.data)
+    # the segments are views of the kept bytes, so caching them costs no copies
+    entries.cache_segments = True
+
+
+def deep_decode(data, strict_mode=False, zero_copy=False, limits=None, keep_raw=False) -> EntryList:
     """
     Decodes a sequence of bytes or bytearray into a list of hierarchical TLV8 Entries. This is done recursivly
     and does not consider any typing.
 
-    :param data: a bytes or bytearray instance.
+    :param data: a bytes-like object (bytes, bytearray, memoryview, mmap, ...).
     :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param zero_copy: if set to True, values that are not fragmented are memoryview instances referencing data
+        instead of copies. data must not be modified while the result is in use.
+    :param limits: a tlv8.DecodeLimits instance to restrict the effort spent on untrusted data. Values on the level
+        max_depth are not decoded any further. Only the entries of the resulting lists count towards max_entries: a
+        value that cannot be decoded as nested list within the limits is kept as bytes, like any other value that is
+        no valid TLV8.
+    :param keep_raw: if set to True, the resulting lists remember the original bytes, so encoding them unmodified
+        returns these bytes without encoding the entries again.
     :return: a list of tlv8.Entry objects
-    :raises: ValueError on failures during decoding
+    :raises: ValueError on failures during decoding, tlv8.LimitExceededError if a limit is exceeded
     """
 
-    tmp = _internal_decode(data, None, strict_mode)
-    for entry in tmp:
-        try:
-            r = deep_decode(entry.data)
-            entry.data = r
-        except Exception:
-            pass
+    budget = _budget(limits)
+    data = _as_buffer(data, zero_copy)
+    spans = [] if keep_raw else None
+    tmp = _internal_decode(data, None, strict_mode, zero_copy, budget, spans)
+    if budget is None or budget.may_nest():
+        for entry in tmp:
+            counted = None if budget is None else budget.counter[0]
+            try:
+                r = deep_decode(entry.data, zero_copy=zero_copy, limits=None if budget is None else budget.nested(),
+                                keep_raw=keep_raw)
+                entry.data = r
+            except Exception:
+                # the value stays bytes, so the entries found while trying to decode it do not count
+                if budget is not None:
+                    budget.counter[0] = counted
+    if keep_raw:
+        _retain_raw(tmp, data, spans, _DEEP_DECODED)
     return tmp
 
 
-def decode(data, expected=None, strict_mode=False) -> EntryList:
+def decode(data, expected=None, strict_mode=False, zero_copy=False, limits=None, keep_raw=False) -> EntryList:
     """
     Decodes a sequence of bytes or bytearray into a list of hierarchical TLV8 Entries.
 
-    :param data: a bytes or bytearray instance.
+    :param data: a bytes-like object (bytes, bytearray, memoryview, mmap, ...).
     :param expected: a dict of type ids onto expected DataTypes. If an entry is again a TLV8 Entry, use another dict to
          describe the hierarchical structure. This defaults to None which means not filtering will be performed but
          also no interpretation of the entries is done. This means they will be returned bytes sequence.
     :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param zero_copy: if set to True, BYTES values (and all values if expected is not given) that are not fragmented
+        are memoryview instances referencing data instead of copies. data must not be modified while the result is
+        in use.
+    :param limits: a tlv8.DecodeLimits instance to restrict the effort spent on untrusted data.
+    :param keep_raw: if set to True, the resulting lists remember the original bytes, so encoding them unmodified
+        returns these bytes without encoding the entries again.
     :return: a list of tlv8.Entry objects
-    :raises: ValueError on failures during decoding
+    :raises: ValueError on failures during decoding, tlv8.LimitExceededError if a limit is exceeded
     """
-    tmp = _internal_decode(data, expected, strict_mode)
+    budget = _budget(limits)
+    data = _as_buffer(data, zero_copy)
+    spans = [] if keep_raw else None
+    tmp = _internal_decode(data, expected, strict_mode, zero_copy, budget, spans)
 
     # if we do not know what is expected, we just return the unfiltered, uninterpreted but parsed list of entries
     if not expected:
+        if keep_raw:
+            _retain_raw(tmp, data, spans, None)
         return tmp
 
-    # generate a map between the int values and the potential enums
-    enum_map = {
-        int(x[0]): x[0] for x in expected.items()
-    }
-
-    def decode_int(tlv_entry):
-        """
-        Decode an int value from a tlv entry. This respects the length of the integer. The entry will be updated in
-        place.
+    table = _decode_table(expected, zero_copy, budget, keep_raw)
+    result = []
+    for entry in tmp:
+        item = table.get(entry.type_id)
+        if item is not None:
+            entry.type_id, entry.data_type, decoder = item
+            entry.data = decoder(entry.data)
+            result.append(entry)
+    result = EntryList.from_trusted(result)
 
-        :param tlv_entry: the tlv entry to decode
-        """
-        if tlv_len == 1:
-            tlv_entry.data = unpack('<b', tlv_entry.data)[0]
-        elif tlv_len == 2:
-            tlv_entry.data = unpack('<h', tlv_entry.data)[0]
-        elif tlv_len == 4:
-            tlv_entry.data = unpack('<i', tlv_entry.data)[0]
-        elif tlv_len == 8:
-            tlv_entry.data = unpack('<q', tlv_entry.data)[0]
+    if keep_raw:
+        if len(result) == len(tmp):
+            _retain_raw(result, data, spans, expected)
         else:
-            raise ValueError('Signed integer of unknown length: {len}'.format(len=tlv_len))
+            dropped = [entry for entry in tmp if entry.type_id not in table]
+            _retain_raw(result, data, [span for entry, span in zip(tmp, spans) if entry.type_id in table], expected)
+            if not all(entry.type_id == 0xff and len(entry.data) == 0 for entry in dropped):
+                # the bytes contain entries that are not in the list, only the segments of its entries are reused
+                result._release_raw()
+    return result
 
-    def decode_unsigned_int(tlv_entry):
-        """
-        Decode an int value from a tlv entry. This respects the length of the integer. The entry will be updated in
-        place.
 
-        :param tlv_entry: the tlv entry to decode
-        """
-        if tlv_len == 1:
-            tlv_entry.data = unpack('<B', tlv_entry.data)[0]
-        elif tlv_len == 2:
-            tlv_entry.data = unpack('<H', tlv_entry.data)[0]
-        elif tlv_len == 4:
-            tlv_entry.data = unpack('<I', tlv_entry.data)[0]
-        elif tlv_len == 8:
-            tlv_entry.data = unpack('<Q', tlv_entry.data)[0]
+def _decode_table(expected, zero_copy, budget, keep_raw) -> dict:
+    """
+    Prepare an expected structure for tlv8.decode: a dict of int type ids onto tuples of the type id to set (keeps
+    IntEnum keys), the data type and the function decoding the value. Unsupported data types get a decoder raising
+    ValueError, so decoding only fails if an entry of such a type occurs.
+    """
+    table = {}
+    for key, data_type in expected.items():
+        if isinstance(data_type, dict):
+            decoder = _nested_decoder(data_type, zero_copy, budget, keep_raw)
         else:
-            raise ValueError('Unsigned integer of unknown length: {len}'.format(len=tlv_len))
+            try:
+                decoder = _value_decoder(data_type)
+            except ValueError:
+                decoder = _unsupported_decoder(data_type)
+        table[int(key)] = (key, data_type, decoder)
+    return table
 
-    result = EntryList()
-    for entry in tmp:
-        if entry.type_id in expected:
-            if isinstance(enum_map[entry.type_id], enum.IntEnum):
-                entry.type_id = type(enum_map[entry.type_id])(entry.type_id)
-            expected_data_type = expected[entry.type_id]
-            entry.data_type = expected_data_type
-            tlv_len = len(entry.data)
-            if expected_data_type == DataType.INTEGER:
-                decode_int(entry)
-            elif expected_data_type == DataType.UNSIGNED_INTEGER:
-                decode_unsigned_int(entry)
-            elif expected_data_type == DataType.FLOAT:
-                entry.data = unpack('<f', entry.data)[0]
-            elif expected_data_type == DataType.STRING:
-                entry.data = entry.data.decode()
-            elif expected_data_type == DataType.BYTES:
-                entry.data = entry.data
-            elif isinstance(expected_data_type, dict):
-                entry.data = decode(entry.data, expected_data_type)
-            elif isinstance(expected_data_type, enum.EnumMeta):
-                decode_int(entry)
-                entry.data = expected_data_type(entry.data)
-            else:
-                raise ValueError('Decoding failed, unknown data type: {dt}'.format(dt=expected_data_type))
-            result.append(entry)
 
-    return result
+def _nested_decoder(expected, zero_copy, budget, keep_raw):
+    """
+    Return a function decoding a nested list of entries with tlv8.decode. The depth limit is checked on each call.
+    """
+    def decoder(value):
+        return decode(value, expected, zero_copy=zero_copy, limits=None if budget is None else budget.nested(),
+                      keep_raw=keep_raw)
+    return decoder
 
 
-class DataType(enum.IntEnum):
+def decode_sequence(data, record_schema, separator_type_id=0xff, strict_mode=False, zero_copy=False,
+                    limits=None) -> list:
     """
-    The various types of data that can be used in the tlv8 context.
+    Decodes a sequence of records separated by separator entries (e.g. the pairings of a HAP List Pairings response)
+    into one tlv8.EntryList per record in a single pass over data. Entries with type ids not in record_schema are
+    skipped, records without any entry are dropped. Because the separator also separates entries of the same type, the
+    records must not contain two entries of the same type id one after another.
+
+    :param data: a bytes-like object (bytes, bytearray, memoryview, mmap, ...).
+    :param record_schema: a dict of type ids onto expected DataTypes as for `tlv8.decode` describing one record
+    :param separator_type_id: the 8-bit type id of the entries separating the records
+    :param strict_mode: see `tlv8.decode`
+    :param zero_copy: see `tlv8.decode`
+    :param limits: a tlv8.DecodeLimits instance to restrict the effort spent on untrusted data.
+    :return: a list of tlv8.EntryList objects
+    :raises: ValueError on failures during decoding, tlv8.LimitExceededError if a limit is exceeded
     """
-    BYTES = 1
-    TLV8 = 2
-    INTEGER = 3
-    FLOAT = 4
-    STRING = 5
-    AUTODETECT = 6  # only during encoding
-    UNSIGNED_INTEGER = 7
+    budget = _budget(limits)
+    data = _as_buffer(data, zero_copy)
+    table = _decode_table(record_schema, zero_copy, budget, False)
+    records = []
+    entries = []
+    for tlv_id, value in _scan(data, None, strict_mode, budget):
+        if tlv_id == separator_type_id:
+            if entries:
+                records.append(EntryList.from_trusted(entries))
+                entries = []
+            continue
+        item = table.get(tlv_id)
+        if item is not None:
+            type_id, data_type, decoder = item
+            entries.append(Entry(type_id, decoder(value), data_type))
+    if entries:
+        records.append(EntryList.from_trusted(entries))
+    return records
+
+
+def encode_sequence(records, separator_type_id=0xff) -> bytes:
+    """
+    Encodes a sequence of records into one sequence of bytes with a separator entry between each two records. This
+    reverses `tlv8.decode_sequence`.
+
+    :param records: a list of records, each a list of tlv8.Entry objects or a tlv8.EntryList
+    :param separator_type_id: the 8-bit type id of the entries separating the records (and entries of the same type
+        within a record)
+    :return: an instance of bytes
+    :raises ValueError: if a record is not conform to a list of tlv8.Entry objects
+    """
+    separator = pack('<B', separator_type_id) + b'\x00'
+    result = []
+    for record in records:
+        if result:
+            result.append(separator)
+        result.append(encode(record, separator_type_id))
+    return b''.join(result)
 
 
-class Entry:
-    def __init__(self,
-                 type_id: int,
-                 data,
-                 data_type: DataType = DataType.AUTODETECT,
-                 length=-1):
+class EventHandler(object):
+    """
+    Base class for the handlers of `tlv8.parse_events`. All callbacks do nothing by default, so subclasses only need
+    to override the callbacks they are interested in.
+    """
+
+    def start_list(self, type_id):
         """
-        Create an tlv8 entry instance.
+        Called when a nested list of entries starts.
 
-        :param type_id: the type id of the entry. Must be between 0 and 255 (8-bit type id)
-        :param data: the data to be stored in this entry.
-        :param data_type: the data type of the entry. Defaults to DataType.AUTODETECT.
-        :param length: if set, this overrides the automatic length detection.
-            Only applied to integers. Can be used when there is special need
-            to set higher byte count than the value would need.
+        :param type_id: the type id of the entry containing the list
+        """
+        pass
+
+    def value(self, type_id, value):
+        """
+        Called for each entry that is not a nested list.
+
+        :param type_id: the type id of the entry
+        :param value: the decoded value (or the raw bytes if no expected structure was given)
+        """
+        pass
+
+    def end_list(self, type_id):
+        """
+        Called when a nested list of entries ends.
+
+        :param type_id: the type id of the entry containing the list
+        """
+        pass
+
+
+def parse_events(data, handler, expected=None, strict_mode=False, zero_copy=False):
+    """
+    Decodes data like `tlv8.decode` but instead of building tlv8.Entry and tlv8.EntryList objects, the callbacks of
+    handler are called while walking over the data. The expected structure decides which values are decoded as nested
+    lists (`start_list`, events of the nested entries, `end_list`) and how the other values are decoded (`value`).
+    Entries with type ids not in expected are skipped.
+
+    :param data: a bytes-like object (bytes, bytearray, memoryview, mmap, ...).
+    :param handler: an object with the methods of tlv8.EventHandler
+    :param expected: a dict of type ids onto expected DataTypes as for `tlv8.decode`. If not given, `value` is called
+        with the raw bytes of each entry of the first level.
+    :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param zero_copy: if set to True, BYTES values that are not fragmented are memoryview instances referencing data.
+    :raises: ValueError on failures during decoding
+    """
+    data = _as_buffer(data, zero_copy)
+    if not expected:
+        value = handler.value
+        for tlv_id, raw in _scan(data, None, strict_mode):
+            value(tlv_id, raw)
+        return
+    _parse_events(data, handler, _event_table(expected), strict_mode)
+
+
+def _event_table(expected) -> dict:
+    """
+    Prepare an expected structure for _parse_events: a dict of int type ids onto tuples of the type id passed to the
+    handler (keeps IntEnum keys) and either a nested table or a decoder function.
+    """
+    table = {}
+    for key, data_type in expected.items():
+        if isinstance(data_type, dict):
+            table[int(key)] = (key, _event_table(data_type), None)
+        else:
+            table[int(key)] = (key, None, _value_decoder(data_type))
+    return table
+
+
+def _parse_events(data, handler, table, strict_mode):
+    for tlv_id, raw in _scan(data, table, strict_mode):
+        item = table.get(tlv_id)
+        if item is None:
+            continue
+        type_id, nested, decoder = item
+        if nested is None:
+            handler.value(type_id, decoder(raw))
+        else:
+            handler.start_list(type_id)
+            _parse_events(raw, handler, nested, strict_mode)
+            handler.end_list(type_id)
+
+
+def iter_tokens(data, expected=None, strict_mode=False, separator_type_id=0xff):
+    """
+    Walk over data lazily and yield a (depth, type_id, value) tuple per entry, so callers can stop as soon as they
+    found what they need. Fragments are reassembled and separators are skipped. The values are not decoded: they are
+    memoryview instances referencing data or bytes for fragmented values. Entries of nested lists (a dict in expected)
+    follow the token of the list entry with a depth increased by one. Entries with type ids not in expected are
+    skipped, just like with `tlv8.decode`.
+
+    :param data: a bytes-like object (bytes, bytearray, memoryview, mmap, ...). It must not be modified while the
+        tokens are in use.
+    :param expected: a dict of type ids onto expected DataTypes as for `tlv8.decode`. If not given, only the entries
+        of the first level are yielded.
+    :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param separator_type_id: the type id of empty entries to skip if expected is not given
+    :return: an iterator of (depth, type_id, value) tuples
+    :raises: ValueError on failures during decoding (while iterating)
+    """
+    data = _as_buffer(data, zero_copy=True)
+    if not expected:
+        return (
+            (0, tlv_id, value) for tlv_id, value in _scan(data, None, strict_mode)
+            if tlv_id != separator_type_id or len(value) > 0
+        )
+    return _iter_tokens(data, _token_table(expected), strict_mode, 0)
+
+
+def _token_table(expected) -> dict:
+    """
+    Prepare an expected structure for _iter_tokens: a dict of int type ids onto tuples of the type id to yield (keeps
+    IntEnum keys) and the nested table or None.
+    """
+    return {
+        int(key): (key, _token_table(data_type) if isinstance(data_type, dict) else None)
+        for key, data_type in expected.items()
+    }
+
+
+def _iter_tokens(data, table, strict_mode, depth):
+    for tlv_id, value in _scan(data, table, strict_mode):
+        item = table.get(tlv_id)
+        if item is None:
+            continue
+        yield depth, item[0], value
+        if item[1] is not None:
+            yield from _iter_tokens(value, item[1], strict_mode, depth + 1)
+
+
+_compiled_schemas = {}
+
+
+def _schema_key(expected):
+    """
+    Create a hashable key for an expected schema. The types of the keys are part of the key, because IntEnum members
+    compare equal to their int values but decode into different type ids.
+
+    :param expected: a dict of type ids onto expected DataTypes
+    :return: a tuple usable as dict key
+    """
+    items = []
+    for type_id, data_type in expected.items():
+        if isinstance(data_type, dict):
+            data_type = _schema_key(data_type)
+        items.append((int(type_id), type(type_id), type(data_type), data_type))
+    return tuple(sorted(items, key=lambda item: item[0]))
+
+
+def compile_schema(expected) -> 'CompiledSchema':
+    """
+    Create (or fetch from the cache) a decoder and an encoder specialized for the given expected schema. The result
+    of `compile_schema(expected).decode(data)` is equal to `tlv8.decode(data, expected)`, but the interpretation of
+    the schema is done only once when the schema is compiled.
+
+    :param expected: a dict of type ids onto expected DataTypes as used by `tlv8.decode`
+    :return: a CompiledSchema instance
+    """
+    if not expected:
+        expected = {}
+    key = _schema_key(expected)
+    compiled = _compiled_schemas.get(key)
+    if compiled is None:
+        compiled = CompiledSchema(expected)
+        _compiled_schemas[key] = compiled
+    return compiled
+
+
+class CompiledSchema(object):
+    """
+    Decoder and encoder generated as python source code for one expected schema. Use `tlv8.compile_schema` to get
+    cached instances.
+
+    The attributes are:
+        - `expected`: the schema the functions were generated for
+        - `decode(data, strict_mode=False, zero_copy=False, limits=None)`: works like `tlv8.decode(data, expected,
+          strict_mode, zero_copy, limits)`
+        - `encode(entries, separator_type_id=0xff)`: works like `tlv8.encode(entries, separator_type_id)` but uses
+          the schema's data types for entries whose data type matches the schema instead of the generic encoding
+        - `source`: the generated source code of both functions
+    """
+
+    def __init__(self, expected):
+        self.expected = expected
+        namespace = {
+            'Entry': Entry,
+            'EntryList': EntryList,
+            '_internal_decode': _internal_decode,
+            '_as_buffer': _as_buffer,
+            '_budget': _budget,
+            '_decode_string': _decode_string,
+            '_scan': _scan,
+            '_fragment': _fragment,
+            '_pack_integer': _pack_integer,
+            '_pack_float': _pack_float,
+            '_unpack_signed': _unpack_signed,
+            '_unpack_unsigned': _unpack_unsigned,
+            '_unpack_float': _unpack_float,
+            '_SIGNED_INT_PACKERS': _SIGNED_INT_PACKERS,
+            '_UNSIGNED_INT_PACKERS': _UNSIGNED_INT_PACKERS,
+            '_type_ids': frozenset(int(type_id) for type_id in expected),
+            'pack': pack,
+        }
+        decode_branches = []
+        encode_branches = []
+        for index, (type_id, data_type) in enumerate(expected.items()):
+            key_name = '_key_{i}'.format(i=index)
+            type_name = '_type_{i}'.format(i=index)
+            namespace[key_name] = type_id
+            namespace[type_name] = data_type
+            decoded, encoded = self._expressions(index, data_type, namespace)
+            if decoded is None:
+                decode_branches.append((
+                    int(type_id),
+                    "raise ValueError('Decoding failed, unknown data type: {{dt}}'.format(dt={t}))".format(
+                        t=type_name)))
+            else:
+                decode_branches.append((
+                    int(type_id), 'append(Entry({k}, {d}, {t}))'.format(k=key_name, d=decoded, t=type_name)))
+            if encoded is not None:
+                condition = 'data_type is {t}'.format(t=type_name)
+                if '_pack_integer' in encoded:
+                    # the length overwrite is only supported by the generic encoding
+                    condition += ' and entry.length <= 0'
+                encode_branches.append((int(type_id), condition, 'append(_fragment(type_id, {e}))'.format(e=encoded)))
+
+        lines = [
+            'def decode(data, strict_mode=False, zero_copy=False, limits=None):',
+            '    data = _as_buffer(data, zero_copy)',
+            '    budget = _budget(limits)',
+        ]
+        if not decode_branches:
+            lines.append('    return _internal_decode(data, None, strict_mode, zero_copy, budget)')
+        else:
+            lines += [
+                '    entries = []',
+                '    append = entries.append',
+                '    for tlv_id, value in _scan(data, _type_ids, strict_mode, budget):',
+            ]
+            keyword = 'if'
+            for type_id, statement in decode_branches:
+                lines.append('        {k} tlv_id == {i}:'.format(k=keyword, i=type_id))
+                lines.append('            ' + statement)
+                keyword = 'elif'
+            lines += [
+                '    result = EntryList()',
+                '    result.data = entries',
+                '    return result',
+            ]
+        lines += [
+            '',
+            '',
+            'def encode(entries, separator_type_id=0xff):',
+            '    if not isinstance(entries, list) and not isinstance(entries, EntryList):',
+            "        raise ValueError('The parameter entries must be of type list')",
+            '    result = []',
+            '    append = result.append',
+            '    separator = None',
+            '    last_type_id = None',
+            '    for entry in entries:',
+            '        if not isinstance(entry, Entry):',
+            "            raise ValueError('The parameter entries must only contain elements of type tlv8.Entry')",
+            '        type_id = entry.type_id',
+            '        if type_id == separator_type_id:',
+            "            raise ValueError('Separator type id {st} occurs with list of entries!'.format("
+            'st=separator_type_id))',
+            '        if type_id == last_type_id:',
+            '            if separator is None:',
+            "                separator = pack('<B', separator_type_id) + b'\\x00'",
+            '            append(separator)',
+        ]
+        if encode_branches:
+            lines.append('        data_type = entry.data_type')
+            keyword = 'if'
+            for type_id, condition, statement in encode_branches:
+                lines.append('        {k} type_id == {i} and {c}:'.format(k=keyword, i=type_id, c=condition))
+                lines.append('            ' + statement)
+                keyword = 'elif'
+            lines += [
+                '        else:',
+                '            append(entry.encode())',
+            ]
+        else:
+            lines.append('        append(entry.encode())')
+        lines += [
+            '        last_type_id = type_id',
+            "    return b''.join(result)",
+            '',
+        ]
+        self.source = '\n'.join(lines)
+        exec(compile(self.source, '<tlv8 compiled schema>', 'exec'), namespace)
+        self.decode = namespace['decode']
+        self.encode = namespace['encode']
+
+    @staticmethod
+    def _expressions(index, data_type, namespace):
+        """
+        Create the source code expressions to decode the variable `value` and to encode the variable `entry` for the
+        given data type. The checks are done in the same order as in `tlv8.decode`.
+
+        :return: a tuple of decode and encode expression, each may be None if there is no specialized code
+        """
+        if data_type == DataType.INTEGER:
+            return '_unpack_signed(value)', '_pack_integer(entry.data, _SIGNED_INT_PACKERS)'
+        if data_type == DataType.UNSIGNED_INTEGER:
+            return '_unpack_unsigned(value)', '_pack_integer(entry.data, _UNSIGNED_INT_PACKERS)'
+        if data_type == DataType.FLOAT:
+            return '_unpack_float(value)[0]', '_pack_float(entry.data)'
+        if data_type == DataType.STRING:
+            return '_decode_string(value)', 'entry.data.encode()'
+        if data_type == DataType.BYTES:
+            return 'value', 'entry.data'
+        if isinstance(data_type, dict):
+            nested = compile_schema(data_type)
+            decoder_name = '_decode_{i}'.format(i=index)
+            encoder_name = '_encode_{i}'.format(i=index)
+            namespace[decoder_name] = nested.decode
+            namespace[encoder_name] = nested.encode
+            return ('{d}(value, zero_copy=zero_copy, limits=None if budget is None else budget.nested())'.format(
+                d=decoder_name), '{e}(entry.data)'.format(e=encoder_name))
+        if isinstance(data_type, enum.EnumMeta):
+            return ('_type_{i}(_unpack_signed(value))'.format(i=index),
+                    '_pack_integer(entry.data, _SIGNED_INT_PACKERS)')
+        try:
+            decoder = _value_decoder(data_type)
+        except ValueError:
+            return None, None
+        # data types registered with register_decoder are encoded by the generic encoding
+        decoder_name = '_decode_{i}'.format(i=index)
+        namespace[decoder_name] = decoder
+        return '{d}(value)'.format(d=decoder_name), None
+
+
+class DataType(enum.IntEnum):
+    """
+    The various types of data that can be used in the tlv8 context.
+    """
+    BYTES = 1
+    TLV8 = 2
+    INTEGER = 3
+    FLOAT = 4
+    STRING = 5
+    AUTODETECT = 6  # only during encoding
+    UNSIGNED_INTEGER = 7
+    # packed little-endian arrays, decoded as array.array
+    UINT8_ARRAY = 8
+    UINT16_ARRAY = 9
+    UINT32_ARRAY = 10
+    FLOAT_ARRAY = 11
+
+
+class Entry:
+    def __init__(self,
+                 type_id: int,
+                 data,
+                 data_type: DataType = DataType.AUTODETECT,
+                 length=-1):
+        """
+        Create an tlv8 entry instance.
+
+        :param type_id: the type id of the entry. Must be between 0 and 255 (8-bit type id)
+        :param data: the data to be stored in this entry.
+        :param data_type: the data type of the entry. Defaults to DataType.AUTODETECT.
+        :param length: if set, this overrides the automatic length detection.
+            Only applied to integers. Can be used when there is special need
+            to set higher byte count than the value would need.
         :raises: ValueError if the type_id is not within the 8-bit range.
         """
         if type_id < 0 or 255 < type_id:
@@ -412,83 +1590,15 @@ class Entry:
         """
         Encode this TLV8 entry into a sequence of bytes.
 
+        :param separator_type_id: the separator type id used for nested lists of entries
         :return: a bytes instance
         :raises: ValueError if data to encode is not encodable (e.g. an Integer is bigger than 64 bit)
         """
         data_type = self.data_type
         if data_type == DataType.AUTODETECT:
-            # detect the data type
-            if isinstance(self.data, bytearray):
-                data_type = DataType.BYTES
-            if isinstance(self.data, bytes):
-                data_type = DataType.BYTES
-            if isinstance(self.data, float):
-                data_type = DataType.FLOAT
-            if isinstance(self.data, str):
-                data_type = DataType.STRING
-            if isinstance(self.data, int):
-                data_type = DataType.INTEGER
-            if isinstance(self.data, list):
-                data_type = DataType.TLV8
-            if isinstance(self.data, EntryList):
-                data_type = DataType.TLV8
-
-        remaining_data = None
-        supports_length_overwrite = False
-
-        if isinstance(data_type, enum.EnumMeta):
-            data_type = DataType.INTEGER
+            data_type = _detect_data_type(self.data)
 
-        if data_type == DataType.BYTES:
-            remaining_data = self.data
-        elif data_type == DataType.TLV8 or isinstance(data_type, dict):
-            remaining_data = encode(self.data, separator_type_id)
-        elif data_type == DataType.INTEGER:
-            supports_length_overwrite = True
-            for int_format in ['<b', '<h', '<i', '<q']:
-                try:
-                    remaining_data = pack(int_format, self.data)
-                    break
-                except error:
-                    pass
-            if not remaining_data:
-                raise ValueError('Integer {val} was to big for encoding'.format(val=self.data))
-        elif data_type == DataType.UNSIGNED_INTEGER:
-            supports_length_overwrite = True
-            for int_format in ['<B', '<H', '<I', '<Q']:
-                try:
-                    remaining_data = pack(int_format, self.data)
-                    break
-                except error:
-                    pass
-            if not remaining_data:
-                raise ValueError('Integer {val} was to big for encoding'.format(val=self.data))
-        elif data_type == DataType.FLOAT:
-            remaining_data = pack('<f', self.data)
-        elif data_type == DataType.STRING:
-            remaining_data = self.data.encode()
-        if remaining_data is None:
-            raise ValueError('Data {val} of type {type} could not be encoded'.format(val=self.data, type=data_type))
-
-        if supports_length_overwrite and (self.length > 0):
-            remaining_data += bytes(self.length - len(remaining_data))
-
-        result = pack('<B', self.type_id)
-        if len(remaining_data) == 0:
-            result += b'\x00'
-        else:
-            while len(remaining_data) > 0:
-                if len(remaining_data) < 256:
-                    result += pack('<B', len(remaining_data))
-                    result += remaining_data
-                    remaining_data = []
-                else:
-                    result += b'\xff'
-                    result += remaining_data[:255]
-                    remaining_data = remaining_data[255:]
-                    result += pack('<B', self.type_id)
-
-        return result
+        return _fragment(self.type_id, _encode_value(self.data, data_type, self.length, separator_type_id))
 
     def format_string(self, indent=0):
         """
@@ -501,10 +1611,632 @@ class Entry:
         if self.data_type == DataType.TLV8 or isinstance(self.data, list) or isinstance(self.data, EntryList):
             result += format_string(self.data, indent)
         else:
-            result += str(self.data)
+            result += _format_value(self.data)
         result += '>,'
         return result
 
+    def __reduce__(self):
+        """
+        Pickle this entry without its attribute dict. Nested lists of entries are pickled in the compact form of
+        EntryList.
+        """
+        if self.__class__ is not Entry:
+            return copyreg.__newobj__, (self.__class__,), self.__dict__
+        if isinstance(self.data, list) or isinstance(self.data, EntryList):
+            state = _compact_state([self])
+            if state is not None:
+                return _restore_entry, state
+        return Entry, (self.type_id, self.data, self.data_type, self.length)
+
+    def __copy__(self):
+        # keep the shallow copy of the default protocol, __reduce__ would create a deep copy of nested lists
+        result = self.__class__.__new__(self.__class__)
+        result.__dict__.update(self.__dict__)
+        return result
+
+
+def register_encoder(python_type, encoder):
+    """
+    Register how values of a python type (and its subclasses) are encoded if the data type of an entry is
+    `DataType.AUTODETECT`. A registered encoder replaces the one of the same type, the encoder of the most specific
+    class in the method resolution order of a value's class is used.
+
+    Example:
+    ```
+        tlv8.register_encoder(Color, lambda color: bytes([color.red, color.green, color.blue]))
+    ```
+
+    :param python_type: the class of the values
+    :param encoder: either a function taking the value and returning the encoded value as bytes-like object (without
+        type and length header) or a DataType the value is encoded as
+    :raises ValueError: if python_type is not a class or encoder is neither callable nor a DataType
+    """
+    if not isinstance(python_type, type):
+        raise ValueError('The parameter python_type must be a class but is {val}'.format(val=python_type))
+    if not (isinstance(encoder, DataType) or callable(encoder)) or isinstance(encoder, enum.EnumMeta):
+        raise ValueError('The parameter encoder must be callable or a DataType but is {val}'.format(val=encoder))
+    _encoders[python_type] = encoder
+    _encoder_cache.clear()
+
+
+def _detect_data_type(data):
+    """
+    Detect the DataType to encode a value with from its python type. The registered encoders are looked up along the
+    method resolution order of the class of the value once, the result is cached by class.
+
+    :param data: the value
+    :return: the detected DataType, the registered encoder function or DataType.AUTODETECT if the type is not supported
+    """
+    data_class = type(data)
+    data_type = _encoder_cache.get(data_class)
+    if data_type is None:
+        data_type = DataType.AUTODETECT
+        for base in data_class.__mro__:
+            if base in _encoders:
+                data_type = _encoders[base]
+                break
+        _encoder_cache[data_class] = data_type
+    return data_type
+
+
+def _encode_uuid(value) -> bytes:
+    return value.bytes
+
+
+def _encode_ip_address(value) -> bytes:
+    return value.packed
+
+
+# encoders by python type, either a DataType or a function returning the encoded value, see register_encoder
+_encoders = {
+    bytes: DataType.BYTES,
+    bytearray: DataType.BYTES,
+    memoryview: DataType.BYTES,
+    float: DataType.FLOAT,
+    str: DataType.STRING,
+    int: DataType.INTEGER,
+    bool: DataType.INTEGER,
+    list: DataType.TLV8,
+    EntryList: DataType.TLV8,
+    uuid.UUID: _encode_uuid,
+    ipaddress.IPv4Address: _encode_ip_address,
+    ipaddress.IPv6Address: _encode_ip_address,
+}
+# the result of _detect_data_type by the class of the value
+_encoder_cache = {}
+
+
+def register_decoder(key, decoder, encoder=None):
+    """
+    Register a data type for the expected structures of the decoding functions. Entries of this data type are decoded
+    by calling decoder with the value and get the key as data type, so they are encoded with encoder again.
+
+    Example:
+    ```
+        tlv8.register_decoder('uint32_be', lambda value: int.from_bytes(value, 'big'),
+                              lambda value: value.to_bytes(4, 'big'))
+        tlv8.decode(data, {1: 'uint32_be', 2: uuid.UUID})
+    ```
+
+    :param key: the hashable value to use in the expected structures, e.g. a class or a str. ints (and with them
+        DataType members) are not allowed.
+    :param decoder: a function taking the value as bytes-like object (memoryview with zero_copy) and returning the
+        decoded value
+    :param encoder: a function taking a value and returning the encoded value as bytes-like object. If not given, the
+        values are encoded like with DataType.AUTODETECT, see register_encoder.
+    :raises ValueError: if the key is not allowed or the decoder or encoder is not callable
+    """
+    if isinstance(key, (int, dict)) or isinstance(key, enum.EnumMeta) or key.__hash__ is None:
+        raise ValueError('The parameter key must be a hashable, non int value but is {val}'.format(val=key))
+    if not callable(decoder):
+        raise ValueError('The parameter decoder must be callable but is {val}'.format(val=decoder))
+    if encoder is not None and not callable(encoder):
+        raise ValueError('The parameter encoder must be callable but is {val}'.format(val=encoder))
+    _decoders[key] = decoder
+    if encoder is None:
+        _data_type_encoders.pop(key, None)
+    else:
+        _data_type_encoders[key] = encoder
+    # compiled schemas contain the decoders
+    _compiled_schemas.clear()
+
+
+def _decode_bool(value) -> bool:
+    return _unpack_unsigned(value) != 0
+
+
+def _decode_uuid(value) -> uuid.UUID:
+    return uuid.UUID(bytes=bytes(value))
+
+
+def _decode_ipv4_address(value) -> ipaddress.IPv4Address:
+    return ipaddress.IPv4Address(bytes(value))
+
+
+def _decode_ipv6_address(value) -> ipaddress.IPv6Address:
+    return ipaddress.IPv6Address(bytes(value))
+
+
+def _array_typecode(typecodes, width):
+    """
+    Find the typecode of array.array whose item size is the given width. The item sizes of the typecodes depend on
+    the platform.
+
+    :param typecodes: the candidate typecodes
+    :param width: the item size in bytes
+    :return: the typecode or None
+    """
+    for typecode in typecodes:
+        if array.array(typecode).itemsize == width:
+            return typecode
+    return None
+
+
+def _array_decoder(typecode):
+    """
+    Return a function decoding a packed little-endian array of the given array.array typecode. Values that are
+    memoryview instances (see zero_copy) are cast to the item format instead of copied on little-endian platforms.
+    """
+    item_size = array.array(typecode).itemsize
+
+    def decoder(value):
+        if len(value) % item_size != 0:
+            raise ValueError('Array of {size} byte items with invalid length: {len}'.format(
+                size=item_size, len=len(value)))
+        if isinstance(value, memoryview) and sys.byteorder == 'little':
+            return value.cast(typecode)
+        result = array.array(typecode)
+        result.frombytes(value)
+        if sys.byteorder == 'big':
+            result.byteswap()
+        return result
+    return decoder
+
+
+def _encode_array(data, typecode) -> bytes:
+    """
+    Encode an array.array, a memoryview of the same item format or any iterable of numbers as packed little-endian
+    array of the given typecode.
+
+    :raises ValueError: if the values do not fit into the items of the array
+    """
+    if data.__class__ is array.array and data.typecode == typecode or \
+            isinstance(data, memoryview) and data.format == typecode:
+        if sys.byteorder == 'little':
+            return data.tobytes()
+    try:
+        data = array.array(typecode, data)
+    except (OverflowError, TypeError):
+        raise ValueError('Data {val} could not be encoded as array of type {t}'.format(val=data, t=typecode))
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data.tobytes()
+
+
+# typecodes of array.array for the array data types
+_ARRAY_TYPECODES = {
+    DataType.UINT8_ARRAY: 'B',
+    DataType.UINT16_ARRAY: _array_typecode('H', 2),
+    DataType.UINT32_ARRAY: _array_typecode('IL', 4),
+    DataType.FLOAT_ARRAY: _array_typecode('f', 4),
+}
+
+# decoders by data type, see register_decoder and _value_decoder
+_decoders = {
+    DataType.INTEGER: _unpack_signed,
+    DataType.UNSIGNED_INTEGER: _unpack_unsigned,
+    DataType.FLOAT: _decode_float,
+    DataType.STRING: _decode_string,
+    DataType.BYTES: _decode_bytes,
+    bool: _decode_bool,
+    uuid.UUID: _decode_uuid,
+    ipaddress.IPv4Address: _decode_ipv4_address,
+    ipaddress.IPv6Address: _decode_ipv6_address,
+}
+_decoders.update((data_type, _array_decoder(typecode)) for data_type, typecode in _ARRAY_TYPECODES.items())
+# encoders of the data types registered with register_decoder, the others are encoded like DataType.AUTODETECT
+_data_type_encoders = {}
+
+
+def _encode_value(data, data_type, length=-1, separator_type_id=0xff):
+    """
+    Encode the value of an entry (without type and length header) according to the given data type.
+
+    :param data: the value to encode
+    :param data_type: the DataType (or an IntEnum class for enum values, a dict for nested structures, a tlv8.Record
+        subclass, an encoder function registered with register_encoder or a data type registered with
+        register_decoder)
+    :param length: if set, integers are padded to this number of bytes
+    :param separator_type_id: the separator type id used for nested lists of entries
+    :return: a bytes-like object
+    :raises: ValueError if data to encode is not encodable (e.g. an Integer is bigger than 64 bit)
+    """
+    remaining_data = None
+    supports_length_overwrite = False
+    encoder = None
+
+    if isinstance(data_type, enum.EnumMeta):
+        data_type = DataType.INTEGER
+    elif isinstance(data_type, type) and issubclass(data_type, Record):
+        return data.encode(separator_type_id)
+    elif data_type.__class__ is not DataType and not isinstance(data_type, dict):
+        if data_type.__hash__ is not None and data_type in _decoders:
+            # a data type registered with register_decoder
+            data_type = _data_type_encoders.get(data_type) or _detect_data_type(data)
+            if data_type.__class__ is not DataType:
+                encoder = data_type
+        elif data_type is _detect_data_type(data):
+            # the function registered with register_encoder for the class of the value, see DataType.AUTODETECT. Other
+            # callables (e.g. classes) are no data types.
+            encoder = data_type
+
+    if encoder is not None:
+        remaining_data = encoder(data)
+    elif data_type == DataType.BYTES:
+        remaining_data = data
+    elif data_type == DataType.TLV8 or isinstance(data_type, dict):
+        remaining_data = encode(data, separator_type_id)
+    elif data_type == DataType.INTEGER:
+        supports_length_overwrite = True
+        remaining_data = _pack_integer(data, _SIGNED_INT_PACKERS)
+    elif data_type == DataType.UNSIGNED_INTEGER:
+        supports_length_overwrite = True
+        remaining_data = _pack_integer(data, _UNSIGNED_INT_PACKERS)
+    elif data_type == DataType.FLOAT:
+        remaining_data = _pack_float(data)
+    elif data_type == DataType.STRING:
+        remaining_data = data.encode()
+    elif data_type.__hash__ is not None and data_type in _ARRAY_TYPECODES:
+        remaining_data = _encode_array(data, _ARRAY_TYPECODES[data_type])
+    if remaining_data is None:
+        raise ValueError('Data {val} of type {type} could not be encoded'.format(val=data, type=data_type))
+
+    if supports_length_overwrite and (length > 0):
+        remaining_data += bytes(length - len(remaining_data))
+    return remaining_data
+
+
+class Slot(object):
+    """
+    Placeholder for a value that is given later on. Use it as data of a tlv8.Entry to create a tlv8.Template.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        """
+        Create a new placeholder.
+
+        :param name: the name used to pass the value to tlv8.Template.render
+        """
+        self.name = name
+
+    def __eq__(self, other):
+        return isinstance(other, Slot) and self.name == other.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    def __repr__(self):
+        return 'Slot({n!r})'.format(n=self.name)
+
+
+class _SlotPart(object):
+    """
+    A single entry of a template whose value is given on rendering.
+    """
+    __slots__ = ('name', 'type_id', 'data_type', 'length')
+
+    def __init__(self, name, type_id, data_type, length):
+        self.name = name
+        self.type_id = type_id
+        self.data_type = data_type
+        self.length = length
+
+    def render(self, values):
+        value = values[self.name]
+        data_type = self.data_type
+        if data_type == DataType.AUTODETECT:
+            data_type = _detect_data_type(value)
+        return _fragment(self.type_id, _encode_value(value, data_type, self.length))
+
+
+class _ListPart(object):
+    """
+    An entry of a template containing a list of entries with at least one slot. The header (and the fragmentation) of
+    the entry depends on the length of the rendered list.
+    """
+    __slots__ = ('type_id', 'parts')
+
+    def __init__(self, type_id, parts):
+        self.type_id = type_id
+        self.parts = parts
+
+    def render(self, values):
+        return _fragment(self.type_id, _render_parts(self.parts, values))
+
+
+def _render_parts(parts, values) -> bytes:
+    return b''.join([part if part.__class__ is bytes else part.render(values) for part in parts])
+
+
+class Template(object):
+    """
+    A list of entries that is encoded once with placeholders (tlv8.Slot instances) for the values that change between
+    messages. All static parts are kept as pre-encoded bytes, so rendering only packs the values of the slots.
+    """
+
+    def __init__(self, entries, separator_type_id=0xff):
+        """
+        Create a new template.
+
+        :param entries: a list of tlv8.Entry objects. The data of an entry can be a tlv8.Slot instance, also within
+            nested lists of entries.
+        :param separator_type_id: the 8-bit id of the separator, see tlv8.encode
+        :raises ValueError: if the entries cannot be encoded
+        """
+        self.separator_type_id = separator_type_id
+        names = []
+        self._parts = self._compile(entries, names, separator_type_id)
+        self.slots = tuple(names)
+
+    def _compile(self, entries, names, separator_type_id) -> list:
+        if not isinstance(entries, list) and not isinstance(entries, EntryList):
+            raise ValueError('The parameter entries must be of type list')
+        parts = []
+        static = []
+        last_type_id = None
+        for entry in entries:
+            if not isinstance(entry, Entry):
+                raise ValueError('The parameter entries must only contain elements of type tlv8.Entry')
+            if entry.type_id == separator_type_id:
+                raise ValueError('Separator type id {st} occurs with list of entries!'.format(st=separator_type_id))
+            if last_type_id == entry.type_id:
+                static.append(pack('<B', separator_type_id) + b'\x00')
+            last_type_id = entry.type_id
+
+            part = self._compile_entry(entry, names)
+            if part.__class__ is bytes:
+                static.append(part)
+                continue
+            if static:
+                parts.append(b''.join(static))
+                static = []
+            parts.append(part)
+        if static:
+            parts.append(b''.join(static))
+        return parts
+
+    def _compile_entry(self, entry, names):
+        data = entry.data
+        if isinstance(data, Slot):
+            if data.name not in names:
+                names.append(data.name)
+            return _SlotPart(data.name, entry.type_id, entry.data_type, entry.length)
+        nested = entry.data_type in (DataType.AUTODETECT, DataType.TLV8) or isinstance(entry.data_type, dict)
+        if nested and (isinstance(data, list) or isinstance(data, EntryList)):
+            # like tlv8.encode, nested lists of entries always use the default separator
+            parts = self._compile(data, names, 0xff)
+            if any(part.__class__ is not bytes for part in parts):
+                return _ListPart(entry.type_id, parts)
+            return _fragment(entry.type_id, b''.join(parts))
+        return entry.encode()
+
+    def render(self, **values) -> bytes:
+        """
+        Encode the template with the given values for the slots. The result equals tlv8.encode of the entries used to
+        create the template with each tlv8.Slot replaced by its value.
+
+        :param values: the values of the slots by name
+        :return: a bytes instance
+        :raises ValueError: if the values do not match the slots or a value is not encodable
+        """
+        if len(values) != len(self.slots) or any(name not in values for name in self.slots):
+            missing = [name for name in self.slots if name not in values]
+            unknown = [name for name in values if name not in self.slots]
+            raise ValueError('Values do not match slots of template (missing: {m}, unknown: {u})'.format(
+                m=', '.join(missing) or '-', u=', '.join(unknown) or '-'))
+        return _render_parts(self._parts, values)
+
+    def __repr__(self):
+        return '<Template slots={s}>'.format(s=', '.join(self.slots))
+
+
+_pack_double = Struct('<d').pack
+_unpack_double = Struct('<d').unpack
+
+# kinds of entry data in the compact pickle format, see _compact_state
+_PICKLE_BYTES = 0
+_PICKLE_BYTEARRAY = 1
+_PICKLE_STR = 2
+_PICKLE_INT = 3
+_PICKLE_BOOL = 4
+_PICKLE_FLOAT = 5
+_PICKLE_ENUM = 6
+_PICKLE_ENTRY_LIST = 7
+_PICKLE_LIST = 8
+
+
+class _NotCompact(Exception):
+    pass
+
+
+def _pickle_dict(entry_list) -> dict:
+    # the caches of an EntryList are not pickled
+    return dict(entry_list.__dict__, _segments={}, _segments_separator=None, _raw=None)
+
+
+def _compact_state(entries):
+    """
+    Create the compact pickle state of a list of entries: the entries are encoded as TLV8 (with floats as 8 byte
+    doubles to keep them exact) and each entry gets an index into a table of distinct tuples of (kind of data, data
+    type, length, enum type id or None, enum class or None). The indices are stored in pre-order of the tree.
+
+    :param entries: a list of tlv8.Entry objects
+    :return: a tuple (encoded, indices, table) or None if the entries cannot be restored exactly from this form
+    """
+    indices = []
+    table = []
+    try:
+        encoded = _compact_encode(entries, indices, table, {})
+    except (_NotCompact, ValueError, TypeError, OverflowError, UnicodeError, error):
+        return None
+    return encoded, bytes(indices) if len(table) <= 256 else array.array('I', indices), tuple(table)
+
+
+def _compact_encode(entries, indices, table, table_indices) -> bytes:
+    result = []
+    last_type_id = None
+    for entry in entries:
+        if entry.__class__ is not Entry or len(entry.__dict__) != 4:
+            raise _NotCompact()
+        type_id = entry.type_id
+        if type_id == 0xff:
+            raise _NotCompact()
+        if last_type_id == type_id:
+            result.append(b'\xff\x00')
+        last_type_id = type_id
+
+        position = len(indices)
+        indices.append(0)
+        data = entry.data
+        data_class = data.__class__
+        enum_class = None
+        if data_class is bytes:
+            kind, value = _PICKLE_BYTES, data
+        elif data_class is str:
+            kind, value = _PICKLE_STR, data.encode()
+        elif data_class is int:
+            kind, value = _PICKLE_INT, _pack_integer(data, _SIGNED_INT_PACKERS)
+        elif data_class is float:
+            kind, value = _PICKLE_FLOAT, _pack_double(data)
+        elif data_class is EntryList:
+            kind, value = _PICKLE_ENTRY_LIST, _compact_encode(data.data, indices, table, table_indices)
+        elif data_class is list:
+            kind, value = _PICKLE_LIST, _compact_encode(data, indices, table, table_indices)
+        elif data_class is bool:
+            kind, value = _PICKLE_BOOL, b'\x01' if data else b'\x00'
+        elif data_class is bytearray:
+            kind, value = _PICKLE_BYTEARRAY, bytes(data)
+        elif isinstance(data, enum.Enum) and data.value.__class__ is int:
+            kind, value, enum_class = _PICKLE_ENUM, _pack_integer(data.value, _SIGNED_INT_PACKERS), data_class
+        else:
+            raise _NotCompact()
+
+        meta = (kind, entry.data_type, entry.length, None if type_id.__class__ is int else type_id, enum_class)
+        key = meta if not isinstance(entry.data_type, dict) else meta[:1] + (id(entry.data_type),) + meta[2:]
+        index = table_indices.get(key)
+        if index is None:
+            index = table_indices[key] = len(table)
+            table.append(meta)
+        indices[position] = index
+        if len(value) < 256:
+            result.append(pack('<BB', type_id, len(value)))
+            result.append(value)
+        else:
+            result.append(_fragment(type_id, value))
+    return b''.join(result)
+
+
+def _compact_decode(data, indices, table) -> list:
+    result = []
+    for type_id, value in _scan(data):
+        if type_id == 0xff:
+            continue
+        kind, data_type, length, enum_type_id, enum_class = table[next(indices)]
+        if kind == _PICKLE_BYTES:
+            pass
+        elif kind == _PICKLE_STR:
+            value = _decode_string(value)
+        elif kind == _PICKLE_INT:
+            value = _unpack_signed(value)
+        elif kind == _PICKLE_FLOAT:
+            value = _unpack_double(value)[0]
+        elif kind == _PICKLE_ENTRY_LIST:
+            value = EntryList.from_trusted(_compact_decode(value, indices, table))
+        elif kind == _PICKLE_LIST:
+            value = _compact_decode(value, indices, table)
+        elif kind == _PICKLE_BOOL:
+            value = value == b'\x01'
+        elif kind == _PICKLE_BYTEARRAY:
+            value = bytearray(value)
+        else:
+            value = enum_class(_unpack_signed(value))
+        result.append(Entry(type_id if enum_type_id is None else enum_type_id, value, data_type, length))
+    return result
+
+
+def _restore_entry_list(data, indices, table) -> EntryList:
+    """
+    Restore an EntryList pickled by EntryList.__reduce__.
+    """
+    return EntryList.from_trusted(_compact_decode(data, iter(indices), table))
+
+
+def _restore_entry(data, indices, table) -> Entry:
+    """
+    Restore an Entry pickled by Entry.__reduce__.
+    """
+    return _compact_decode(data, iter(indices), table)[0]
+
+
+def _to_python(entries) -> list:
+    """
+    Iteratively convert a list of tlv8.Entry objects into the structure described at `EntryList.to_python`. Only lists
+    of tlv8.Entry objects are converted, other lists are kept as they are.
+
+    :param entries: a list of tlv8.Entry objects or an EntryList
+    :return: a list of dicts
+    """
+    plain_types = (str, int, float, bytes, bool, type(None))
+    int_enum = enum.IntEnum
+    result = []
+    stack = [(iter(entries), result.append)]
+    while stack:
+        iterator, append = stack[-1]
+        for entry in iterator:
+            key = entry.type_id
+            if type(key) is not int and isinstance(key, int_enum):
+                key = str(key)
+            value = entry.data
+            if type(value) in plain_types:
+                append({key: value})
+            elif isinstance(value, (list, EntryList)) and all(isinstance(item, Entry) for item in value):
+                children = []
+                append({key: children})
+                stack.append((iter(value), children.append))
+                break
+            elif isinstance(value, int_enum):
+                append({key: str(value)})
+            else:
+                append({key: value})
+        else:
+            stack.pop()
+    return result
+
+
+def to_json(entries, fp=None, chunk_size=1000):
+    """
+    Serialize a list of tlv8.Entry objects or an EntryList to JSON. The result is the same as
+    `json.dumps(entries, cls=tlv8.JsonEncoder)`, but the conversion is done in one pass per entry list.
+
+    :param entries: a list of tlv8.Entry objects or an EntryList
+    :param fp: if set, the JSON is written to this text file object. The entries are converted and written in chunks of
+        `chunk_size` top level entries, so huge lists do not need to be converted at once.
+    :param chunk_size: the number of top level entries converted at once when writing to fp
+    :return: the JSON as str if fp is None, None otherwise
+    :raises ValueError: if the input parameter is not a list or EntryList
+    """
+    if not isinstance(entries, (list, EntryList)):
+        raise ValueError('The parameter entries must be of type list or EntryList')
+    if fp is None:
+        return json.dumps(_to_python(entries))
+    fp.write('[')
+    for start in range(0, len(entries), chunk_size):
+        if start > 0:
+            fp.write(', ')
+        fp.write(json.dumps(_to_python(entries[start:start + chunk_size]))[1:-1])
+    fp.write(']')
+
 
 class JsonEncoder(json.JSONEncoder):
     """
@@ -523,5 +2255,445 @@ class JsonEncoder(json.JSONEncoder):
                 value = str(o.data)
             return {key: value}
         if isinstance(o, EntryList):
-            return o.data
+            return _to_python(o)
         return json.JSONEncoder.default(self, o)
+
+
+class Record(object):
+    """
+    Base class for record classes created by `tlv8.record_class`. Records are decoded directly from bytes into the
+    attributes of the instance, without creating tlv8.Entry or tlv8.EntryList objects in between.
+    """
+    __slots__ = ()
+    _fields = ()
+    _decoders = {}
+    _type_ids = frozenset()
+
+    def __init__(self, **kwargs):
+        for _, name, _ in self._fields:
+            setattr(self, name, kwargs.pop(name, None))
+        if kwargs:
+            raise TypeError('Unknown fields for {c}: {f}'.format(c=self.__class__.__name__, f=', '.join(kwargs)))
+
+    def __eq__(self, other):
+        if isinstance(other, self.__class__):
+            return all(getattr(self, name) == getattr(other, name) for _, name, _ in self._fields)
+        else:
+            return False
+
+    def __repr__(self):
+        return '<{c} {f}>'.format(
+            c=self.__class__.__name__,
+            f=', '.join('{n}={v!r}'.format(n=name, v=getattr(self, name)) for _, name, _ in self._fields))
+
+    @classmethod
+    def decode(cls, data, strict_mode=False) -> 'Record':
+        """
+        Decodes a sequence of bytes or bytearray into a new instance of this record class. Entries with type ids that
+        are not fields of the record are treated like `tlv8.decode` treats entries not in `expected`. If a type id
+        occurs more than once, the last value is kept.
+
+        :param data: a bytes-like object (bytes, bytearray, memoryview, mmap, ...).
+        :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+        :return: an instance of this class, fields missing in the data are None
+        :raises: ValueError on failures during decoding
+        """
+        data = _as_buffer(data)
+        record = cls()
+        decoders = cls._decoders
+        for tlv_id, value in _scan(data, cls._type_ids, strict_mode):
+            field = decoders.get(tlv_id)
+            if field is not None:
+                setattr(record, field[0], field[1](value))
+        return record
+
+    def encode(self, separator_type_id=0xff) -> bytes:
+        """
+        Encode this record into a sequence of bytes. Fields are encoded in the order of the declaration, fields that
+        are None are skipped.
+
+        :param separator_type_id: the separator type id used for nested lists of entries
+        :return: a bytes instance
+        :raises: ValueError if data to encode is not encodable (e.g. an Integer is bigger than 64 bit)
+        """
+        result = []
+        for type_id, name, data_type in self._fields:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            result.append(_fragment(type_id, _encode_value(value, data_type, -1, separator_type_id)))
+        return b''.join(result)
+
+
+def record_class(name, fields) -> type:
+    """
+    Create a new record class with `__slots__` for the given fields. Instances can be created from bytes via
+    `RecordClass.decode(data)` and be turned into bytes via `record.encode()`.
+
+    Example:
+    ```
+        Point = tlv8.record_class('Point', [
+            (3, 'x', tlv8.DataType.INTEGER),
+            (4, 'y', tlv8.DataType.INTEGER),
+        ])
+        Line = tlv8.record_class('Line', [
+            (1, 'start', Point),
+            (2, 'end', Point),
+        ])
+        line = Line.decode(b'\\x01\\x06\\x03\\x01\\n\\x04\\x01\\n\\x02\\x06\\x03\\x01\\x1e\\x04\\x01(')
+        print(line.end.x)
+    ```
+
+    :param name: the name of the class
+    :param fields: a list of (type_id, attribute name, data type) tuples. The data type is a DataType, an IntEnum class
+        or another record class for nested records.
+    :return: the new subclass of tlv8.Record
+    :raises ValueError: if type ids or attribute names are used twice or a data type is not supported
+    """
+    fields = tuple((type_id, attribute, data_type) for type_id, attribute, data_type in fields)
+    decoders = {}
+    for type_id, attribute, data_type in fields:
+        if type_id in decoders:
+            raise ValueError('The type_id {t} is used twice'.format(t=type_id))
+        decoders[int(type_id)] = (attribute, _value_decoder(data_type))
+    names = tuple(attribute for _, attribute, _ in fields)
+    if len(set(names)) != len(names):
+        raise ValueError('Attribute names must be unique: {n}'.format(n=', '.join(names)))
+    return type(name, (Record,), {
+        '__slots__': names,
+        '_fields': fields,
+        '_decoders': decoders,
+        '_type_ids': frozenset(decoders),
+    })
+
+
+_BULK_FORMATS = {
+    DataType.FLOAT: {4: ('<f4', _array_typecode('f', 4))},
+    DataType.INTEGER: {
+        width: ('<i{w}'.format(w=width), _array_typecode('bhilq', width)) for width in [1, 2, 4, 8]
+    },
+    DataType.UNSIGNED_INTEGER: {
+        width: ('<u{w}'.format(w=width), _array_typecode('BHILQ', width)) for width in [1, 2, 4, 8]
+    },
+}
+
+
+def _bulk_run_length(numpy, data, position, type_id, width, separator_type_id):
+    """
+    Count the entries of a run starting at position: entries with the same type id and length that are separated by
+    empty separator entries. The check is done vectorized in windows of growing size, so the effort is proportional
+    to the length of the run and not to the length of the data.
+
+    :return: the number of entries in the run (at least 1)
+    """
+    buffer = numpy.frombuffer(data, dtype=numpy.uint8)
+    stride = width + 4
+    maximum = (len(data) - position - width - 2) // stride + 1
+    count = 1
+    window = 16
+    while count < maximum:
+        end = min(count + window, maximum)
+        headers = position + stride * numpy.arange(count, end)
+        valid = (buffer[headers] == type_id) & (buffer[headers + 1] == width) & \
+                (buffer[headers - 2] == separator_type_id) & (buffer[headers - 1] == 0)
+        if not valid.all():
+            return count + int(numpy.argmin(valid))
+        count = end
+        window *= 2
+    return count
+
+
+def decode_bulk(data, expected, strict_mode=False, separator_type_id=0xff, use_numpy=None) -> EntryList:
+    """
+    Decodes like `tlv8.decode` but recognises runs of entries with the same type id whose values are FLOAT, INTEGER or
+    UNSIGNED_INTEGER with the same length and which are only separated by separator entries. Each such run is
+    returned as a single tlv8.Entry whose data is a numpy array (if numpy is available) or an array.array containing
+    all values of the run. The values are converted with one call instead of one per entry.
+
+    Runs of integers with different lengths (which happens for automatically sized integers) are returned as multiple
+    entries, one per length.
+
+    :param data: a bytes-like object (bytes, bytearray, memoryview, mmap, ...).
+    :param expected: a dict of type ids onto expected DataTypes as for `tlv8.decode`.
+    :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param separator_type_id: the type id of the separators between the entries of a run
+    :param use_numpy: None to use numpy if it is available, True to require numpy, False to use array.array
+    :return: a list of tlv8.Entry objects
+    :raises: ValueError on failures during decoding
+    """
+    data = _as_buffer(data)
+    if not expected:
+        return decode(data, expected, strict_mode)
+    numpy = None
+    if use_numpy or use_numpy is None:
+        numpy = _numpy()
+        if use_numpy and numpy is None:
+            raise ImportError('numpy is required for use_numpy=True')
+
+    bulk_types = {}
+    for key, data_type in expected.items():
+        if not isinstance(data_type, (dict, enum.EnumMeta)) and data_type in _BULK_FORMATS:
+            bulk_types[int(key)] = (key, data_type, _BULK_FORMATS[data_type])
+
+    result = EntryList()
+    length = len(data)
+    position = 0
+    pending = 0
+    previous_id = None
+    complete = True
+    while position < length - 1:
+        tlv_id = data[position]
+        tlv_len = data[position + 1]
+        if tlv_id not in expected and tlv_len > 0:
+            complete = False
+            break
+        bulk_type = bulk_types.get(tlv_id)
+        if bulk_type is not None and tlv_id != previous_id and tlv_len in bulk_type[2] \
+                and position + 2 + tlv_len <= length:
+            stride = tlv_len + 4
+            if numpy is not None:
+                count = _bulk_run_length(numpy, data, position, tlv_id, tlv_len, separator_type_id)
+            else:
+                count = 1
+                end = position + 2 + tlv_len
+                while end + stride <= length and data[end] == separator_type_id and data[end + 1] == 0 \
+                        and data[end + 2] == tlv_id and data[end + 3] == tlv_len:
+                    count += 1
+                    end += stride
+            if count > 1:
+                if pending < position:
+                    result.data.extend(decode(data[pending:position], expected, strict_mode).data)
+                dtype, typecode = bulk_type[2][tlv_len]
+                if numpy is not None:
+                    values = numpy.ndarray(shape=(count,), dtype=dtype, buffer=data, offset=position + 2,
+                                           strides=(stride,)).copy()
+                else:
+                    values = array.array(typecode)
+                    values.frombytes(b''.join(
+                        data[start:start + tlv_len] for start in range(position + 2, position + count * stride, stride)
+                    ))
+                    if sys.byteorder == 'big':
+                        values.byteswap()
+                result.append(Entry(bulk_type[0], values, bulk_type[1]))
+                position += count * stride - 2
+                if strict_mode and position < length and data[position] == tlv_id:
+                    # the run and the remaining data are decoded separately, so the check of decode misses this
+                    raise ValueError('Missing separator detected.')
+                pending = position
+                previous_id = tlv_id
+                continue
+        previous_id = tlv_id
+        position += 2 + tlv_len
+    remaining = data[pending:] if complete else data[pending:position]
+    if remaining:
+        result.data.extend(decode(remaining, expected, strict_mode).data)
+    return result
+
+
+Column = collections.namedtuple('Column', ['values', 'present'])
+Column.__doc__ = """
+One column of the result of `tlv8.decode_columns`: `values` holds one value per decoded message and `present` is a
+mask with a true value for each message that contained the type id.
+"""
+
+_COLUMN_FORMATS = {
+    DataType.FLOAT: (0.0, 'float64', 'd'),
+    DataType.INTEGER: (0, 'int64', _array_typecode('lq', 8)),
+    DataType.UNSIGNED_INTEGER: (0, 'uint64', _array_typecode('LQ', 8)),
+}
+
+
+def decode_columns(buffers, schema, strict_mode=False, use_numpy=None) -> dict:
+    """
+    Decodes many messages with the same schema into columns instead of one tlv8.EntryList per message. For each type
+    id of the schema a tlv8.Column is created that contains one value per message. If a type id occurs more than once
+    in a message, the first value is used.
+
+    FLOAT, INTEGER and UNSIGNED_INTEGER columns are numpy arrays (if numpy is available) or array.array instances,
+    missing values are 0. All other columns are lists, missing values are None. The presence mask is a numpy array of
+    bools or a bytearray of 0 and 1.
+
+    :param buffers: an iterable of bytes-like objects (bytes, bytearray, memoryview, mmap, ...)
+    :param schema: a dict of type ids onto expected DataTypes as for `tlv8.decode`
+    :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param use_numpy: None to use numpy if it is available, True to require numpy, False to use array.array
+    :return: a dict of the keys of the schema onto tlv8.Column instances
+    :raises: ValueError on failures during decoding
+    """
+    numpy = None
+    if use_numpy or use_numpy is None:
+        numpy = _numpy()
+        if use_numpy and numpy is None:
+            raise ImportError('numpy is required for use_numpy=True')
+
+    columns = []
+    for key, data_type in schema.items():
+        column_format = None
+        if not isinstance(data_type, (dict, enum.EnumMeta)):
+            column_format = _COLUMN_FORMATS.get(data_type)
+        missing = None if column_format is None else column_format[0]
+        columns.append((key, int(key), _value_decoder(data_type), missing, column_format, [], bytearray()))
+    type_ids = frozenset(column[1] for column in columns)
+
+    for data in buffers:
+        data = _as_buffer(data)
+        raw = {}
+        for tlv_id, value in _scan(data, type_ids, strict_mode):
+            if tlv_id not in raw:
+                raw[tlv_id] = value
+        for _, type_id, decoder, missing, _, values, present in columns:
+            value = raw.get(type_id)
+            if value is None:
+                values.append(missing)
+                present.append(0)
+            else:
+                values.append(decoder(value))
+                present.append(1)
+
+    result = {}
+    for key, _, _, _, column_format, values, present in columns:
+        if column_format is not None:
+            if numpy is not None:
+                values = numpy.array(values, dtype=column_format[1])
+            else:
+                values = array.array(column_format[2], values)
+        if numpy is not None:
+            present = numpy.frombuffer(present, dtype=numpy.bool_)
+        result[key] = Column(values, present)
+    return result
+
+
+def decode_shared(data, offsets, expected=None, strict_mode=False, processes=None, pool=None, chunk_size=None,
+                  function=None) -> list:
+    """
+    Decodes many records stored in one buffer in a pool of worker processes. The workers attach to a shared memory
+    block and decode their records directly from it, so the input is not pickled and sent to the workers. The results
+    are sent back in the compact pickle form of tlv8.EntryList. Restoring the lists still takes time in the calling
+    process, so if only some values are needed, pass a function to extract them in the workers.
+
+    Requires `multiprocessing.shared_memory` (Python 3.8 or newer).
+
+    :param data: a `multiprocessing.shared_memory.SharedMemory` instance (used as it is) or any bytes-like object
+        (copied once into a new shared memory block that is removed afterwards)
+    :param offsets: a sequence of (start, end) tuples, one per record
+    :param expected: a dict of type ids onto expected DataTypes as for `tlv8.decode`
+    :param strict_mode: if set to True, bail out if there consecutive entry of the same type without separators.
+    :param processes: the number of worker processes if no pool is given, defaults to the number of CPUs
+    :param pool: an existing `multiprocessing.Pool` to use instead of creating (and closing) a new one
+    :param chunk_size: the number of records per task, defaults to about 4 tasks per worker
+    :param function: a picklable function (e.g. defined on module level) that is called in the workers with each
+        decoded tlv8.EntryList. Its return values are returned instead of the lists.
+    :return: a list with one tlv8.EntryList (or return value of function) per record in the order of offsets
+    :raises: ValueError on invalid offsets or failures during decoding, ImportError if shared memory is not available
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        raise ImportError('decode_shared requires multiprocessing.shared_memory (Python 3.8 or newer)')
+    import multiprocessing
+
+    owned = not isinstance(data, shared_memory.SharedMemory)
+    if owned:
+        view = _as_buffer(data, zero_copy=True)
+        size = len(view)
+        block = shared_memory.SharedMemory(create=True, size=max(1, size))
+        block.buf[:size] = view
+    else:
+        block = data
+        size = block.size
+    try:
+        offsets = [(int(start), int(end)) for start, end in offsets]
+        for start, end in offsets:
+            if start < 0 or end < start or end > size:
+                raise ValueError('Record ({s}, {e}) is not within the buffer of {size} bytes'.format(
+                    s=start, e=end, size=size))
+        if not offsets:
+            return []
+        if chunk_size is None:
+            workers = processes or multiprocessing.cpu_count()
+            chunk_size = max(1, -(-len(offsets) // (4 * workers)))
+        tasks = [
+            (block.name, offsets[index:index + chunk_size], expected, strict_mode, function)
+            for index in range(0, len(offsets), chunk_size)
+        ]
+
+        own_pool = pool is None
+        if own_pool:
+            pool = multiprocessing.Pool(processes)
+        try:
+            result = []
+            failure = None
+            results = pool.imap(_decode_shared_task, tasks)
+            # wait for all tasks even if one failed, so no worker still attaches to the block when it is released
+            for _ in tasks:
+                try:
+                    records = next(results)
+                except Exception as e:
+                    if failure is None:
+                        failure = e
+                    continue
+                result.extend(records)
+            if failure is not None:
+                raise failure
+            return result
+        finally:
+            if own_pool:
+                pool.close()
+                pool.join()
+    finally:
+        if owned:
+            block.close()
+            block.unlink()
+
+
+def _shared_memory_tracked() -> bool:
+    """
+    Check if attaching to a shared memory block registers it with the resource tracker. This is the case for POSIX
+    shared memory before Python 3.13, which has no parameter `track`.
+    """
+    return os.name == 'posix' and sys.version_info < (3, 13)
+
+
+def _attach_shared_memory(shared_memory, name):
+    """
+    Attach to an existing shared memory block without keeping it registered with a resource tracker of its own. The
+    block belongs to the caller of decode_shared, the tracker of a worker would remove it (or warn about it) when the
+    worker exits.
+
+    A worker that inherited the resource tracker of the caller (or runs in the same process) registers the block with
+    the tracker that already holds the caller's registration. This has no effect and is not undone: the tracker keeps a
+    set of names, so undoing it would remove the caller's registration and concurrent attachments would try to remove
+    the name twice.
+    """
+    global _own_resource_tracker
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    if not _shared_memory_tracked():
+        return shared_memory.SharedMemory(name=name)
+    from multiprocessing import resource_tracker
+    if _own_resource_tracker is None:
+        # decided on the first attachment, afterwards this process runs a tracker in any case
+        _own_resource_tracker = resource_tracker._resource_tracker._fd is None
+    block = shared_memory.SharedMemory(name=name)
+    if _own_resource_tracker:
+        resource_tracker.unregister(block._name, 'shared_memory')
+    return block
+
+
+def _decode_shared_task(task) -> list:
+    """
+    Decode the records of one task of decode_shared in a worker process.
+    """
+    from multiprocessing import shared_memory
+    name, offsets, expected, strict_mode, function = task
+    block = _attach_shared_memory(shared_memory, name)
+    try:
+        buffer = block.buf
+        result = []
+        for start, end in offsets:
+            with buffer[start:end] as record:
+                entries = decode(record, expected, strict_mode)
+            result.append(entries if function is None else function(entries))
+        return result
+    finally:
+        block.close()
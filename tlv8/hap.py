@@ -0,0 +1,286 @@
+#
+# Copyright 2020 Joachim Lusiardi
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Constants and message schemas of the TLV8 messages used for pairing in the HomeKit Accessory Protocol (chapter 5 of
+HomeKit Accessory Protocol Specification Non-Commercial Version Release R2). The schemas are compiled with
+`tlv8.compile_schema` on first use.
+"""
+
+__all__ = [
+    'TlvType', 'Method', 'Error', 'State', 'Permissions', 'Message',
+    'PAIR_SETUP_M1', 'PAIR_SETUP_M2', 'PAIR_SETUP_M3', 'PAIR_SETUP_M4', 'PAIR_SETUP_M5', 'PAIR_SETUP_M6',
+    'PAIR_SETUP_SUB_TLV', 'PAIR_VERIFY_M1', 'PAIR_VERIFY_M2', 'PAIR_VERIFY_M3', 'PAIR_VERIFY_M4',
+    'PAIR_VERIFY_SUB_TLV', 'ADD_PAIRING_M1', 'ADD_PAIRING_M2', 'REMOVE_PAIRING_M1', 'REMOVE_PAIRING_M2',
+    'LIST_PAIRINGS_M1', 'LIST_PAIRINGS_M2', 'MESSAGES', 'PAIRING', 'decode_pairings'
+]
+
+import enum
+
+import tlv8
+
+
+class TlvType(enum.IntEnum):
+    """
+    The type ids of the entries (table 5-6, page 51).
+    """
+    METHOD = 0x00
+    IDENTIFIER = 0x01
+    SALT = 0x02
+    PUBLIC_KEY = 0x03
+    PROOF = 0x04
+    ENCRYPTED_DATA = 0x05
+    STATE = 0x06
+    ERROR = 0x07
+    RETRY_DELAY = 0x08
+    CERTIFICATE = 0x09
+    SIGNATURE = 0x0a
+    PERMISSIONS = 0x0b
+    FRAGMENT_DATA = 0x0c
+    FRAGMENT_LAST = 0x0d
+    SEPARATOR = 0xff
+
+
+class Method(enum.IntEnum):
+    """
+    The values of the METHOD entries as numbered in release R2 (table 5-3).
+    """
+    PAIR_SETUP = 0
+    PAIR_SETUP_WITH_AUTH = 1
+    PAIR_VERIFY = 2
+    ADD_PAIRING = 3
+    REMOVE_PAIRING = 4
+    LIST_PAIRINGS = 5
+
+
+class Error(enum.IntEnum):
+    """
+    The values of the ERROR entries.
+    """
+    UNKNOWN = 1
+    AUTHENTICATION = 2
+    BACKOFF = 3
+    MAX_PEERS = 4
+    MAX_TRIES = 5
+    UNAVAILABLE = 6
+    BUSY = 7
+
+
+class State(enum.IntEnum):
+    """
+    The values of the STATE entries, the number of the message within a pairing exchange.
+    """
+    M1 = 1
+    M2 = 2
+    M3 = 3
+    M4 = 4
+    M5 = 5
+    M6 = 6
+
+
+class Permissions(enum.IntEnum):
+    """
+    The values of the PERMISSIONS entries.
+    """
+    USER = 0
+    ADMIN = 1
+
+
+class Message(object):
+    """
+    The expected structure of one HAP message. The schema is compiled once on first use of `decode` or `encode`.
+
+    The attributes are:
+        - `name`: the name of the message, e.g. `PAIR_SETUP_M1`
+        - `expected`: the expected structure as used by `tlv8.decode`
+    """
+
+    def __init__(self, name, expected):
+        """
+        Create a new Message instance. Nothing is compiled here.
+
+        :param name: the name of the message
+        :param expected: a dict of type ids onto expected DataTypes as used by `tlv8.decode`
+        """
+        self.name = name
+        self.expected = expected
+        self._compiled = None
+
+    @property
+    def compiled(self) -> tlv8.CompiledSchema:
+        """
+        The compiled schema of this message, see `tlv8.compile_schema`.
+        """
+        if self._compiled is None:
+            self._compiled = tlv8.compile_schema(self.expected)
+        return self._compiled
+
+    def decode(self, data, strict_mode=False, zero_copy=False, limits=None) -> tlv8.EntryList:
+        """
+        Decode the message with the compiled schema. This works like `tlv8.decode(data, self.expected, ...)`.
+
+        :param data: a bytes-like object
+        :param strict_mode: see `tlv8.decode`
+        :param zero_copy: see `tlv8.decode`
+        :param limits: see `tlv8.decode`
+        :return: a tlv8.EntryList
+        :raises: ValueError on failures during decoding, tlv8.LimitExceededError if a limit is exceeded
+        """
+        return self.compiled.decode(data, strict_mode, zero_copy, limits)
+
+    def encode(self, entries, separator_type_id=0xff) -> bytes:
+        """
+        Encode the message with the compiled schema. This works like `tlv8.encode(entries, separator_type_id)`.
+
+        :param entries: a list of tlv8.Entry objects
+        :param separator_type_id: see `tlv8.encode`
+        :return: an instance of bytes
+        :raises ValueError: if the input parameter is not conform to a list of tlv8.Entry objects
+        """
+        return self.compiled.encode(entries, separator_type_id)
+
+    def __repr__(self):
+        return '<Message {n}>'.format(n=self.name)
+
+
+# pair setup
+PAIR_SETUP_M1 = Message('PAIR_SETUP_M1', {
+    TlvType.STATE: State,
+    TlvType.METHOD: Method,
+})
+PAIR_SETUP_M2 = Message('PAIR_SETUP_M2', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+    TlvType.RETRY_DELAY: tlv8.DataType.UNSIGNED_INTEGER,
+    TlvType.SALT: tlv8.DataType.BYTES,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+})
+PAIR_SETUP_M3 = Message('PAIR_SETUP_M3', {
+    TlvType.STATE: State,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+    TlvType.PROOF: tlv8.DataType.BYTES,
+})
+PAIR_SETUP_M4 = Message('PAIR_SETUP_M4', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+    TlvType.RETRY_DELAY: tlv8.DataType.UNSIGNED_INTEGER,
+    TlvType.PROOF: tlv8.DataType.BYTES,
+})
+PAIR_SETUP_M5 = Message('PAIR_SETUP_M5', {
+    TlvType.STATE: State,
+    TlvType.ENCRYPTED_DATA: tlv8.DataType.BYTES,
+})
+PAIR_SETUP_M6 = Message('PAIR_SETUP_M6', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+    TlvType.ENCRYPTED_DATA: tlv8.DataType.BYTES,
+})
+# the decrypted content of ENCRYPTED_DATA of M5 and M6
+PAIR_SETUP_SUB_TLV = Message('PAIR_SETUP_SUB_TLV', {
+    TlvType.IDENTIFIER: tlv8.DataType.STRING,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+    TlvType.SIGNATURE: tlv8.DataType.BYTES,
+})
+
+# pair verify
+PAIR_VERIFY_M1 = Message('PAIR_VERIFY_M1', {
+    TlvType.STATE: State,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+})
+PAIR_VERIFY_M2 = Message('PAIR_VERIFY_M2', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+    TlvType.ENCRYPTED_DATA: tlv8.DataType.BYTES,
+})
+PAIR_VERIFY_M3 = Message('PAIR_VERIFY_M3', {
+    TlvType.STATE: State,
+    TlvType.ENCRYPTED_DATA: tlv8.DataType.BYTES,
+})
+PAIR_VERIFY_M4 = Message('PAIR_VERIFY_M4', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+})
+# the decrypted content of ENCRYPTED_DATA of M2 and M3
+PAIR_VERIFY_SUB_TLV = Message('PAIR_VERIFY_SUB_TLV', {
+    TlvType.IDENTIFIER: tlv8.DataType.STRING,
+    TlvType.SIGNATURE: tlv8.DataType.BYTES,
+})
+
+# add pairing
+ADD_PAIRING_M1 = Message('ADD_PAIRING_M1', {
+    TlvType.STATE: State,
+    TlvType.METHOD: Method,
+    TlvType.IDENTIFIER: tlv8.DataType.STRING,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+    TlvType.PERMISSIONS: Permissions,
+})
+ADD_PAIRING_M2 = Message('ADD_PAIRING_M2', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+})
+
+# remove pairing
+REMOVE_PAIRING_M1 = Message('REMOVE_PAIRING_M1', {
+    TlvType.STATE: State,
+    TlvType.METHOD: Method,
+    TlvType.IDENTIFIER: tlv8.DataType.STRING,
+})
+REMOVE_PAIRING_M2 = Message('REMOVE_PAIRING_M2', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+})
+
+# list pairings, the pairings of M2 are separated by SEPARATOR entries
+LIST_PAIRINGS_M1 = Message('LIST_PAIRINGS_M1', {
+    TlvType.STATE: State,
+    TlvType.METHOD: Method,
+})
+LIST_PAIRINGS_M2 = Message('LIST_PAIRINGS_M2', {
+    TlvType.STATE: State,
+    TlvType.ERROR: Error,
+    TlvType.IDENTIFIER: tlv8.DataType.STRING,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+    TlvType.PERMISSIONS: Permissions,
+})
+
+# all messages by name
+MESSAGES = {
+    message.name: message for message in [
+        PAIR_SETUP_M1, PAIR_SETUP_M2, PAIR_SETUP_M3, PAIR_SETUP_M4, PAIR_SETUP_M5, PAIR_SETUP_M6, PAIR_SETUP_SUB_TLV,
+        PAIR_VERIFY_M1, PAIR_VERIFY_M2, PAIR_VERIFY_M3, PAIR_VERIFY_M4, PAIR_VERIFY_SUB_TLV,
+        ADD_PAIRING_M1, ADD_PAIRING_M2, REMOVE_PAIRING_M1, REMOVE_PAIRING_M2, LIST_PAIRINGS_M1, LIST_PAIRINGS_M2,
+    ]
+}
+
+# the entries of one pairing within LIST_PAIRINGS_M2, see decode_pairings
+PAIRING = {
+    TlvType.IDENTIFIER: tlv8.DataType.STRING,
+    TlvType.PUBLIC_KEY: tlv8.DataType.BYTES,
+    TlvType.PERMISSIONS: Permissions,
+}
+
+
+def decode_pairings(data) -> list:
+    """
+    Decode the pairings of a List Pairings response (LIST_PAIRINGS_M2) with `tlv8.decode_sequence`. The STATE and ERROR
+    entries of the message are skipped.
+
+    :param data: a bytes-like object
+    :return: a list with one tlv8.EntryList (IDENTIFIER, PUBLIC_KEY and PERMISSIONS) per pairing
+    :raises: ValueError on failures during decoding
+    """
+    return tlv8.decode_sequence(data, PAIRING)